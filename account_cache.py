@@ -0,0 +1,123 @@
+import threading
+import time
+
+DEFAULT_FAST_INTERVAL = 5 # Seconds between polls while positions are open
+DEFAULT_SLOW_INTERVAL = 30 # Seconds between polls while flat
+
+
+class AccountCache:
+    """
+    One shared snapshot of the open positions and the futures balance.
+
+    Every consumer (protective stops, engine, dashboard through the `state` table)
+    reads the snapshot instead of calling the exchange: positions are fetched once
+    per interval, however many symbols ask. The interval adapts: short while there
+    is exposure, long while flat. invalidate() (e.g. on a fill) makes the next read
+    fetch again, and concurrent reads share that single fetch.
+
+    The snapshot is published to the `open_positions` and `account` states. A failed
+    fetch keeps the previous snapshot, flagged stale (`failed_at`): it is never
+    replaced by an empty "flat" list. positions() returns None until a first fetch succeeds.
+
+    Intervals are in `clock` seconds (default: the `time` module); the poller's wait is
+    divided by `clock.speed` so it keeps pace with the mock's accelerated clock.
+    """
+
+    def __init__(self, exchange, db_manager, fast=DEFAULT_FAST_INTERVAL, slow=DEFAULT_SLOW_INTERVAL, clock=None):
+        self.clock = clock or time
+        self.exchange = exchange
+        self.db = db_manager
+        self.fast = fast
+        self.slow = slow
+        self._positions = None # None: never fetched successfully
+        self._balance = {}
+        self._fetched_at = None # clock.monotonic() of the last successful fetch
+        self.failed_at = None # clock.monotonic() of the last failed fetch, None once a fetch succeeds
+        self._stale = True
+        self._fetch_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def interval(self):
+        return self.fast if self._positions else self.slow
+
+    def is_stale(self):
+        """True when the last fetch failed: the snapshot may no longer be the exchange's."""
+        return self.failed_at is not None
+
+    def _expired(self, max_age):
+        if self._stale:
+            return True
+        if self.failed_at is not None: # Retry a failed fetch, without hammering the exchange
+            return self.clock.monotonic() - self.failed_at >= (self.fast if max_age is None else max_age)
+        if self._fetched_at is None:
+            return True
+        return self.clock.monotonic() - self._fetched_at >= (self.interval() if max_age is None else max_age)
+
+    def positions(self, max_age=None):
+        """Open positions in the connector format, at most `max_age` seconds old (default: the poll interval)."""
+        if self._expired(max_age):
+            self.refresh(max_age)
+        return self._positions
+
+    def balance(self, max_age=None):
+        if self._expired(max_age):
+            self.refresh(max_age)
+        return self._balance
+
+    def invalidate(self):
+        self._stale = True
+
+    def refresh(self, max_age=0):
+        """
+        Fetches positions and balance (max_age=0: always). Callers that queued behind a
+        running fetch get its result, unless the cache was invalidated meanwhile.
+        """
+        with self._fetch_lock:
+            if max_age != 0 and not self._expired(max_age):
+                return self._positions
+            self._stale = False # An invalidate() during the fetch marks it stale again
+            started = self.clock.monotonic()
+            try:
+                positions = self.exchange.get_all_open_positions()
+            except Exception:
+                self.failed_at = started
+                raise
+            if positions is None:
+                # Keep the previous snapshot, flagged stale, and retry after the fast interval
+                self.failed_at = started
+                self.db.log("AccountCache", "Positions fetch failed. Keeping the previous snapshot (stale).", "WARNING")
+                self.db.update_state('account', dict(self._balance, stale=True))
+                return self._positions
+            balance = self.exchange.get_account_balance() if hasattr(self.exchange, 'get_account_balance') else None
+            self._positions = positions
+            if balance:
+                self._balance = balance
+            self._fetched_at = started
+            self.failed_at = None
+
+        self.db.update_state('open_positions', positions)
+        if balance:
+            self.db.update_state('account', balance)
+        return positions
+
+    # --- Background polling ---
+
+    def start(self):
+        self._stop.clear()
+        threading.Thread(target=self._run, daemon=True, name="AccountCache").start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self._expired(None):
+                    self.refresh()
+            except Exception as e:
+                self.db.log("AccountCache", f"Account refresh failed: {e}", "WARNING")
+            if self.is_stale():
+                due = self.fast # Retry soon after a failure
+            else:
+                due = self.interval() - (self.clock.monotonic() - (self._fetched_at or 0))
+            self._stop.wait(min(max(due, 0.5), self.slow) / getattr(self.clock, 'speed', 1.0))
@@ -0,0 +1,105 @@
+import math
+import time
+from bisect import bisect_left
+
+DEFAULT_BACKOFF = 2.0 # Interval growth per poll while nothing is close
+DEFAULT_SIGMAS = 3 # A target must be this many standard deviations of the poll-to-poll move away
+VOL_HALF_LIFE = 60 # Seconds: how fast the volatility estimate follows the market
+TICK_BUDGET_SHARE = 0.2 # Share of the connector's request budget the ticker feed may use
+
+
+def nearest_targets(price, levels, stops=()):
+    """The grid levels just below and above `price` (sorted `levels`) plus the stop prices."""
+    targets = [s for s in stops if s]
+    i = bisect_left(levels, price)
+    if i < len(levels):
+        targets.append(levels[i])
+    if i > 0:
+        targets.append(levels[i - 1])
+    return targets
+
+
+class AdaptivePollingScheduler:
+    """
+    Picks the next price poll interval from how soon the price may reach something
+    that matters: a resting grid level or a stop.
+
+    Per symbol it keeps an EWMA of the squared log return per second (the variance
+    rate). A target at log distance d is about (d / sigma)^2 seconds away, so polling
+    every (d / (DEFAULT_SIGMAS * sigma))^2 seconds keeps a crossing between two polls
+    unlikely. Tighter intervals apply at once; looser ones grow by `backoff` per
+    poll, so a price sitting mid-cell backs off exponentially. The result stays in
+    [min_interval, max_interval], and min_interval is raised to respect `rate_limit`
+    (requests/s available to the feed).
+    """
+
+    def __init__(self, min_interval, max_interval, backoff=DEFAULT_BACKOFF, sigmas=DEFAULT_SIGMAS, rate_limit=None):
+        self.backoff = backoff
+        self.sigmas = sigmas
+        self.set_bounds(min_interval, max_interval, rate_limit)
+        self.interval = self.min_interval
+        self._last = {} # symbol -> (time, price)
+        self._var_rate = {} # symbol -> EWMA of r^2 / dt
+
+    def set_bounds(self, min_interval, max_interval, rate_limit=None):
+        self.min_interval = max(min_interval, 1.0 / rate_limit if rate_limit else 0.0)
+        self.max_interval = max(max_interval, self.min_interval)
+
+    def observe(self, symbol, price, now=None):
+        """Folds a polled price into the volatility estimate of `symbol`."""
+        now = now if now is not None else time.monotonic()
+        last = self._last.get(symbol)
+        self._last[symbol] = (now, price)
+        if not last or not price or not last[1] or now <= last[0]:
+            return
+        dt = now - last[0]
+        r = math.log(price / last[1])
+        weight = 1 - 0.5 ** (dt / VOL_HALF_LIFE)
+        prev = self._var_rate.get(symbol)
+        sample = r * r / dt
+        self._var_rate[symbol] = sample if prev is None else prev + weight * (sample - prev)
+
+    def desired_interval(self, symbol, price, targets):
+        """Interval that keeps the nearest target DEFAULT_SIGMAS deviations away (max_interval if none)."""
+        var_rate = self._var_rate.get(symbol)
+        distances = [abs(math.log(t / price)) for t in targets if t and t > 0]
+        if not distances or not price:
+            return self.max_interval
+        if var_rate is None:
+            return self.min_interval # No estimate yet: stay alert
+        if var_rate == 0:
+            return self.max_interval # The price has not moved: nothing can be reached soon
+        d = min(distances)
+        return (d / self.sigmas) ** 2 / var_rate
+
+    def next_interval(self, prices, targets):
+        """
+        prices: {symbol: last price}, targets: {symbol: [prices that matter]}.
+        Returns the interval to wait before the next poll.
+        """
+        desired = min((self.desired_interval(s, p, targets.get(s, ())) for s, p in prices.items() if p),
+                      default=self.max_interval)
+        if desired < self.interval:
+            self.interval = desired
+        else:
+            self.interval = min(desired, self.interval * self.backoff)
+        self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+        return self.interval
+
+
+class ExponentialBackoff:
+    """An interval that doubles up to `maximum` on every quiet round and snaps to `minimum` on activity."""
+
+    def __init__(self, minimum, maximum, factor=DEFAULT_BACKOFF):
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.factor = factor
+        self.current = minimum
+
+    def reset(self):
+        self.current = self.minimum
+
+    def next(self):
+        interval = self.current
+        self.current = min(self.current * self.factor, self.maximum)
+        return interval
@@ -1,11 +1,15 @@
-from flask import Flask, render_template, jsonify, request, redirect, url_for, flash
+from flask import Flask, render_template, jsonify, request, redirect, url_for, flash, Response
 import json
 import time
 from datetime import datetime
 from db_manager import DatabaseManager
 import config
-from connector_kucoin import KuCoinConnector
 from flask_basicauth import BasicAuth
+from profiler import profiler, ProfilerBusyError
+import events
+from db_manager import GRID_CONFIG_KEYS
+
+GRID_SIDES = ('NEUTRAL', 'LONG', 'SHORT')
 
 app = Flask(__name__)
 app.secret_key = 'super_secret_manu_key'
@@ -25,6 +29,16 @@ def index():
 def history():
     return render_template('history.html')
 
+def optional_float(val):
+    """Form value of an optional price: empty means disabled (None)."""
+    return float(val) if val.strip() else None
+
+def grid_side(val):
+    side = val.strip().upper()
+    if side not in GRID_SIDES:
+        raise ValueError(f"must be one of {', '.join(GRID_SIDES)}")
+    return side
+
 @app.route('/settings', methods=['GET', 'POST'])
 @basic_auth.required
 def settings():
@@ -32,8 +46,6 @@ def settings():
         try:
             # Handle Symbols (now a single symbol for grid bot)
             symbol_str = request.form.get('symbol')
-            if symbol_str:
-                db.set_setting('SYMBOLS', [symbol_str])
 
             # Handle Grid Bot parameters
             settings_map = {
@@ -44,14 +56,30 @@ def settings():
                 'GRID_LEVELS': int,
                 'PROFIT_PER_GRID': float,
                 'STOP_LOSS_PRICE': float,
+                'STOP_LOSS_PRICE_HIGH': optional_float, # Empty: no short stop
+                'GRID_SIDE': grid_side,
+                'AUTO_RANGE_TIMEFRAME': str,
                 'STRATEGIST_INTERVAL': int,
                 'EXECUTION_INTERVAL': int,
             }
 
+            # Convert every field first: a bad one must not leave the others half saved
+            values = {'SYMBOLS': [symbol_str]} if symbol_str else {}
             for key, type_func in settings_map.items():
                 val = request.form.get(key)
                 if val is not None:
-                    db.set_setting(key, type_func(val))
+                    try:
+                        values[key] = type_func(val)
+                    except ValueError as e:
+                        raise ValueError(f"{key}: {e}")
+            # Checkbox: absent from the form when unchecked
+            values['GRID_AUTO_RANGE'] = request.form.get('GRID_AUTO_RANGE') == 'on'
+
+            for key, value in values.items():
+                db.set_setting(key, value)
+
+            # Wake up the trading engine so the grid reacts immediately
+            events.publish(events.SettingsChanged(keys=tuple(values)))
 
             flash('Impostazioni salvate con successo!', 'success')
         except Exception as e:
@@ -69,11 +97,38 @@ def settings():
         'GRID_LEVELS': db.get_setting('GRID_LEVELS', config.DEFAULT_GRID_LEVELS),
         'PROFIT_PER_GRID': db.get_setting('PROFIT_PER_GRID', config.DEFAULT_PROFIT_PER_GRID),
         'STOP_LOSS_PRICE': db.get_setting('STOP_LOSS_PRICE', config.DEFAULT_STOP_LOSS_PRICE),
+        'STOP_LOSS_PRICE_HIGH': db.get_setting('STOP_LOSS_PRICE_HIGH', config.DEFAULT_STOP_LOSS_PRICE_HIGH),
+        'GRID_SIDE': db.get_setting('GRID_SIDE', config.DEFAULT_GRID_SIDE),
+        'GRID_AUTO_RANGE': db.get_setting('GRID_AUTO_RANGE', config.DEFAULT_GRID_AUTO_RANGE),
+        'AUTO_RANGE_TIMEFRAME': db.get_setting('AUTO_RANGE_TIMEFRAME', config.DEFAULT_AUTO_RANGE_TIMEFRAME),
         'STRATEGIST_INTERVAL': db.get_setting('STRATEGIST_INTERVAL', config.DEFAULT_STRATEGIST_INTERVAL),
         'EXECUTION_INTERVAL': db.get_setting('EXECUTION_INTERVAL', config.DEFAULT_EXECUTION_INTERVAL),
     }
     return render_template('settings.html', settings=current_settings)
 
+@app.route('/api/grids', methods=['GET', 'POST'])
+@basic_auth.required
+def api_grids():
+    """
+    Per-symbol grid configurations.
+    GET: list every configured grid.
+    POST: create/update one grid, e.g. {"symbol": "ETH/USDT:USDT", "grid_range_low": 2000, ...}.
+    Fields left out fall back to the global settings.
+    """
+    if request.method == 'POST':
+        payload = request.get_json(silent=True) or {}
+        symbol = payload.pop('symbol', None)
+        if not symbol:
+            return jsonify({'error': 'symbol is required'}), 400
+        enabled = bool(payload.pop('enabled', True))
+        try:
+            db.save_grid_config(symbol, enabled=enabled, **payload)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'allowed_fields': sorted(GRID_CONFIG_KEYS)}), 400
+        events.publish(events.SettingsChanged(keys=(f'grid:{symbol}',)))
+
+    return jsonify(db.get_grid_configs(enabled_only=False))
+
 # API endpoints remain largely the same, but might show less data
 # as the grid bot logic is different. For now, we leave them as is.
 
@@ -103,6 +158,7 @@ def api_stats():
         'total_unrealized_pnl': total_unrealized,
         'total_realized_pnl': realized_pnl,
         'positions': open_positions,
+        'account': db.get_state('account'),
         'recent_trades': history_fills
     })
 
@@ -166,3 +222,38 @@ def api_history():
         'equity_curve': equity_curve,
         'stats': stats
     })
+
+@app.route('/api/scanner')
+def api_scanner():
+    """Ranked grid candidates of the contract scanner (see scanner.py)."""
+    limit = int(request.args.get('limit', 50))
+    return jsonify({
+        'candidates': db.get_scanner_candidates(limit),
+        'status': db.get_state('scanner'),
+    })
+
+@app.route('/api/admin/profile')
+@basic_auth.required
+def api_admin_profile():
+    """
+    Samples every thread of the running process for N seconds and returns
+    a flamegraph-compatible collapsed-stack file.
+    Usage: /api/admin/profile?seconds=30&interval_ms=5
+    """
+    try:
+        seconds = min(max(float(request.args.get('seconds', 10)), 1), 300)
+        interval = min(max(float(request.args.get('interval_ms', 5)), 1), 1000) / 1000
+    except ValueError:
+        return jsonify({'error': 'seconds and interval_ms must be numbers'}), 400
+
+    try:
+        collapsed = profiler.profile(seconds=seconds, interval=interval)
+    except ProfilerBusyError as e:
+        return jsonify({'error': str(e)}), 409
+
+    filename = f"manu-profile-{int(time.time())}.folded"
+    return Response(
+        collapsed,
+        mimetype='text/plain',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
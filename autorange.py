@@ -0,0 +1,149 @@
+import math
+import threading
+import time
+import pandas as pd
+import technical_analysis as ta
+
+TIMEFRAME_SECONDS = {'1m': 60, '5m': 300, '15m': 900, '30m': 1800, '1h': 3600, '4h': 14400, '1d': 86400}
+
+DEFAULT_TIMEFRAME = '15m'
+DEFAULT_SPACING_ATR = 0.5 # Level spacing as a fraction of the ATR
+DEFAULT_BB_STD = 2 # Bollinger width used as range
+ATR_PERIOD = 14
+BB_WINDOW = 20
+KLINE_HISTORY = 100 # Closed candles kept per symbol
+SPACING_HYSTERESIS = 0.25 # Spacing only changes when the ATR moves more than this
+
+
+def compute_range(df, increment, max_levels, spacing_atr=DEFAULT_SPACING_ATR, bb_std=DEFAULT_BB_STD, prev=None, atr=None, bb=None):
+    """
+    Derives the grid range and spacing from closed candles.
+
+    - Spacing: `spacing_atr` * ATR, in whole ticks. It is kept from `prev` while the
+      ATR moves less than SPACING_HYSTERESIS, so small volatility changes cost nothing.
+    - Range: the Bollinger bands (at least two levels on each side of the close),
+      snapped outward to multiples of the spacing. Levels sit on a fixed lattice,
+      so when the bands drift only the levels at the edges change.
+    - At most `max_levels` levels, centered on the close.
+
+    `atr` / `bb` may be passed precomputed on `df` (e.g. from an IndicatorCache).
+    Returns {'low', 'high', 'levels', 'spacing_ticks', 'atr'} or None if there is not
+    enough data.
+    """
+    if df is None or len(df) < max(ATR_PERIOD, BB_WINDOW) + 1 or not increment:
+        return None
+
+    if atr is None:
+        atr = ta.calculate_atr(df, period=ATR_PERIOD)
+    if bb is None:
+        bb = ta.calculate_bollinger_bands(df, window=BB_WINDOW, no_of_std=bb_std)
+    close = float(df['close'].iloc[-1])
+    if not atr or pd.isna(atr) or pd.isna(bb['lower']) or pd.isna(bb['upper']):
+        return None
+
+    spacing = max(1, int(round(spacing_atr * atr / increment)))
+    if prev and prev.get('spacing_ticks'):
+        if abs(spacing / prev['spacing_ticks'] - 1) < SPACING_HYSTERESIS:
+            spacing = prev['spacing_ticks']
+
+    close_tick = close / increment
+    lower = min(bb['lower'] / increment, close_tick - 2 * spacing)
+    upper = max(bb['upper'] / increment, close_tick + 2 * spacing)
+    low_step = math.floor(lower / spacing)
+    high_step = math.ceil(upper / spacing)
+
+    max_levels = max(2, int(max_levels or 2))
+    if high_step - low_step + 1 > max_levels:
+        center = int(round(close_tick / spacing))
+        low_step = max(low_step, center - max_levels // 2)
+        high_step = low_step + max_levels - 1
+
+    return {
+        'low': low_step * spacing * increment,
+        'high': high_step * spacing * increment,
+        'levels': high_step - low_step + 1,
+        'spacing_ticks': spacing,
+        'atr': float(atr),
+    }
+
+
+class AutoRanger:
+    """
+    Keeps a rolling cache of closed candles per symbol and recomputes the grid
+    range only when a new candle has closed. The last range is persisted in the
+    state table (`auto_range:{symbol}`) so a restart does not move the grid.
+    With an IndicatorCache over the same candles, the ATR and Bollinger reads go
+    through it and are shared with every other reader of the closed bar.
+    """
+
+    def __init__(self, exchange, db_manager, indicators=None):
+        self.exchange = exchange
+        self.db = db_manager
+        self.indicators = indicators
+        self.klines = {} # (symbol, timeframe) -> DataFrame of closed candles
+        self.ranges = {} # symbol -> last computed range
+        self._lock = threading.Lock()
+
+    def current(self, symbol):
+        if symbol not in self.ranges:
+            self.ranges[symbol] = self.db.get_state(f'auto_range:{symbol}') or None
+        return self.ranges[symbol]
+
+    def _refresh_klines(self, symbol, timeframe, now):
+        """Appends the newly closed candles. Returns False when none closed since the last call."""
+        tf_seconds = TIMEFRAME_SECONDS.get(timeframe, TIMEFRAME_SECONDS[DEFAULT_TIMEFRAME])
+        last_closed_open = (int(now) // tf_seconds - 1) * tf_seconds
+
+        key = (symbol, timeframe)
+        for old in [k for k in self.klines if k[0] == symbol and k != key]:
+            del self.klines[old] # AUTO_RANGE_TIMEFRAME changed: never mix candles of two timeframes
+        cached = self.klines.get(key)
+        if cached is not None and len(cached) and cached['timestamp'].iloc[-1] / 1000 >= last_closed_open:
+            return False
+
+        df = self.exchange.get_historical_data(symbol, timeframe=timeframe, limit=KLINE_HISTORY + 1)
+        if df is None or df.empty:
+            return False
+        df = df[df['timestamp'] / 1000 + tf_seconds <= now] # Drop the forming candle
+
+        if cached is not None and len(cached):
+            df = pd.concat([cached, df[df['timestamp'] > cached['timestamp'].iloc[-1]]])
+        df = df.tail(KLINE_HISTORY).reset_index(drop=True)
+
+        if cached is not None and len(cached) and len(df) and df['timestamp'].iloc[-1] == cached['timestamp'].iloc[-1]:
+            return False
+        self.klines[key] = df
+        return True
+
+    def update(self, symbol, increment, max_levels, now=None):
+        """
+        Recomputes the range of `symbol` if a candle closed. Returns the new range
+        when it changed, None otherwise.
+        """
+        now = now or time.time()
+        timeframe = self.db.get_setting('AUTO_RANGE_TIMEFRAME', DEFAULT_TIMEFRAME)
+        with self._lock:
+            if not self._refresh_klines(symbol, timeframe, now):
+                return None
+
+            prev = self.current(symbol)
+            bb_std = self.db.get_setting('AUTO_RANGE_BB_STD', DEFAULT_BB_STD)
+            atr = bb = None
+            if self.indicators is not None:
+                atr = self.indicators.get(symbol, timeframe, 'calculate_atr', candles=KLINE_HISTORY, now=now, period=ATR_PERIOD)
+                bb = self.indicators.get(symbol, timeframe, 'calculate_bollinger_bands', candles=KLINE_HISTORY, now=now,
+                                         window=BB_WINDOW, no_of_std=bb_std)
+            new = compute_range(
+                self.klines[(symbol, timeframe)], increment, max_levels,
+                spacing_atr=self.db.get_setting('AUTO_RANGE_SPACING_ATR', DEFAULT_SPACING_ATR),
+                bb_std=bb_std, prev=prev, atr=atr, bb=bb,
+            )
+            if not new:
+                return None
+            if prev and all(prev.get(k) == new[k] for k in ('low', 'high', 'levels')):
+                return None
+
+            new['candle_ts'] = float(self.klines[(symbol, timeframe)]['timestamp'].iloc[-1])
+            self.ranges[symbol] = new
+            self.db.update_state(f'auto_range:{symbol}', new)
+            return new
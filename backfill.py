@@ -0,0 +1,86 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_BACKFILL_WORKERS = 4
+DEFAULT_WINDOW = 86400 # Seconds per request window (KuCoin allows up to 7 days)
+CHECKPOINT_STATE = 'history_backfill'
+LEDGER = 'ledger' # Checkpoint key of the ledger windows
+
+
+class HistoryBackfill:
+    """
+    Fetches fills (per symbol) and the RealisedPNL ledger over a time range.
+
+    The range is cut into windows on a fixed UTC grid, and every window is one
+    independent request sequence: they run on a worker pool, paced by the connector's
+    shared rate limiter. A window that completed is checkpointed in the `state` table
+    (`history_backfill`), so after a crash or an error only the missing windows are
+    fetched again. The window still open at `end` is never checkpointed.
+    """
+
+    def __init__(self, exchange, db_manager, workers=DEFAULT_BACKFILL_WORKERS, window=DEFAULT_WINDOW):
+        self.exchange = exchange
+        self.db = db_manager
+        self.workers = workers
+        self.window = window
+
+    def plan(self, symbols, start, end):
+        """(key, window start, window end) of every window of the range, ledger included."""
+        windows = []
+        ws = int(start // self.window) * self.window
+        while ws < end:
+            windows.append((ws, ws + self.window))
+            ws += self.window
+        return [(key, ws, we) for key in list(symbols) + [LEDGER] for ws, we in windows]
+
+    def _done(self):
+        return {key: set(starts) for key, starts in self.db.get_state(CHECKPOINT_STATE).get('windows', {}).items()}
+
+    def _checkpoint(self, done, key, ws, oldest):
+        done.setdefault(key, set()).add(ws)
+        # Windows before the range of this run will not be asked for again
+        self.db.update_state(CHECKPOINT_STATE, {'windows': {k: sorted(s for s in v if s >= oldest) for k, v in done.items()}})
+
+    def _fetch(self, key, ws, we, start, end):
+        since, until = max(ws, start), min(we, end)
+        if key == LEDGER:
+            items = self.exchange.get_ledger_history(start_at=since, end_at=until, strict=True)
+            self.db.save_ledger_items(items)
+        else:
+            items = self.exchange.get_trade_history(key, start_at=since, end_at=until, strict=True)
+            self.db.save_fills(items)
+        return len(items)
+
+    def run(self, start, end=None, symbols=None):
+        """
+        Backfills [start, end) and returns {'windows', 'skipped', 'rows', 'failed'}.
+        The range is complete when 'failed' is 0.
+        """
+        end = end or time.time()
+        symbols = symbols if symbols is not None else self.db.get_active_symbols()
+        oldest = int(start // self.window) * self.window
+        done = self._done()
+        planned = self.plan(symbols, start, end)
+        todo = [w for w in planned if w[1] not in done.get(w[0], ())]
+        summary = {'windows': len(todo), 'skipped': len(planned) - len(todo), 'rows': 0, 'failed': 0}
+        if not todo:
+            return summary
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='backfill') as pool:
+            futures = {pool.submit(self._fetch, key, ws, we, start, end): (key, ws, we) for key, ws, we in todo}
+            for future in as_completed(futures):
+                key, ws, we = futures[future]
+                try:
+                    summary['rows'] += future.result()
+                except Exception as e:
+                    summary['failed'] += 1
+                    self.db.log("HistorySync", f"Backfill window {key} {time.strftime('%Y-%m-%d %H:%M', time.gmtime(ws))} failed: {e}", "WARNING")
+                    continue
+                if we <= end:
+                    self._checkpoint(done, key, ws, oldest)
+
+        if summary['windows'] > 1:
+            self.db.log("HistorySync", f"Backfilled {summary['windows'] - summary['failed']}/{summary['windows']} windows "
+                        f"({summary['rows']} rows) in {time.monotonic() - started:.1f}s.", "INFO")
+        return summary
@@ -0,0 +1,259 @@
+import argparse
+import json
+import time
+import numpy as np
+import pandas as pd
+import grid
+
+DEFAULT_MAKER_FEE = 0.0002 # Grid and profit-take orders are limit orders
+DEFAULT_TAKER_FEE = 0.0006 # The stop loss closes at market
+
+
+def _as_arrays(ohlcv):
+    """Accepts a DataFrame / dict with timestamp, open, high, low, close columns."""
+    close = np.asarray(ohlcv['close'], dtype=np.float64)
+    n = len(close)
+    get = lambda key, default: np.asarray(ohlcv[key], dtype=np.float64) if key in ohlcv else default
+    return (
+        get('timestamp', np.arange(n, dtype=np.float64)),
+        get('open', close),
+        get('high', close),
+        get('low', close),
+        close,
+    )
+
+def _level_fills(sides, entry_hits):
+    """
+    Fill bars of one grid level under the live re-arm rule. The level is armed at the
+    first bar whose pass gives it a side (`sides`, one per bar, from the bar open). It
+    fills on the first bar from there that touches it (`entry_hits`: sorted bar indexes
+    per side), and it is re-armed from the next bar with the side of that bar.
+    The order inside a bar is unknown, so a refill never fills in its own fill bar.
+    Returns (fill_bars, fill_sides), one searchsorted per fill rather than per bar.
+    """
+    armable = np.flatnonzero(sides != grid.SIDE_NONE)
+    bars, fill_sides = [], []
+    t = 0
+    while True:
+        i = np.searchsorted(armable, t, side='left')
+        if i >= len(armable):
+            break
+        armed = int(armable[i])
+        side = int(sides[armed])
+        hits = entry_hits[side]
+        j = np.searchsorted(hits, armed, side='left')
+        if j >= len(hits):
+            break
+        fill = int(hits[j])
+        bars.append(fill)
+        fill_sides.append(side)
+        t = fill + 1
+    return np.array(bars, dtype=np.int64), np.array(fill_sides, dtype=np.int64)
+
+def run_backtest(ohlcv, config, increment=None, maker_fee=DEFAULT_MAKER_FEE, taker_fee=DEFAULT_TAKER_FEE, keep_equity=False):
+    """
+    Replays the grid rules of Strategist/Executioner over OHLCV bars (or trade ticks,
+    see `run_backtest_ticks`).
+
+    config is keyed like `db.get_grid_config()`: GRID_RANGE_LOW, GRID_RANGE_HIGH,
+    GRID_LEVELS, GRID_SIDE, BASE_ORDER_SIZE, LEVERAGE, PROFIT_PER_GRID,
+    STOP_LOSS_PRICE, STOP_LOSS_PRICE_HIGH.
+
+    Rules, as in the live bot, with one grid pass per bar (at its open):
+      - Levels are linspace(low, high, levels) on integer ticks. A level without an
+        order gets one with the side `grid.grid_sides` gives against the current
+        price (NEUTRAL/LONG/SHORT), like every `_maintain_grid` pass; a resting order
+        keeps its side until it fills.
+      - Order size is floor(BASE_ORDER_SIZE * LEVERAGE / level price) lots.
+      - A filled grid order gets a profit-take at fill * (1 +/- PROFIT_PER_GRID%),
+        rounded to the tick, and its level is refilled at once (the engine refills
+        it on the fill), i.e. from the next bar.
+      - When the price reaches a stop with exposure on that side, everything is
+        closed at the stop price and the run ends (the live bot pauses the symbol).
+
+    Differences left: fills and refills happen at bar granularity, and each
+    profit-take closes its own lot (live profit-takes are reduce-only on the net
+    position, so with longs and shorts open at once some of them can be clipped).
+
+    Each level is simulated as a whole: the bars that touch its prices are found
+    with NumPy, then the fills are walked with one searchsorted each.
+    """
+    ts, open_, high, low, close = _as_arrays(ohlcv)
+    n = len(close)
+    if n == 0:
+        raise ValueError("No bars to backtest")
+
+    low_price, high_price, levels = config['GRID_RANGE_LOW'], config['GRID_RANGE_HIGH'], config['GRID_LEVELS']
+    if not all([low_price, high_price, levels]):
+        raise ValueError("GRID_RANGE_LOW, GRID_RANGE_HIGH and GRID_LEVELS are required")
+    increment = increment or 10.0 ** -8
+    margin = config.get('PROFIT_PER_GRID', 0) / 100
+
+    desired = grid.desired_grid(low_price, high_price, levels, increment, open_[0], config.get('GRID_SIDE') or 'NEUTRAL')
+    level_prices = grid.to_prices(desired.ticks, increment)
+    sizes = np.floor(config['BASE_ORDER_SIZE'] * config['LEVERAGE'] / level_prices)
+    open_ticks = grid.to_ticks(open_, increment)
+
+    # --- Per-level fill simulation ---
+    entry_bar, exit_bar, entry_px, exit_px, qty, direction = [], [], [], [], [], []
+    for i, tick in enumerate(desired.ticks):
+        if sizes[i] <= 0:
+            continue
+        entry = level_prices[i]
+        # Side of the level at each bar's pass
+        sides = grid.grid_sides(np.full(n, tick), open_ticks, config.get('GRID_SIDE') or 'NEUTRAL')
+        fills, fill_sides = _level_fills(sides, {
+            grid.SIDE_BUY: np.flatnonzero(low <= entry),
+            grid.SIDE_SELL: np.flatnonzero(high >= entry),
+        })
+        if not len(fills):
+            continue
+        exits = np.full(len(fills), -1, dtype=np.int64)
+        targets = np.zeros(len(fills))
+        for side in (grid.SIDE_BUY, grid.SIDE_SELL):
+            mine = fill_sides == side
+            if not mine.any():
+                continue
+            target = float(grid.to_prices(grid.to_ticks(entry * (1 + margin * side), increment), increment))
+            exit_hits = np.flatnonzero(high >= target) if side == grid.SIDE_BUY else np.flatnonzero(low <= target)
+            targets[mine] = target
+            if len(exit_hits):
+                # A profit-take needs a later bar than its fill
+                j = np.searchsorted(exit_hits, fills[mine], side='right')
+                exits[mine] = np.where(j < len(exit_hits), exit_hits[np.minimum(j, len(exit_hits) - 1)], -1)
+        entry_bar.append(fills)
+        exit_bar.append(exits)
+        entry_px.append(np.full(len(fills), entry))
+        exit_px.append(targets)
+        qty.append(np.full(len(fills), sizes[i]))
+        direction.append(fill_sides)
+
+    cat = lambda parts, dtype: np.concatenate(parts).astype(dtype) if parts else np.array([], dtype=dtype)
+    entry_bar, exit_bar = cat(entry_bar, np.int64), cat(exit_bar, np.int64)
+    entry_px, exit_px = cat(entry_px, np.float64), cat(exit_px, np.float64)
+    qty, direction = cat(qty, np.float64), cat(direction, np.int64)
+    exit_at = np.where(exit_bar < 0, n, exit_bar) # Open cycles hold until the end
+
+    # --- Net position per bar (difference arrays) ---
+    signed = qty * direction
+    pos = np.zeros(n + 1)
+    np.add.at(pos, entry_bar, signed)
+    np.add.at(pos, exit_at, -signed)
+    pos = np.cumsum(pos)[:n]
+
+    # --- Stop loss: first bar beyond a stop with exposure on that side ---
+    stop_low, stop_high = config.get('STOP_LOSS_PRICE'), config.get('STOP_LOSS_PRICE_HIGH')
+    hit = np.zeros(n, dtype=bool)
+    if stop_low:
+        hit |= (pos > 0) & (low <= stop_low)
+    if stop_high:
+        hit |= (pos < 0) & (high >= stop_high)
+    stop_bar = int(np.argmax(hit)) if hit.any() else None
+
+    stopped_cycles = np.zeros(len(entry_bar), dtype=bool)
+    if stop_bar is not None:
+        # The live trigger closes both directions at market
+        stop_price = stop_low if stop_low and (pos[stop_bar] > 0) and low[stop_bar] <= stop_low else stop_high
+        keep = entry_bar <= stop_bar
+        entry_bar, exit_bar, exit_at = entry_bar[keep], exit_bar[keep], exit_at[keep]
+        entry_px, exit_px, qty, direction = entry_px[keep], exit_px[keep], qty[keep], direction[keep]
+        stopped_cycles = exit_at > stop_bar
+        exit_bar = np.where(stopped_cycles, stop_bar, exit_bar)
+        exit_at = np.where(stopped_cycles, stop_bar, exit_at)
+        exit_px = np.where(stopped_cycles, stop_price, exit_px)
+    end = n if stop_bar is None else stop_bar + 1
+
+    closed = exit_bar >= 0
+    signed = qty * direction
+    trade_pnl = np.where(closed, signed * (exit_px - entry_px), 0.0)
+    entry_fees = qty * entry_px * maker_fee
+    exit_fees = np.where(closed, qty * exit_px * np.where(stopped_cycles, taker_fee, maker_fee), 0.0)
+    fees = entry_fees + exit_fees
+
+    # --- Equity curve: realized + unrealized, for the drawdown ---
+    realized = np.zeros(n + 1)
+    np.add.at(realized, entry_bar, -entry_fees)
+    np.add.at(realized, np.where(closed, exit_bar, n), trade_pnl - exit_fees)
+    realized = np.cumsum(realized)[:n]
+
+    open_qty = np.zeros(n + 1)
+    open_cost = np.zeros(n + 1)
+    np.add.at(open_qty, entry_bar, signed)
+    np.add.at(open_qty, exit_at, -signed)
+    np.add.at(open_cost, entry_bar, signed * entry_px)
+    np.add.at(open_cost, exit_at, -signed * entry_px)
+    equity = realized + np.cumsum(open_qty)[:n] * close - np.cumsum(open_cost)[:n]
+    equity = equity[:end]
+    drawdown = np.maximum.accumulate(np.maximum(equity, 0.0)) - equity
+
+    still_open = ~closed
+    final_price = close[end - 1]
+    unrealized = float(np.sum(signed[still_open] * (final_price - entry_px[still_open])))
+
+    result = {
+        'bars': int(end),
+        'levels': int(np.count_nonzero(desired.sides)),
+        'fills': int(len(entry_bar) + np.count_nonzero(closed)),
+        'buy_fills': int(np.count_nonzero(direction > 0) + np.count_nonzero(closed & (direction < 0))),
+        'sell_fills': int(np.count_nonzero(direction < 0) + np.count_nonzero(closed & (direction > 0))),
+        'round_trips': int(np.count_nonzero(closed & ~stopped_cycles)),
+        'gross_pnl': float(trade_pnl.sum()),
+        'fees': float(fees.sum()),
+        'realized_pnl': float(trade_pnl.sum() - fees.sum()),
+        'unrealized_pnl': unrealized,
+        'net_pnl': float(trade_pnl.sum() - fees.sum() + unrealized),
+        'max_drawdown': float(drawdown.max()) if len(drawdown) else 0.0,
+        'open_position': float(signed[still_open].sum()),
+        'stopped': stop_bar is not None,
+        'stop_time': float(ts[stop_bar]) if stop_bar is not None else None,
+    }
+    if keep_equity:
+        result['equity'] = equity
+    return result
+
+def run_backtest_ticks(prices, config, timestamps=None, **kwargs):
+    """Same rules over trade ticks: each tick is a bar with high = low = close = price."""
+    prices = np.asarray(prices, dtype=np.float64)
+    data = {'close': prices}
+    if timestamps is not None:
+        data['timestamp'] = timestamps
+    return run_backtest(data, config, **kwargs)
+
+def load_ohlcv(path):
+    """Loads OHLCV bars from a CSV with timestamp, open, high, low, close, volume columns."""
+    df = pd.read_csv(path)
+    return df.sort_values('timestamp').reset_index(drop=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the grid over historical OHLCV bars (CSV).")
+    parser.add_argument('csv', help="CSV with timestamp, open, high, low, close, volume")
+    parser.add_argument('--symbol', default=None, help="Use the grid config of this symbol from the DB")
+    parser.add_argument('--increment', type=float, default=None, help="Exchange price increment")
+    parser.add_argument('--low', type=float)
+    parser.add_argument('--high', type=float)
+    parser.add_argument('--levels', type=int)
+    parser.add_argument('--side')
+    parser.add_argument('--size', type=float, help="BASE_ORDER_SIZE (USDT per level)")
+    parser.add_argument('--leverage', type=int)
+    parser.add_argument('--profit', type=float, help="PROFIT_PER_GRID (%%)")
+    parser.add_argument('--stop-low', type=float)
+    parser.add_argument('--stop-high', type=float)
+    args = parser.parse_args()
+
+    from db_manager import DatabaseManager
+    config = DatabaseManager().get_grid_config(args.symbol)
+    overrides = {
+        'GRID_RANGE_LOW': args.low, 'GRID_RANGE_HIGH': args.high, 'GRID_LEVELS': args.levels,
+        'GRID_SIDE': args.side, 'BASE_ORDER_SIZE': args.size, 'LEVERAGE': args.leverage,
+        'PROFIT_PER_GRID': args.profit, 'STOP_LOSS_PRICE': args.stop_low, 'STOP_LOSS_PRICE_HIGH': args.stop_high,
+    }
+    config.update({k: v for k, v in overrides.items() if v is not None})
+
+    bars = load_ohlcv(args.csv)
+    started = time.perf_counter()
+    result = run_backtest(bars, config, increment=args.increment)
+    print(f"📈 Backtest of {len(bars)} bars in {time.perf_counter() - started:.2f}s")
+    print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+DEFAULT_OUTPUT = 'bench_results.json'
+DEFAULT_BASELINE = 'bench_baseline.json'
+DEFAULT_THRESHOLD = 1.25 # A case is a regression when its median is 25% slower than the baseline
+SYMBOL = 'BTC/USDT:USDT'
+
+CASES = [] # (name, setup, fn, repeat)
+
+
+def case(name, repeat=20, setup=None):
+    """Registers a benchmark. `setup()` runs before every repetition, outside the timing."""
+    def register(fn):
+        CASES.append((name, setup, fn, repeat))
+        return fn
+    return register
+
+def run_case(setup, fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        started = time.perf_counter()
+        fn(state) if setup else fn()
+        timings.append(time.perf_counter() - started)
+    return {'median': statistics.median(timings), 'min': min(timings), 'repeat': repeat}
+
+
+# --- Fixtures ---
+
+def make_klines(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 65000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    spread = np.abs(rng.normal(0, 0.001, n)) * close
+    return pd.DataFrame({
+        'timestamp': np.arange(n) * 300_000.0,
+        'open': np.roll(close, 1),
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.uniform(1, 100, n),
+    })
+
+def grid_settings(db, price, levels=100):
+    for key, value in {
+        'GRID_RANGE_LOW': price * 0.95, 'GRID_RANGE_HIGH': price * 1.05, 'GRID_LEVELS': levels,
+        'GRID_SIDE': 'NEUTRAL', 'BASE_ORDER_SIZE': 2000, 'LEVERAGE': 10, 'PROFIT_PER_GRID': 0.5,
+    }.items():
+        db.set_setting(key, value)
+
+
+# --- Cases ---
+
+def register_cases(quick=False):
+    import technical_analysis as ta
+    from db_manager import DatabaseManager
+    from mock_connector import MockKuCoinConnector
+    from strategist import Strategist
+    from executioner import Executioner
+    import synthetic_data
+
+    tmp = tempfile.mkdtemp(prefix='manu_bench_')
+    repeat = 5 if quick else 20
+
+    # technical_analysis, every function at several series lengths
+    book = {'bids': [[65000 - i, 1.0 + i] for i in range(50)], 'asks': [[65001 + i, 1.5] for i in range(50)]}
+    for n in ((100, 1000) if quick else (100, 1000, 10_000)):
+        df = make_klines(n)
+        for fn in (ta.calculate_atr, ta.calculate_rsi, ta.calculate_stoch_rsi, ta.calculate_macd,
+                   ta.calculate_bollinger_bands, ta.calculate_ema, ta.calculate_adx, ta.analyze_trend_structure):
+            case(f"ta.{fn.__name__}[{n}]", repeat)(lambda fn=fn, df=df: fn(df))
+        arrays = {c: df[c].to_numpy() for c in ('high', 'low', 'close')}
+        case(f"ta.compute_indicator_bundle[{n}]", repeat)(lambda arrays=arrays: ta.compute_indicator_bundle(arrays))
+    case("ta.calculate_order_imbalance", repeat)(lambda: ta.calculate_order_imbalance(book))
+
+    # Strategist: a full grid pass against the paper exchange
+    db = DatabaseManager(os.path.join(tmp, 'grid.db'))
+    exchange = MockKuCoinConnector(seed=1, install_clock=False)
+    price = exchange.get_ticker_price(SYMBOL)
+    grid_settings(db, price)
+    strategist = Strategist(exchange, {}, db)
+
+    def fresh_book():
+        exchange.cancel_all_orders(SYMBOL)
+    case("strategist.maintain_grid[build 100 levels]", repeat, setup=fresh_book)(lambda _: strategist._maintain_grid(SYMBOL))
+    case("strategist.maintain_grid[steady 100 levels]", repeat)(lambda: strategist._maintain_grid(SYMBOL))
+
+    # Executioner: handle a batch of new fills (fresh, unclaimed fills every run)
+    def fills_setup(count=50):
+        run_db = DatabaseManager(os.path.join(tmp, f'fills_{time.perf_counter_ns()}.db'))
+        run_db.set_setting('PROFIT_PER_GRID', 0.5)
+        ex = MockKuCoinConnector(price_path=[100.0] * 2, install_clock=False)
+        ex.get_ticker_price(SYMBOL)
+        ex._fills = [{
+            'tradeId': f"t{i}", 'symbol': SYMBOL, 'side': 'buy', 'price': 99.0, 'size': 1.0, 'value': 99.0,
+            'fee': 0.0, 'feeCurrency': 'USDT', 'timestamp': time.time() + i * 1e-3, 'orderId': f"o{i}",
+            'tradeType': 'trade', 'liquidity': 'maker'
+        } for i in range(count)]
+        executioner = Executioner(ex, {}, run_db)
+        executioner.dedup.warm_up(SYMBOL)
+        executioner.dedup._hwm[SYMBOL] = 0 # Every fill is new
+        return executioner
+    case("executioner.process_grid_fills[50 fills]", max(3, repeat // 4), setup=fills_setup)(
+        lambda executioner: executioner._process_grid_fills(SYMBOL))
+
+    # DatabaseManager throughput
+    writes = 200 if quick else 1000
+    def db_setup():
+        return DatabaseManager(os.path.join(tmp, f'db_{time.perf_counter_ns()}.db'))
+    def write_fills(run_db):
+        for i in range(writes):
+            run_db.save_fill({'tradeId': f"w{i}", 'symbol': SYMBOL, 'side': 'buy', 'price': 1.0, 'size': 1.0,
+                              'value': 1.0, 'fee': 0.0, 'feeCurrency': 'USDT', 'timestamp': time.time(),
+                              'orderId': 'o', 'tradeType': 'trade'})
+    def write_logs(run_db):
+        for i in range(writes):
+            run_db.log("Bench", f"line {i}", "INFO")
+    case(f"db.save_fill[{writes}]", 3, setup=db_setup)(write_fills)
+    case(f"db.log[{writes}]", 3, setup=db_setup)(write_logs)
+
+    # Read paths and API endpoints over a seeded large DB
+    import app as webapp
+    big_path = os.path.join(tmp, 'big.db')
+    synthetic_data.generate(big_path, fills=20_000 if quick else 200_000, days=365, logs_per_fill=1, seed=0)
+    big = DatabaseManager(big_path)
+    webapp.db = big
+    client = webapp.app.test_client()
+    case("db.get_history_fills[200]", repeat)(lambda: big.get_history_fills(limit=200))
+    case("db.get_recent_logs[50]", repeat)(lambda: big.get_recent_logs(50))
+    for url in ('/api/stats', '/api/logs', '/api/history', '/api/history?days=365'):
+        case(f"api.GET {url}", repeat)(lambda url=url: client.get(url))
+
+
+# --- Runner ---
+
+def compare(results, baseline, threshold):
+    """Returns (name, baseline median, current median, ratio) for every case slower than threshold."""
+    regressions = []
+    for name, result in results['cases'].items():
+        base = baseline.get('cases', {}).get(name)
+        if base and base['median'] > 0:
+            ratio = result['median'] / base['median']
+            if ratio > threshold:
+                regressions.append((name, base['median'], result['median'], ratio))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks of the bot's hot paths.")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--filter', default='*', help="Glob on case names, e.g. 'ta.*'")
+    parser.add_argument('--quick', action='store_true', help="Smaller inputs and fewer repetitions")
+    args = parser.parse_args()
+
+    register_cases(quick=args.quick)
+    results = {
+        'meta': {'timestamp': time.time(), 'python': platform.python_version(), 'machine': platform.machine(),
+                 'numpy': np.__version__, 'pandas': pd.__version__, 'quick': args.quick},
+        'cases': {},
+    }
+    for name, setup, fn, repeat in CASES:
+        if not fnmatch.fnmatch(name, args.filter):
+            continue
+        results['cases'][name] = result = run_case(setup, fn, repeat)
+        print(f"⏱️ {name:<50} median {result['median'] * 1000:>10.3f} ms | min {result['min'] * 1000:>10.3f} ms")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results saved to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, base, current, ratio in regressions:
+            print(f"🐢 REGRESSION {name}: {base * 1000:.3f} ms -> {current * 1000:.3f} ms (x{ratio:.2f})")
+        if regressions:
+            raise SystemExit(1)
+        print(f"✅ No regressions against {args.baseline} (threshold x{args.threshold})")
+
+if __name__ == '__main__':
+    main()
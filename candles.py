@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import deque
+import pandas as pd
+from autorange import TIMEFRAME_SECONDS
+
+BASE_TIMEFRAME = '1m'
+DEFAULT_TIMEFRAMES = ('5m', '15m', '1h', '4h', '1d')
+DEFAULT_HISTORY = 500 # Bars kept per timeframe (the most KuCoin returns per kline request)
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+class CandleAggregator:
+    """
+    One 1-minute base series per symbol, from which the higher timeframes are derived.
+
+    Every base candle (closed or still forming) is folded into the last bar of each
+    timeframe in place: high/low widen, close moves, and the volume grows by what the
+    base candle added since its previous snapshot. Once a timeframe is seeded, keeping
+    it current costs no request of its own, and all timeframes agree with each other.
+
+    A timeframe is seeded from the exchange the first time it is asked for (its closed
+    history cannot be rebuilt from a few hundred minutes). Its forming bar is rebuilt
+    from the base series when that covers the bar, otherwise the exchange's bar is the
+    starting point. After a gap longer than the base history the symbol is seeded again.
+
+    get_historical_data() has the connector's signature, so the aggregator can stand in
+    for the exchange wherever only candles are read (AutoRanger). Callbacks registered
+    with subscribe() hear `(symbol, timeframe)` whenever a bar of that timeframe closes
+    or the timeframe is seeded again.
+    """
+
+    def __init__(self, exchange, history=DEFAULT_HISTORY, base_history=DEFAULT_HISTORY):
+        self.exchange = exchange
+        self.history = history
+        self.base_history = base_history
+        self.base_ms = TIMEFRAME_SECONDS[BASE_TIMEFRAME] * 1000
+        self.base = {} # symbol -> deque of [timestamp, open, high, low, close, volume], last one possibly forming
+        self.bars = {} # symbol -> {timeframe: deque of bars}
+        self._synced = {} # symbol -> time of the last base request
+        self._locks = {}
+        self._listeners = []
+
+    def _lock(self, symbol):
+        return self._locks.setdefault(symbol, threading.Lock())
+
+    def subscribe(self, callback):
+        """callback(symbol, timeframe) runs under the symbol's lock: it must not read candles back."""
+        self._listeners.append(callback)
+
+    def _notify(self, symbol, timeframe):
+        for callback in self._listeners:
+            callback(symbol, timeframe)
+
+    # --- Folding ---
+
+    def _fold(self, symbol, bar):
+        """Folds a base candle snapshot into the base series and every seeded timeframe."""
+        base = self.base[symbol]
+        added = bar[5]
+        if base and base[-1][0] == bar[0]:
+            added -= base[-1][5] # Same candle, newer snapshot
+            base[-1] = bar
+        elif not base or bar[0] > base[-1][0]:
+            base.append(bar)
+        else:
+            return # Older than what we have
+
+        for timeframe, bars in self.bars[symbol].items():
+            tf_ms = TIMEFRAME_SECONDS[timeframe] * 1000
+            if self._fold_into(bars, bar[0] - bar[0] % tf_ms, bar, added):
+                self._notify(symbol, timeframe) # The previous bar closed
+
+    @staticmethod
+    def _fold_into(bars, bucket, bar, added):
+        """
+        Updates the bar of `bucket` in place (`added` = volume the snapshot adds), or opens
+        it. Returns True when a new bar was opened after an existing one.
+        """
+        last = bars[-1] if bars else None
+        if last is not None and last[0] == bucket:
+            last[2] = max(last[2], bar[2])
+            last[3] = min(last[3], bar[3])
+            last[4] = bar[4]
+            last[5] += added
+        elif last is None or bucket > last[0]:
+            bars.append([bucket, bar[1], bar[2], bar[3], bar[4], bar[5]])
+            return last is not None
+        return False
+
+    @staticmethod
+    def _rows(df):
+        if df is None or df.empty:
+            return []
+        return [[float(v) for v in row] for row in df[COLUMNS].itertuples(index=False)]
+
+    # --- Seeding ---
+
+    def _seed_base(self, symbol, now):
+        self.base[symbol] = deque(self._rows(self.exchange.get_historical_data(
+            symbol, timeframe=BASE_TIMEFRAME, limit=self.base_history)), maxlen=self.base_history)
+        self.bars.setdefault(symbol, {})
+        self._synced[symbol] = now
+
+    def _seed(self, symbol, timeframe):
+        rows = self._rows(self.exchange.get_historical_data(symbol, timeframe=timeframe, limit=self.history))
+        base = self.base[symbol]
+        tf_ms = TIMEFRAME_SECONDS[timeframe] * 1000
+        if base:
+            forming = base[-1][0] - base[-1][0] % tf_ms
+            rows = [r for r in rows if r[0] <= forming]
+            if base[0][0] <= forming:
+                # The base covers the whole forming bar: rebuild it from there
+                rows = [r for r in rows if r[0] < forming]
+                bars = self.bars[symbol][timeframe] = deque(rows, maxlen=self.history)
+                for bar in base:
+                    if bar[0] >= forming:
+                        self._fold_into(bars, forming, bar, bar[5])
+                self._notify(symbol, timeframe)
+                return
+        self.bars[symbol][timeframe] = deque(rows, maxlen=self.history)
+        self._notify(symbol, timeframe)
+
+    # --- Sync ---
+
+    def sync(self, symbol, now=None):
+        """Fetches the base candles since the last sync (one request) and folds them in."""
+        now = now or time.time()
+        with self._lock(symbol):
+            self._sync(symbol, now)
+
+    def _sync(self, symbol, now):
+        base = self.base.get(symbol)
+        if not base:
+            self._seed_base(symbol, now)
+            return
+        missed = int(now * 1000 - base[-1][0]) // self.base_ms + 2
+        rows = self._rows(self.exchange.get_historical_data(
+            symbol, timeframe=BASE_TIMEFRAME, limit=min(missed, self.base_history)))
+        self._synced[symbol] = now
+        if not rows:
+            return
+        if rows[0][0] > base[-1][0]:
+            # Longer gap than one request covers: the in-place bars would miss candles
+            timeframes = list(self.bars[symbol])
+            self._seed_base(symbol, now)
+            for timeframe in timeframes:
+                self._seed(symbol, timeframe)
+            return
+        for row in rows:
+            if row[0] >= base[-1][0]:
+                self._fold(symbol, row)
+
+    def warm_up(self, symbol, timeframes=DEFAULT_TIMEFRAMES, now=None):
+        """Seeds the base series and `timeframes` of a symbol up front."""
+        now = now or time.time()
+        with self._lock(symbol):
+            if not self.base.get(symbol):
+                self._seed_base(symbol, now)
+            for timeframe in timeframes:
+                if timeframe not in self.bars[symbol]:
+                    self._seed(symbol, timeframe)
+
+    def _series(self, symbol, timeframe, now):
+        """Bars of `timeframe` (caller holds the lock), after syncing the base if a base candle closed."""
+        base_s = self.base_ms // 1000
+        if not self.base.get(symbol):
+            self._seed_base(symbol, now)
+        elif int(now) // base_s > int(self._synced[symbol]) // base_s:
+            self._sync(symbol, now)
+        if timeframe == BASE_TIMEFRAME:
+            return self.base[symbol]
+        if timeframe not in self.bars[symbol]:
+            self._seed(symbol, timeframe)
+        return self.bars[symbol][timeframe]
+
+    def get_historical_data(self, symbol, timeframe='5m', limit=100, now=None):
+        """
+        Last `limit` candles of `timeframe`, forming one included, as the connector returns
+        them. The base is synced when a base candle closed since the last request.
+        """
+        now = now or time.time()
+        if timeframe not in TIMEFRAME_SECONDS:
+            timeframe = '5m'
+        with self._lock(symbol):
+            rows = list(self._series(symbol, timeframe, now))
+        return pd.DataFrame(rows[-limit:], columns=COLUMNS)
+
+    def last_closed(self, symbol, timeframe, now=None):
+        """Open timestamp (ms) of the newest closed candle of `timeframe`, None if there is none."""
+        now = now or time.time()
+        tf_ms = TIMEFRAME_SECONDS[timeframe] * 1000
+        with self._lock(symbol):
+            for bar in reversed(self._series(symbol, timeframe, now)):
+                if bar[0] + tf_ms <= now * 1000:
+                    return bar[0]
+        return None
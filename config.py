@@ -23,9 +23,30 @@ DEFAULT_GRID_LEVELS = 10
 DEFAULT_GRID_SIDE = 'NEUTRAL' # Can be 'LONG', 'SHORT', or 'NEUTRAL'
 DEFAULT_PROFIT_PER_GRID = 0.5 # Profit per grid line in percentage (e.g., 0.5%)
 
+# Auto-range: derive range and spacing from ATR/Bollinger (GRID_LEVELS becomes the maximum)
+DEFAULT_GRID_AUTO_RANGE = False
+DEFAULT_AUTO_RANGE_TIMEFRAME = '15m' # Candles used for ATR/Bollinger, recomputed on each close
+DEFAULT_AUTO_RANGE_SPACING_ATR = 0.5 # Level spacing as a fraction of the ATR
+DEFAULT_AUTO_RANGE_BB_STD = 2 # Bollinger width used as range
+
+# Contract scanner: ranks every USDT-M perpetual as a grid candidate
+DEFAULT_SCANNER_ENABLED = False # Opt-in: it spends part of the request budget of the live grids
+DEFAULT_SCANNER_TIMEFRAME = '15m' # Candles scored, refreshed once per close
+
 # Risk Management
 DEFAULT_STOP_LOSS_PRICE = 58000 # A hard stop loss price below the grid range
+DEFAULT_STOP_LOSS_PRICE_HIGH = 72000 # Hard stop above the grid range, protects short exposure
 
 # Timing
 DEFAULT_STRATEGIST_INTERVAL = 60 # Interval to check and maintain the grid
 DEFAULT_EXECUTION_INTERVAL = 10 # Interval to check for filled orders
+DEFAULT_TICK_INTERVAL = 1 # Interval of the ticker feed driving the event engine
+# Adaptive polling: the ticker feed tightens near grid levels/stops and when volatility
+# spikes, and backs off mid-cell; fill polls back off while no level is crossed
+DEFAULT_ADAPTIVE_POLLING = True
+DEFAULT_TICK_INTERVAL_MIN = 0.25
+DEFAULT_TICK_INTERVAL_MAX = 5
+DEFAULT_EXECUTION_INTERVAL_MIN = 2 # DEFAULT_EXECUTION_INTERVAL is the upper bound
+
+# Concurrency
+DEFAULT_GRID_WORKERS = 8 # Worker threads shared by all grids (one lane per symbol)
@@ -1,39 +1,27 @@
 
 import logging
-import pandas as pd
 import time
 import uuid
-from kucoin_universal_sdk.api.client import DefaultClient
-from kucoin_universal_sdk.model.client_option import ClientOptionBuilder
-from kucoin_universal_sdk.model.transport_option import TransportOptionBuilder
-from kucoin_universal_sdk.model.constants import GLOBAL_API_ENDPOINT, GLOBAL_FUTURES_API_ENDPOINT
-
-# Models - CORRECTED IMPORTS based on SDK structure
-from kucoin_universal_sdk.generate.futures.market.model_get_ticker_req import GetTickerReqBuilder
-from kucoin_universal_sdk.generate.futures.market.model_get_klines_req import GetKlinesReqBuilder
-from kucoin_universal_sdk.generate.futures.market.model_get_part_order_book_req import GetPartOrderBookReqBuilder
-from kucoin_universal_sdk.generate.futures.fundingfees.model_get_current_funding_rate_req import GetCurrentFundingRateReqBuilder
-
-from kucoin_universal_sdk.generate.futures.positions.model_get_position_list_req import GetPositionListReqBuilder
-from kucoin_universal_sdk.generate.futures.order.model_cancel_all_orders_v1_req import CancelAllOrdersV1ReqBuilder
-from kucoin_universal_sdk.generate.futures.order.model_cancel_order_by_client_oid_req import CancelOrderByClientOidReqBuilder
-from kucoin_universal_sdk.generate.futures.order.model_cancel_order_by_id_req import CancelOrderByIdReqBuilder
-from kucoin_universal_sdk.generate.futures.order.model_get_order_by_order_id_req import GetOrderByOrderIdReqBuilder
-from kucoin_universal_sdk.generate.futures.order.model_get_order_list_req import GetOrderListReqBuilder
-from kucoin_universal_sdk.generate.futures.order.model_add_order_req import AddOrderReqBuilder
-from kucoin_universal_sdk.generate.futures.positions.model_modify_margin_leverage_req import ModifyMarginLeverageReqBuilder
-
-# NEW IMPORTS FOR STOP ORDERS
-from kucoin_universal_sdk.generate.futures.order.model_get_stop_order_list_req import GetStopOrderListReqBuilder
-from kucoin_universal_sdk.generate.futures.order.model_cancel_all_stop_orders_req import CancelAllStopOrdersReqBuilder
-
-# IMPORTS FOR HISTORY
-from kucoin_universal_sdk.generate.futures.order.model_get_trade_history_req import GetTradeHistoryReqBuilder
-from kucoin_universal_sdk.generate.account.account.model_get_futures_ledger_req import GetFuturesLedgerReqBuilder
+from rate_limiter import RateLimiter, ThrottledApi
+
+# The SDK (every request builder pulls in its whole service package) and pandas are
+# imported where they are first used: importing this module costs nothing, and the
+# client tree loads once, when the connector is created.
+
+DEFAULT_RATE_LIMIT = 10 # REST requests per second shared by all grids
+DEFAULT_RATE_BURST = 20
+BATCH_ORDER_LIMIT = 20 # Max orders per batch add/cancel request
 
 class KuCoinConnector:
-    def __init__(self, api_key, secret, passphrase):
+    def __init__(self, api_key, secret, passphrase, rate_limit=DEFAULT_RATE_LIMIT, rate_burst=DEFAULT_RATE_BURST):
         self.logger = logging.getLogger("KuCoinConnector")
+        # One budget for every thread using this connector (all grids, history sync, ...)
+        self.rate_limiter = RateLimiter(rate_limit, rate_burst)
+
+        from kucoin_universal_sdk.api.client import DefaultClient
+        from kucoin_universal_sdk.model.client_option import ClientOptionBuilder
+        from kucoin_universal_sdk.model.transport_option import TransportOptionBuilder
+        from kucoin_universal_sdk.model.constants import GLOBAL_API_ENDPOINT, GLOBAL_FUTURES_API_ENDPOINT
 
         transport_option = TransportOptionBuilder().build()
         options = ClientOptionBuilder()\
@@ -51,10 +39,11 @@ class KuCoinConnector:
             self.rest = self.client.rest_service()
             self.futures_svc = self.rest.get_futures_service()
 
-            self.market_api = self.futures_svc.get_market_api()
-            self.positions_api = self.futures_svc.get_positions_api()
-            self.order_api = self.futures_svc.get_order_api()
-            self.funding_api = self.futures_svc.get_funding_fees_api()
+            self.market_api = ThrottledApi(self.futures_svc.get_market_api(), self.rate_limiter)
+            self.positions_api = ThrottledApi(self.futures_svc.get_positions_api(), self.rate_limiter)
+            self.order_api = ThrottledApi(self.futures_svc.get_order_api(), self.rate_limiter)
+            self.funding_api = ThrottledApi(self.futures_svc.get_funding_fees_api(), self.rate_limiter)
+            self.account_api = ThrottledApi(self.rest.get_account_service().get_account_api(), self.rate_limiter)
 
             # Cache symbol details on startup
             self._cache_symbol_details()
@@ -82,6 +71,7 @@ class KuCoinConnector:
         return sdk_symbol
 
     def get_ticker_price(self, symbol):
+        from kucoin_universal_sdk.generate.futures.market.model_get_ticker_req import GetTickerReqBuilder
         sdk_symbol = self._to_sdk_symbol(symbol)
         try:
             req = GetTickerReqBuilder().set_symbol(sdk_symbol).build()
@@ -92,7 +82,23 @@ class KuCoinConnector:
         except Exception as e:
             return None
 
+    def get_all_ticker_prices(self):
+        """Last traded price of every contract in a single request: {ccxt_symbol: price}."""
+        try:
+            resp = self.market_api.get_all_tickers()
+            prices = {}
+            if resp.data:
+                for t in resp.data:
+                    if t.price:
+                        prices[self._to_ccxt_symbol(t.symbol)] = float(t.price)
+            return prices
+        except Exception as e:
+            self.logger.error(f"❌ All Tickers Error: {e}")
+            return {}
+
     def get_historical_data(self, symbol, timeframe='5m', limit=100):
+        import pandas as pd
+        from kucoin_universal_sdk.generate.futures.market.model_get_klines_req import GetKlinesReqBuilder
         sdk_symbol = self._to_sdk_symbol(symbol)
         tf_map = {'1m': 1, '5m': 5, '15m': 15, '30m': 30, '1h': 60, '4h': 240, '1d': 1440}
         granularity = tf_map.get(timeframe, 5)
@@ -124,6 +130,7 @@ class KuCoinConnector:
             return pd.DataFrame()
 
     def get_order_book(self, symbol, limit=20):
+        from kucoin_universal_sdk.generate.futures.market.model_get_part_order_book_req import GetPartOrderBookReqBuilder
         sdk_symbol = self._to_sdk_symbol(symbol)
         try:
             req = GetPartOrderBookReqBuilder().set_symbol(sdk_symbol).set_size(str(limit)).build()
@@ -131,6 +138,7 @@ class KuCoinConnector:
         except: return None
 
     def get_funding_rate(self, symbol):
+        from kucoin_universal_sdk.generate.futures.fundingfees.model_get_current_funding_rate_req import GetCurrentFundingRateReqBuilder
         sdk_symbol = self._to_sdk_symbol(symbol)
         try:
             req = GetCurrentFundingRateReqBuilder().set_symbol(sdk_symbol).build()
@@ -141,6 +149,7 @@ class KuCoinConnector:
             return 0.0
 
     def get_24h_stats(self, symbol):
+        from kucoin_universal_sdk.generate.futures.market.model_get_ticker_req import GetTickerReqBuilder
         sdk_symbol = self._to_sdk_symbol(symbol)
         try:
             req = GetTickerReqBuilder().set_symbol(sdk_symbol).build()
@@ -170,6 +179,33 @@ class KuCoinConnector:
         except Exception as e:
             self.logger.error(f"⚠️ FATAL: Error caching symbol details: {e}")
 
+    def get_active_contracts(self):
+        """Open USDT-margined perpetual contracts: {ccxt_symbol: 24h turnover in USDT}."""
+        try:
+            resp = self.market_api.get_all_symbols()
+            contracts = {}
+            if resp.data:
+                for s in resp.data:
+                    status = getattr(s.status, 'value', s.status)
+                    kind = getattr(s.type, 'value', s.type) # FFWCSX = perpetual swap
+                    if s.quote_currency != 'USDT' or s.is_inverse or status != 'Open' or kind != 'FFWCSX':
+                        continue
+                    contracts[self._to_ccxt_symbol(s.symbol)] = float(s.turnover_of24h or 0)
+            return contracts
+        except Exception as e:
+            self.logger.error(f"❌ Active Contracts Error: {e}")
+            return {}
+
+    def get_price_increment(self, symbol):
+        """Returns the tick size of a contract (None if unknown)."""
+        sdk_symbol = self._to_sdk_symbol(symbol)
+
+        if not hasattr(self, 'symbol_details') or sdk_symbol not in self.symbol_details:
+            self._cache_symbol_details() # Attempt to cache if missing
+
+        details = self.symbol_details.get(sdk_symbol)
+        return details['priceIncrement'] if details else None
+
     def round_price(self, symbol, price):
         """Rounds a price to the correct precision for a given symbol."""
         sdk_symbol = self._to_sdk_symbol(symbol)
@@ -194,6 +230,8 @@ class KuCoinConnector:
         return round(price, precision)
 
     def get_all_open_positions(self):
+        """Posizioni aperte; None se la richiesta fallisce (diverso da [] = nessuna posizione)."""
+        from kucoin_universal_sdk.generate.futures.positions.model_get_position_list_req import GetPositionListReqBuilder
         try:
             self._cache_symbol_details()
             req = GetPositionListReqBuilder().set_currency('USDT').build()
@@ -233,9 +271,29 @@ class KuCoinConnector:
             return results
         except Exception as e:
             self.logger.error(f"❌ Error fetching open positions: {e}")
-            return []
+            return None # Sconosciute, non "flat": chi chiama non deve togliere gli stop
+
+    def get_account_balance(self, currency='USDT'):
+        """Futures account overview: equity, available balance, margins and unrealised PnL."""
+        from kucoin_universal_sdk.generate.account.account.model_get_futures_account_req import GetFuturesAccountReqBuilder
+        try:
+            resp = self.account_api.get_futures_account(GetFuturesAccountReqBuilder().set_currency(currency).build())
+            return {
+                'currency': resp.currency or currency,
+                'equity': float(resp.account_equity or 0),
+                'availableBalance': float(resp.available_balance or 0),
+                'marginBalance': float(resp.margin_balance or 0),
+                'positionMargin': float(resp.position_margin or 0),
+                'orderMargin': float(resp.order_margin or 0),
+                'unrealisedPnl': float(resp.unrealised_pnl or 0),
+            }
+        except Exception as e:
+            self.logger.error(f"❌ Error fetching account balance: {e}")
+            return None
 
     def cancel_all_orders(self, symbol):
+        from kucoin_universal_sdk.generate.futures.order.model_cancel_all_orders_v1_req import CancelAllOrdersV1ReqBuilder
+        from kucoin_universal_sdk.generate.futures.order.model_cancel_all_stop_orders_req import CancelAllStopOrdersReqBuilder
         sdk_symbol = self._to_sdk_symbol(symbol)
         try:
             # Cancel Normal Orders
@@ -253,6 +311,7 @@ class KuCoinConnector:
             return False
 
     def cancel_order(self, symbol, order_id, silent=False):
+        from kucoin_universal_sdk.generate.futures.order.model_cancel_order_by_id_req import CancelOrderByIdReqBuilder
         try:
             req = CancelOrderByIdReqBuilder().set_order_id(order_id).build()
             self.order_api.cancel_order_by_id(req)
@@ -263,6 +322,7 @@ class KuCoinConnector:
             return False
 
     def get_order_status(self, symbol, order_id):
+        from kucoin_universal_sdk.generate.futures.order.model_get_order_by_order_id_req import GetOrderByOrderIdReqBuilder
         if not order_id: return 'missing'
         try:
             req = GetOrderByOrderIdReqBuilder().set_order_id(order_id).build()
@@ -271,7 +331,30 @@ class KuCoinConnector:
         except:
             return 'missing'
 
+    def get_order_by_client_oid(self, symbol, client_oid):
+        """
+        Stato di un ordine cercato per client OID: {'id', 'status' ('open'/'done'), 'size',
+        'filledSize', 'price', 'side', 'clientOid'}, None se l'exchange non lo conosce.
+        Gli errori di rete vengono propagati: "non trovato" e "non so" sono diversi.
+        """
+        from kucoin_universal_sdk.generate.futures.order.model_get_order_by_client_oid_req import GetOrderByClientOidReqBuilder
+        req = GetOrderByClientOidReqBuilder().set_client_oid(client_oid).build()
+        o = self.order_api.get_order_by_client_oid(req)
+        if not o or not o.id:
+            return None
+        return {
+            'id': o.id,
+            'status': str(getattr(o.status, 'value', o.status) or '').lower(),
+            'size': float(o.size or 0),
+            'filledSize': float(o.filled_size or 0),
+            'price': float(o.price or 0),
+            'side': getattr(o.side, 'value', o.side),
+            'clientOid': o.client_oid,
+        }
+
     def get_open_orders(self, symbol):
+        from kucoin_universal_sdk.generate.futures.order.model_get_order_list_req import GetOrderListReqBuilder
+        from kucoin_universal_sdk.generate.futures.order.model_get_stop_order_list_req import GetStopOrderListReqBuilder
         sdk_symbol = self._to_sdk_symbol(symbol)
         try:
             # 1. Normal Orders
@@ -291,9 +374,13 @@ class KuCoinConnector:
                         'id': o.id,
                         'symbol': self._to_ccxt_symbol(o.symbol),
                         'status': o.status,
+                        'type': o.type,
                         'side': o.side,
+                        'size': float(o.size or 0),
                         'stopPrice': float(o.stop_price or 0), # Usually None for normal orders
                         'price': float(o.price or 0),
+                        'reduceOnly': bool(o.reduce_only),
+                        'clientOid': o.client_oid,
                         'info': o
                     })
 
@@ -305,9 +392,13 @@ class KuCoinConnector:
                         'id': o.id,
                         'symbol': self._to_ccxt_symbol(o.symbol),
                         'status': o.status,
+                        'type': 'stop', # Conditional orders are never part of the grid
                         'side': o.side,
+                        'size': float(o.size or 0),
                         'stopPrice': float(o.stop_price or 0),
                         'price': float(o.price or 0),
+                        'reduceOnly': bool(o.reduce_only),
+                        'clientOid': o.client_oid,
                         'info': o
                     })
 
@@ -317,6 +408,7 @@ class KuCoinConnector:
             return []
 
     def place_stop_market_order(self, symbol, side, amount, stop_price, stop_dir, margin_mode=None):
+        from kucoin_universal_sdk.generate.futures.order.model_add_order_req import AddOrderReqBuilder
         sdk_symbol = self._to_sdk_symbol(symbol)
         try:
             # Use AddOrderReqBuilder.
@@ -358,6 +450,7 @@ class KuCoinConnector:
         Esegue un ordine MARKET calcolando i lotti corretti.
         amount_usdt: Margine che vuoi investire (es. 10 USDT).
         """
+        from kucoin_universal_sdk.generate.futures.order.model_add_order_req import AddOrderReqBuilder
         sdk_symbol = self._to_sdk_symbol(symbol)
         try:
             # 1. Recupera il prezzo attuale
@@ -406,6 +499,7 @@ class KuCoinConnector:
         Piazza un ordine a mercato diretto (utile per chiusure).
         size: numero di lotti/contratti.
         """
+        from kucoin_universal_sdk.generate.futures.order.model_add_order_req import AddOrderReqBuilder
         sdk_symbol = self._to_sdk_symbol(symbol)
         try:
             req = AddOrderReqBuilder()\
@@ -424,16 +518,18 @@ class KuCoinConnector:
             self.logger.error(f"❌ MARKET ORDER FAIL {symbol}: {e}")
             return None
 
-    def place_limit_order(self, symbol, side, size, price, reduce_only=False):
+    def place_limit_order(self, symbol, side, size, price, reduce_only=False, client_oid=None):
         """
         Piazza un ordine limite a un prezzo specifico.
         size: numero di lotti/contratti.
         price: prezzo limite.
+        client_oid: id scelto dal bot (vedi order_journal.py), generato se assente.
         """
+        from kucoin_universal_sdk.generate.futures.order.model_add_order_req import AddOrderReqBuilder
         sdk_symbol = self._to_sdk_symbol(symbol)
         try:
             req = AddOrderReqBuilder()\
-                .set_client_oid(str(uuid.uuid4()))\
+                .set_client_oid(client_oid or str(uuid.uuid4()))\
                 .set_symbol(sdk_symbol)\
                 .set_side(side)\
                 .set_type('limit')\
@@ -449,11 +545,86 @@ class KuCoinConnector:
             self.logger.error(f"❌ LIMIT ORDER FAIL {symbol} @ {price}: {e}")
             return None
 
-    def get_trade_history(self, symbol, start_at=None, limit=20):
+    def place_limit_orders(self, symbol, orders):
+        """
+        Piazza più ordini limite con il batch endpoint (max 20 per richiesta).
+        orders: list of {'side', 'size', 'price', 'reduce_only' (optional), 'client_oid' (optional)}.
+        Ritorna una lista allineata a `orders`: {'id': ...} oppure None se rifiutato.
+        """
+        from kucoin_universal_sdk.generate.futures.order.model_batch_add_orders_item import BatchAddOrdersItemBuilder
+        from kucoin_universal_sdk.generate.futures.order.model_batch_add_orders_req import BatchAddOrdersReqBuilder
+        sdk_symbol = self._to_sdk_symbol(symbol)
+        results = []
+        for start in range(0, len(orders), BATCH_ORDER_LIMIT):
+            chunk = orders[start:start + BATCH_ORDER_LIMIT]
+            try:
+                items = [
+                    BatchAddOrdersItemBuilder()
+                        .set_client_oid(o.get('client_oid') or str(uuid.uuid4()))
+                        .set_symbol(sdk_symbol)
+                        .set_side(o['side'])
+                        .set_type('limit')
+                        .set_price(str(o['price']))
+                        .set_size(int(o['size']))
+                        .set_reduce_only(o.get('reduce_only', False))
+                        .build()
+                    for o in chunk
+                ]
+                resp = self.order_api.batch_add_orders(BatchAddOrdersReqBuilder().set_items(items).build())
+                data = resp.data or []
+                for o, d in zip(chunk, data):
+                    if d.order_id and d.code in (None, '200000'):
+                        results.append({'id': d.order_id})
+                    else:
+                        self.logger.error(f"❌ BATCH LIMIT REJECTED {symbol} {o['side']} @ {o['price']}: {d.msg}")
+                        results.append(None)
+                results.extend([None] * (len(chunk) - len(data)))
+                self.logger.info(f"✅ BATCH LIMIT {symbol} | {sum(1 for r in results[-len(chunk):] if r)}/{len(chunk)} placed")
+            except Exception as e:
+                self.logger.error(f"❌ BATCH LIMIT FAIL {symbol}: {e}")
+                results.extend([None] * len(chunk))
+        return results
+
+    def cancel_orders(self, symbol, order_ids):
+        """Annulla più ordini per id con il batch endpoint. Ritorna gli id annullati."""
+        from kucoin_universal_sdk.generate.futures.order.model_batch_cancel_orders_req import BatchCancelOrdersReqBuilder
+        canceled = []
+        for start in range(0, len(order_ids), BATCH_ORDER_LIMIT):
+            chunk = list(order_ids[start:start + BATCH_ORDER_LIMIT])
+            try:
+                req = BatchCancelOrdersReqBuilder().set_order_ids_list(chunk).build()
+                resp = self.order_api.batch_cancel_orders(req)
+                for d in resp.data or []:
+                    if d.order_id and d.code in (None, '200', '200000'):
+                        canceled.append(d.order_id)
+                self.logger.info(f"🗑️ Batch canceled {len(chunk)} orders for {symbol}")
+            except Exception as e:
+                self.logger.error(f"⚠️ Batch cancel failed {symbol}: {e}")
+        return canceled
+
+    def amend_orders(self, symbol, amendments):
+        """
+        Sposta ordini esistenti a nuovi prezzi.
+        amendments: list of {'id' (old order), 'side', 'size', 'price' (new)}.
+        KuCoin Futures non ha un endpoint di amend: si usa replace, piazzando prima i
+        nuovi ordini in batch e annullando poi solo i vecchi il cui sostituto è a book,
+        così il book non resta mai vuoto. La priorità in coda non può essere mantenuta.
+        Ritorna (new_orders, canceled): new_orders è allineata ad `amendments`
+        ({'id': nuovo id} oppure None), canceled sono i vecchi id annullati davvero
+        (se l'annullamento fallisce vecchio e nuovo ordine restano entrambi a book).
+        """
+        new_orders = self.place_limit_orders(symbol, amendments)
+        replaced = [a['id'] for a, new in zip(amendments, new_orders) if new]
+        canceled = self.cancel_orders(symbol, replaced) if replaced else []
+        return new_orders, canceled
+
+    def get_trade_history(self, symbol, start_at=None, limit=20, end_at=None, strict=False):
         """
         Recupera lo storico dei fills (esecuzioni) privati.
         Include paginazione automatica per recuperare tutto.
+        strict=True raises on errors instead of returning the pages fetched so far.
         """
+        from kucoin_universal_sdk.generate.futures.order.model_get_trade_history_req import GetTradeHistoryReqBuilder
         sdk_symbol = self._to_sdk_symbol(symbol)
         results = []
         page = 1
@@ -464,6 +635,8 @@ class KuCoinConnector:
                 builder = GetTradeHistoryReqBuilder().set_symbol(sdk_symbol)
                 if start_at:
                     builder.set_start_at(int(start_at * 1000)) # ms
+                if end_at:
+                    builder.set_end_at(int(end_at * 1000))
 
                 builder.set_page_size(page_size)
                 builder.set_current_page(page)
@@ -484,7 +657,7 @@ class KuCoinConnector:
                         'value': float(t.value),
                         'fee': float(t.fee or 0),
                         'feeCurrency': t.fee_currency,
-                        'timestamp': t.trade_time / 1000,
+                        'timestamp': t.trade_time / 1e9, # tradeTime is in nanoseconds
                         'orderId': t.order_id,
                         'tradeType': t.trade_type,
                         'liquidity': t.liquidity
@@ -493,37 +666,39 @@ class KuCoinConnector:
                 if len(resp.items) < page_size:
                     break
 
-                page += 1
-                time.sleep(0.1) # Prevent Rate Limit
+                page += 1 # Pacing is handled by the shared rate limiter
 
             return results
         except Exception as e:
             self.logger.error(f"⚠️ Trade History Error {symbol}: {e}")
+            if strict:
+                raise
             return results
 
-    def get_ledger_history(self, start_at=None):
+    def get_ledger_history(self, start_at=None, end_at=None, strict=False):
         """
         Recupera il registro transazioni (Ledger) per trovare il PnL Realizzato.
         Include paginazione (offset).
+        strict=True raises on errors instead of returning the pages fetched so far.
         """
+        from kucoin_universal_sdk.generate.account.account.model_get_futures_ledger_req import GetFuturesLedgerReqBuilder
         results = []
         offset = 0
         limit = 50 # Max count usually 100?
 
         try:
-            account_svc = self.client.rest_service().get_account_service()
-            account_api = account_svc.get_account_api()
-
             while True:
                 builder = GetFuturesLedgerReqBuilder().set_type('RealisedPNL')
                 if start_at:
                     builder.set_start_at(int(start_at * 1000))
+                if end_at:
+                    builder.set_end_at(int(end_at * 1000))
 
                 builder.set_offset(offset)
                 builder.set_max_count(limit)
 
                 req = builder.build()
-                resp = account_api.get_futures_ledger(req)
+                resp = self.account_api.get_futures_ledger(req)
 
                 if not resp.data_list:
                     break
@@ -541,9 +716,10 @@ class KuCoinConnector:
                     break
 
                 offset += limit
-                time.sleep(0.1)
 
             return results
         except Exception as e:
             self.logger.error(f"⚠️ Ledger History Error: {e}")
+            if strict:
+                raise
             return results
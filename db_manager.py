@@ -6,6 +6,20 @@ from datetime import datetime
 
 DB_PATH = "manu_bot.db"
 
+# Per-symbol grid parameters: grid_configs column -> global setting used as fallback
+GRID_CONFIG_KEYS = {
+    'grid_range_low': 'GRID_RANGE_LOW',
+    'grid_range_high': 'GRID_RANGE_HIGH',
+    'grid_levels': 'GRID_LEVELS',
+    'grid_side': 'GRID_SIDE',
+    'base_order_size': 'BASE_ORDER_SIZE',
+    'leverage': 'LEVERAGE',
+    'profit_per_grid': 'PROFIT_PER_GRID',
+    'stop_loss_price': 'STOP_LOSS_PRICE',
+    'stop_loss_price_high': 'STOP_LOSS_PRICE_HIGH',
+    'auto_range': 'GRID_AUTO_RANGE',
+}
+
 class DatabaseManager:
     def __init__(self, db_path=DB_PATH):
         self.db_path = db_path
@@ -88,9 +102,15 @@ class DatabaseManager:
                 fee_currency TEXT,
                 timestamp REAL,
                 order_id TEXT,
-                trade_type TEXT
+                trade_type TEXT,
+                grid_processed INTEGER DEFAULT 0
             )
         ''')
+        self._ensure_column(cursor, 'history_fills', 'grid_processed', 'INTEGER DEFAULT 0')
+
+        # Older versions stored fill times in micro/milliseconds instead of seconds
+        cursor.execute("UPDATE history_fills SET timestamp = timestamp / 1000000.0 WHERE timestamp > 1e14")
+        cursor.execute("UPDATE history_fills SET timestamp = timestamp / 1000.0 WHERE timestamp > 1e11")
 
         # History Ledger Table (PnL)
         cursor.execute('''
@@ -105,9 +125,106 @@ class DatabaseManager:
             )
         ''')
 
+        # Grid Levels Table (persisted desired-vs-live grid state)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS grid_levels (
+                symbol TEXT,
+                level_idx INTEGER,
+                tick_price INTEGER,
+                price REAL,
+                side TEXT,
+                order_id TEXT,
+                state TEXT,
+                updated_at REAL,
+                PRIMARY KEY (symbol, level_idx)
+            )
+        ''')
+
+        # Grid Configs Table (one grid per symbol, NULL columns fall back to global settings)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS grid_configs (
+                symbol TEXT PRIMARY KEY,
+                enabled INTEGER DEFAULT 1,
+                grid_range_low REAL,
+                grid_range_high REAL,
+                grid_levels INTEGER,
+                grid_side TEXT,
+                base_order_size REAL,
+                leverage INTEGER,
+                profit_per_grid REAL,
+                stop_loss_price REAL,
+                stop_loss_price_high REAL,
+                auto_range INTEGER,
+                updated_at REAL
+            )
+        ''')
+        self._ensure_column(cursor, 'grid_configs', 'stop_loss_price_high', 'REAL')
+        self._ensure_column(cursor, 'grid_configs', 'auto_range', 'INTEGER')
+
+        # Sweep Results Table (parameter sweeps of the backtester, see optimizer.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sweep_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sweep_id TEXT,
+                params TEXT,
+                net_pnl REAL,
+                realized_pnl REAL,
+                fees REAL,
+                max_drawdown REAL,
+                fills INTEGER,
+                round_trips INTEGER,
+                stopped INTEGER,
+                created_at REAL
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sweep_results_rank ON sweep_results (sweep_id, net_pnl)")
+
+        # Scanner Candidates Table (ranked contracts for new grids, see scanner.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scanner_candidates (
+                symbol TEXT PRIMARY KEY,
+                rank INTEGER,
+                score REAL,
+                atr_pct REAL,
+                adx REAL,
+                bb_width REAL,
+                close REAL,
+                turnover REAL,
+                timeframe TEXT,
+                updated_at REAL
+            )
+        ''')
+
+        # Order Journal Table (every limit order intent, written before it is sent, see order_journal.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS order_journal (
+                client_oid TEXT PRIMARY KEY,
+                symbol TEXT,
+                kind TEXT,
+                level_idx INTEGER,
+                side TEXT,
+                size REAL,
+                price REAL,
+                reduce_only INTEGER,
+                order_id TEXT,
+                status TEXT,
+                filled_size REAL DEFAULT 0,
+                created_at REAL,
+                updated_at REAL
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_order_journal_status ON order_journal (symbol, status)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_order_journal_order ON order_journal (order_id)")
+
         conn.commit()
         conn.close()
 
+    def _ensure_column(self, cursor, table, column, declaration):
+        """Adds a column to a table created by an older version of the bot."""
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
     def get_setting(self, key, default=None, type_cast=None):
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -132,7 +249,10 @@ class DatabaseManager:
         cursor = conn.cursor()
 
         val_type = 'str'
-        if isinstance(value, int): val_type = 'int'
+        if value is None: # Stored as JSON null, read back as None (e.g. a disabled stop)
+            val_type = 'json'
+            value = 'null'
+        elif isinstance(value, int): val_type = 'int'
         elif isinstance(value, float): val_type = 'float'
         elif isinstance(value, bool): val_type = 'bool'
         elif isinstance(value, (list, dict)):
@@ -210,6 +330,35 @@ class DatabaseManager:
         conn.close()
 
     def save_fill(self, fill):
+        self.save_fills([fill])
+
+    def save_fills(self, fills):
+        """Upserts a batch of connector fills in one transaction."""
+        if not fills:
+            return
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        # Upsert: the row may already exist (claimed by the grid) with partial data
+        cursor.executemany('''
+            INSERT INTO history_fills
+            (trade_id, symbol, side, price, size, value, fee, fee_currency, timestamp, order_id, trade_type)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(trade_id) DO UPDATE SET
+                value=excluded.value, fee=excluded.fee, fee_currency=excluded.fee_currency,
+                order_id=excluded.order_id, trade_type=excluded.trade_type
+        ''', [(
+            fill['tradeId'], fill['symbol'], fill['side'], fill['price'], fill['size'],
+            fill['value'], fill['fee'], fill['feeCurrency'], fill['timestamp'],
+            fill['orderId'], fill['tradeType']
+        ) for fill in fills])
+        conn.commit()
+        conn.close()
+
+    def claim_fill(self, fill):
+        """
+        Marks a fill as handled by the grid. Returns True only the first time:
+        the fill row is created if needed and its grid_processed flag flipped atomically.
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('''
@@ -218,23 +367,34 @@ class DatabaseManager:
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             fill['tradeId'], fill['symbol'], fill['side'], fill['price'], fill['size'],
-            fill['value'], fill['fee'], fill['feeCurrency'], fill['timestamp'],
-            fill['orderId'], fill['tradeType']
+            fill.get('value'), fill.get('fee'), fill.get('feeCurrency'), fill.get('timestamp'),
+            fill.get('orderId'), fill.get('tradeType')
         ))
+        cursor.execute(
+            "UPDATE history_fills SET grid_processed = 1 WHERE trade_id = ? AND grid_processed = 0",
+            (fill['tradeId'],)
+        )
+        claimed = cursor.rowcount == 1
         conn.commit()
         conn.close()
+        return claimed
 
     def save_ledger_item(self, item):
+        self.save_ledger_items([item])
+
+    def save_ledger_items(self, items):
+        if not items:
+            return
         conn = self.get_connection()
         cursor = conn.cursor()
         # Ledger doesn't have a unique ID in the simple dict, using UNIQUE constraint on fields
-        cursor.execute('''
+        cursor.executemany('''
             INSERT OR IGNORE INTO history_ledger
             (timestamp, amount, type, currency, remark)
             VALUES (?, ?, ?, ?, ?)
-        ''', (
+        ''', [(
             item['timestamp'], item['amount'], item['type'], item['currency'], item['remark']
-        ))
+        ) for item in items])
         conn.commit()
         conn.close()
 
@@ -283,3 +443,256 @@ class DatabaseManager:
         if row:
             return json.loads(row[0])
         return {}
+
+    def save_grid_levels(self, symbol, levels, replace=True):
+        """
+        Persists the grid of a symbol. With replace=True the stored grid is swapped
+        for `levels`, otherwise only the given levels are upserted.
+        levels: list of dicts with level_idx, tick_price, price, side, order_id, state.
+        """
+        now = time.time()
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        if replace:
+            cursor.execute("DELETE FROM grid_levels WHERE symbol = ?", (symbol,))
+        cursor.executemany('''
+            INSERT INTO grid_levels (symbol, level_idx, tick_price, price, side, order_id, state, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(symbol, level_idx) DO UPDATE SET
+                tick_price=excluded.tick_price, price=excluded.price, side=excluded.side,
+                order_id=excluded.order_id, state=excluded.state, updated_at=excluded.updated_at
+        ''', [
+            (symbol, l['level_idx'], l['tick_price'], l['price'], l['side'], l['order_id'], l['state'], now)
+            for l in levels
+        ])
+        conn.commit()
+        conn.close()
+
+    def get_grid_levels(self, symbol):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM grid_levels WHERE symbol = ? ORDER BY level_idx ASC", (symbol,))
+        cols = [description[0] for description in cursor.description]
+        rows = [dict(zip(cols, row)) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+
+    def save_order_intents(self, entries, replace=True):
+        """
+        Journals a batch of order intents (status 'pending') in one transaction.
+        replace=False leaves an existing entry with the same client_oid untouched.
+        """
+        if not entries:
+            return
+        now = time.time()
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany(f'''
+            INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO order_journal
+            (client_oid, symbol, kind, level_idx, side, size, price, reduce_only, order_id, status, filled_size, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+        ''', [
+            (e['client_oid'], e['symbol'], e['kind'], e.get('level_idx'), e['side'], e['size'], e['price'],
+             int(bool(e.get('reduce_only'))), e.get('order_id'), e.get('status', 'pending'), now, now)
+            for e in entries
+        ])
+        conn.commit()
+        conn.close()
+
+    def update_order_entries(self, updates):
+        """updates: list of (client_oid, order_id, status, filled_size); None keeps the stored value."""
+        if not updates:
+            return
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany('''
+            UPDATE order_journal SET order_id = COALESCE(?, order_id), status = COALESCE(?, status),
+                filled_size = COALESCE(?, filled_size), updated_at = ?
+            WHERE client_oid = ?
+        ''', [(order_id, status, filled, time.time(), client_oid) for client_oid, order_id, status, filled in updates])
+        conn.commit()
+        conn.close()
+
+    def set_order_status(self, order_ids, status):
+        """Moves the journal entries of exchange order ids to `status`."""
+        if not order_ids:
+            return
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany(
+            "UPDATE order_journal SET status = ?, updated_at = ? WHERE order_id = ?",
+            [(status, time.time(), oid) for oid in order_ids]
+        )
+        conn.commit()
+        conn.close()
+
+    def add_order_fill(self, order_id, size):
+        """Adds a fill to a journaled order; it becomes 'filled' once the whole size has traded."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE order_journal SET filled_size = filled_size + ?, updated_at = ?,
+                status = CASE WHEN filled_size + ? >= size THEN 'filled' ELSE status END
+            WHERE order_id = ?
+        ''', (size, time.time(), size, order_id))
+        conn.commit()
+        conn.close()
+
+    def get_order_entry(self, client_oid):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM order_journal WHERE client_oid = ?", (client_oid,))
+        row = cursor.fetchone()
+        cols = [description[0] for description in cursor.description]
+        conn.close()
+        return dict(zip(cols, row)) if row else None
+
+    def get_order_entries(self, symbol=None, statuses=None):
+        query, params = "SELECT * FROM order_journal WHERE 1 = 1", []
+        if symbol:
+            query += " AND symbol = ?"
+            params.append(symbol)
+        if statuses:
+            query += f" AND status IN ({', '.join('?' * len(statuses))})"
+            params.extend(statuses)
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(query + " ORDER BY created_at ASC", params)
+        cols = [description[0] for description in cursor.description]
+        rows = [dict(zip(cols, row)) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+
+    def prune_order_journal(self, before, statuses):
+        """Deletes the entries in a terminal `statuses` last updated before `before`."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"DELETE FROM order_journal WHERE updated_at < ? AND status IN ({', '.join('?' * len(statuses))})",
+            [before, *statuses]
+        )
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def save_sweep_results(self, sweep_id, results):
+        """results: list of (params dict, backtest metrics dict)."""
+        now = time.time()
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT INTO sweep_results
+            (sweep_id, params, net_pnl, realized_pnl, fees, max_drawdown, fills, round_trips, stopped, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (sweep_id, json.dumps(params), m['net_pnl'], m['realized_pnl'], m['fees'], m['max_drawdown'],
+             m['fills'], m['round_trips'], int(m['stopped']), now)
+            for params, m in results
+        ])
+        conn.commit()
+        conn.close()
+
+    def get_top_sweep_results(self, sweep_id, limit=10, order_by='net_pnl'):
+        """Best results of a sweep. order_by: 'net_pnl' or 'return_dd' (net PnL / max drawdown)."""
+        order = {
+            'net_pnl': 'net_pnl DESC',
+            'return_dd': 'net_pnl / MAX(max_drawdown, 1e-9) DESC',
+        }[order_by]
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT * FROM sweep_results WHERE sweep_id = ? ORDER BY {order} LIMIT ?", (sweep_id, limit))
+        cols = [description[0] for description in cursor.description]
+        rows = [dict(zip(cols, row)) for row in cursor.fetchall()]
+        conn.close()
+        for row in rows:
+            row['params'] = json.loads(row['params'])
+        return rows
+
+    def save_scanner_candidates(self, candidates, timeframe):
+        """Replaces the ranked candidate list. candidates: list of dicts, best first."""
+        now = time.time()
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM scanner_candidates")
+        cursor.executemany('''
+            INSERT INTO scanner_candidates
+            (symbol, rank, score, atr_pct, adx, bb_width, close, turnover, timeframe, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (c['symbol'], rank, c['score'], c['atr_pct'], c['adx'], c['bb_width'], c['close'], c.get('turnover'), timeframe, now)
+            for rank, c in enumerate(candidates, start=1)
+        ])
+        conn.commit()
+        conn.close()
+
+    def get_scanner_candidates(self, limit=50):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM scanner_candidates ORDER BY rank LIMIT ?", (limit,))
+        cols = [description[0] for description in cursor.description]
+        rows = [dict(zip(cols, row)) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+
+    def save_grid_config(self, symbol, enabled=True, **params):
+        """
+        Creates or updates the grid of a symbol.
+        params: any of the GRID_CONFIG_KEYS columns (e.g. grid_range_low=60000).
+        """
+        unknown = set(params) - set(GRID_CONFIG_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown grid config fields: {sorted(unknown)}")
+
+        cols = ['symbol', 'enabled', 'updated_at'] + list(params)
+        values = [symbol, int(bool(enabled)), time.time()] + list(params.values())
+        updates = ', '.join(f"{c}=excluded.{c}" for c in cols[1:])
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            INSERT INTO grid_configs ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})
+            ON CONFLICT(symbol) DO UPDATE SET {updates}
+        ''', values)
+        conn.commit()
+        conn.close()
+
+    def get_grid_configs(self, enabled_only=True):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        query = "SELECT * FROM grid_configs"
+        if enabled_only:
+            query += " WHERE enabled = 1"
+        cursor.execute(query + " ORDER BY symbol ASC")
+        cols = [description[0] for description in cursor.description]
+        rows = [dict(zip(cols, row)) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+
+    def get_active_symbols(self):
+        """Symbols with an enabled grid. Falls back to the legacy SYMBOLS setting."""
+        configs = self.get_grid_configs(enabled_only=True)
+        if configs:
+            return [c['symbol'] for c in configs]
+        return self.get_setting('SYMBOLS', [])
+
+    def get_grid_config(self, symbol):
+        """
+        Effective grid parameters of a symbol, keyed like the global settings
+        (GRID_RANGE_LOW, ...). Columns left NULL use the global setting.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM grid_configs WHERE symbol = ?", (symbol,))
+        row = cursor.fetchone()
+        cols = [description[0] for description in cursor.description]
+        conn.close()
+        overrides = dict(zip(cols, row)) if row else {}
+
+        config = {'SYMBOL': symbol}
+        for column, setting_key in GRID_CONFIG_KEYS.items():
+            value = overrides.get(column)
+            config[setting_key] = value if value is not None else self.get_setting(setting_key)
+        if config['GRID_SIDE'] is None:
+            config['GRID_SIDE'] = 'NEUTRAL'
+        return config
@@ -0,0 +1,322 @@
+import threading
+import time
+from collections import deque
+from bisect import bisect_left, bisect_right
+import grid
+from autorange import TIMEFRAME_SECONDS
+from config import (DEFAULT_TICK_INTERVAL, DEFAULT_GRID_WORKERS, DEFAULT_AUTO_RANGE_TIMEFRAME, DEFAULT_ADAPTIVE_POLLING,
+                    DEFAULT_TICK_INTERVAL_MIN, DEFAULT_TICK_INTERVAL_MAX, DEFAULT_EXECUTION_INTERVAL, DEFAULT_EXECUTION_INTERVAL_MIN)
+from adaptive_polling import AdaptivePollingScheduler, ExponentialBackoff, nearest_targets, TICK_BUDGET_SHARE
+from events import EventLoop, PriceTick, Fill, OrderAck, SettingsChanged, Timer, set_default_loop
+from scheduler import SymbolScheduler
+from protection import ProtectiveStopManager
+from account_cache import AccountCache
+
+
+class GridCrossingDetector:
+    """
+    Keeps the grid levels in a sorted array and reports, for each new price,
+    exactly the levels the move from the previous price went through.
+    Upward moves report levels in (prev, price], downward moves levels in [price, prev).
+    """
+
+    def __init__(self, levels=()):
+        self.levels = []
+        self.last_price = None
+        self.set_levels(levels)
+
+    def set_levels(self, levels):
+        self.levels = sorted(levels)
+
+    def crossed(self, price):
+        prev, self.last_price = self.last_price, price
+        if prev is None or price == prev or not self.levels:
+            return []
+        if price > prev:
+            return self.levels[bisect_right(self.levels, prev):bisect_right(self.levels, price)]
+        return self.levels[bisect_left(self.levels, price):bisect_left(self.levels, prev)]
+
+    def nearest(self, price):
+        """Returns the grid level closest to `price` (None if the grid is empty)."""
+        if not self.levels:
+            return None
+        i = bisect_left(self.levels, price)
+        candidates = self.levels[max(0, i - 1):i + 1]
+        return min(candidates, key=lambda level: abs(level - price))
+
+
+class TickerFeed:
+    """
+    Polls prices in a background thread and publishes a PriceTick for every symbol
+    whose price changed. With several grids all prices come from one request.
+    With ADAPTIVE_POLLING the interval follows how close the prices are to what
+    `targets(symbol, price)` returns (grid levels, stops), see AdaptivePollingScheduler.
+    """
+
+    def __init__(self, exchange, db_manager, loop, targets=None):
+        self.exchange = exchange
+        self.db = db_manager
+        self.loop = loop
+        self.targets = targets or (lambda symbol, price: [])
+        self.polling = AdaptivePollingScheduler(DEFAULT_TICK_INTERVAL_MIN, DEFAULT_TICK_INTERVAL_MAX)
+        self._running = False
+
+    def start(self):
+        self._running = True
+        threading.Thread(target=self._run, daemon=True, name="TickerFeed").start()
+
+    def stop(self):
+        self._running = False
+
+    def _fetch_prices(self, symbols):
+        if len(symbols) > 1 and hasattr(self.exchange, 'get_all_ticker_prices'):
+            prices = self.exchange.get_all_ticker_prices()
+            return {s: prices.get(s) for s in symbols}
+        return {s: self.exchange.get_ticker_price(s) for s in symbols}
+
+    def _interval(self, prices):
+        if not self.db.get_setting('ADAPTIVE_POLLING', DEFAULT_ADAPTIVE_POLLING):
+            return self.db.get_setting('TICK_INTERVAL', DEFAULT_TICK_INTERVAL)
+        limiter = getattr(self.exchange, 'rate_limiter', None)
+        self.polling.set_bounds(
+            self.db.get_setting('TICK_INTERVAL_MIN', DEFAULT_TICK_INTERVAL_MIN),
+            self.db.get_setting('TICK_INTERVAL_MAX', DEFAULT_TICK_INTERVAL_MAX),
+            limiter.rate * TICK_BUDGET_SHARE if limiter else None,
+        )
+        return self.polling.next_interval(prices, {s: self.targets(s, p) for s, p in prices.items() if p})
+
+    def _run(self):
+        last_prices = {}
+        while self._running:
+            prices = {}
+            try:
+                symbols = self.db.get_active_symbols()
+                prices = self._fetch_prices(symbols)
+                now = time.monotonic()
+                for symbol, price in prices.items():
+                    if price:
+                        self.polling.observe(symbol, price, now)
+                    if price and price != last_prices.get(symbol):
+                        self.loop.publish(PriceTick(symbol, price))
+                        last_prices[symbol] = price
+                interval = self._interval(prices)
+            except Exception as e:
+                print(f"📡 TICKER FEED ERROR: {e}")
+                interval = self.db.get_setting('TICK_INTERVAL', DEFAULT_TICK_INTERVAL)
+            time.sleep(interval)
+
+
+class TradingEngine:
+    """
+    Event-driven replacement of the Strategist/Executioner polling threads.
+    The event loop only routes events; the per-symbol work runs on a bounded
+    worker pool (SymbolScheduler), one lane per symbol, so many grids share
+    one process and one rate-limited connector:
+      - PriceTick: local stop-loss watcher + replenish only the grid levels the move crossed
+      - Fill: profit-take order (Executioner), protective stop re-sync, replenish the filled level
+      - OrderAck: bookkeeping of acknowledged orders
+      - SettingsChanged: rebuild the level arrays and run a full grid pass
+      - Timer: periodic full grid maintenance / fill polling as a safety net,
+        plus a pass on each candle close for auto-range grids
+    """
+
+    def __init__(self, exchange, db_manager, strategist, executioner, loop=None, max_workers=None, clock=None):
+        self.exchange = exchange
+        self.db = db_manager
+        self.strategist = strategist
+        self.executioner = executioner
+        self.shared_state = strategist.shared_state
+        self.loop = loop or EventLoop(clock=clock)
+        self.detectors = {} # symbol -> GridCrossingDetector
+        self.feed = TickerFeed(exchange, db_manager, self.loop, targets=self._poll_targets)
+        self.fill_backoffs = {} # symbol -> ExponentialBackoff of its fill polls
+        self._fill_due = {} # symbol -> time.monotonic() of its next fill poll
+        self._fill_lock = threading.Lock()
+        self.account = AccountCache(exchange, db_manager, clock=clock)
+        self.protection = ProtectiveStopManager(exchange, db_manager, self.shared_state, account=self.account,
+                                                configs=strategist.grid_configs)
+        self.scheduler = SymbolScheduler(
+            max_workers or db_manager.get_setting('GRID_WORKERS', DEFAULT_GRID_WORKERS),
+            on_error=self._on_task_error
+        )
+        self._warmed_up = set()
+
+        strategist.publish = self.loop.publish
+        executioner.publish = self.loop.publish
+
+        self.loop.subscribe(PriceTick, self.on_price_tick)
+        self.loop.subscribe(Fill, self.on_fill)
+        self.loop.subscribe(OrderAck, self.on_order_ack)
+        self.loop.subscribe(SettingsChanged, self.on_settings_changed)
+        self.loop.subscribe(Timer, self.on_timer)
+
+    def start(self):
+        print("⚙️ ENGINE: Online. Mode: EVENT-DRIVEN GRID BOT.")
+        set_default_loop(self.loop)
+
+        # Restore stop-loss pauses that survived a restart
+        for symbol in self.db.get_active_symbols():
+            until = self.db.get_state(f'paused:{symbol}').get('until', 0)
+            if until > time.time():
+                self.shared_state.setdefault('paused_until', {})[symbol] = until
+                self.loop.call_later(until - time.time(), f"resume:{symbol}")
+
+        # Settle the orders journaled before the restart ahead of the first grid pass of each lane
+        for symbol in self.db.get_active_symbols():
+            self.scheduler.submit(symbol, self._reconcile_journal, symbol, key='reconcile')
+
+        self.loop.call_every(lambda: self.db.get_setting('STRATEGIST_INTERVAL', 60), 'grid_maintenance')
+        self.loop.call_every(self._fill_poll_interval, 'fill_poll')
+        # Auto-range grids are re-evaluated right after each candle close
+        candle = self._candle_seconds()
+        self.loop.call_every(self._candle_seconds, 'candle_close', initial_delay=candle - time.time() % candle + 2)
+
+        self.feed.start()
+        self.account.start()
+        thread = threading.Thread(target=self.loop.run, daemon=True, name="Engine")
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.feed.stop()
+        self.account.stop()
+        self.loop.stop()
+        self.scheduler.shutdown(wait=False)
+
+    def is_paused(self, symbol):
+        return self.shared_state.get('paused_until', {}).get(symbol, 0) > time.time()
+
+    def _on_task_error(self, symbol, fn, error):
+        print(f"⚙️ ENGINE ERROR [{symbol}] in {getattr(fn, '__name__', fn)}: {error}")
+        self.db.log("Engine", f"CRITICAL ERROR [{symbol}]: {error}", "ERROR")
+
+    def _candle_seconds(self):
+        timeframe = self.db.get_setting('AUTO_RANGE_TIMEFRAME', DEFAULT_AUTO_RANGE_TIMEFRAME)
+        return TIMEFRAME_SECONDS.get(timeframe, TIMEFRAME_SECONDS[DEFAULT_AUTO_RANGE_TIMEFRAME])
+
+    def _poll_targets(self, symbol, price):
+        """Prices the ticker feed must not step over unseen: the neighbouring grid levels and the stops."""
+        if self.is_paused(symbol):
+            return []
+        return nearest_targets(price, self._detector(symbol).levels, self.protection._stop_prices(symbol))
+
+    def _fill_poll_interval(self):
+        """
+        Period of the 'fill_poll' timer. With ADAPTIVE_POLLING it ticks at
+        EXECUTION_INTERVAL_MIN and each symbol is polled when its own backoff is due.
+        """
+        if not self.db.get_setting('ADAPTIVE_POLLING', DEFAULT_ADAPTIVE_POLLING):
+            return self.db.get_setting('EXECUTION_INTERVAL', DEFAULT_EXECUTION_INTERVAL)
+        return self.db.get_setting('EXECUTION_INTERVAL_MIN', DEFAULT_EXECUTION_INTERVAL_MIN)
+
+    def _fill_poll_due(self, symbol, reset=False):
+        """
+        True when `symbol` should be polled for fills now, and schedules its next poll:
+        the interval backs off from EXECUTION_INTERVAL_MIN up to EXECUTION_INTERVAL while
+        the symbol is quiet. reset=True (crossing, fill) restarts from the minimum.
+        """
+        if not self.db.get_setting('ADAPTIVE_POLLING', DEFAULT_ADAPTIVE_POLLING):
+            return True
+        minimum = self.db.get_setting('EXECUTION_INTERVAL_MIN', DEFAULT_EXECUTION_INTERVAL_MIN)
+        maximum = max(self.db.get_setting('EXECUTION_INTERVAL', DEFAULT_EXECUTION_INTERVAL), minimum)
+        now = time.monotonic()
+        with self._fill_lock:
+            backoff = self.fill_backoffs.setdefault(symbol, ExponentialBackoff(minimum, maximum))
+            backoff.minimum, backoff.maximum = minimum, maximum
+            if reset:
+                backoff.reset()
+            elif now < self._fill_due.get(symbol, 0):
+                return False
+            self._fill_due[symbol] = now + backoff.next()
+        return True
+
+    def _detector(self, symbol):
+        if symbol not in self.detectors:
+            self.detectors[symbol] = GridCrossingDetector()
+        return self.detectors[symbol]
+
+    # --- Per-symbol tasks (run on the worker pool) ---
+
+    def _full_maintenance(self, symbol):
+        self.strategist.update_auto_range(symbol)
+        self._detector(symbol).set_levels(self.strategist.grid_levels(symbol))
+        self.strategist._maintain_grid(symbol)
+        if not self.is_paused(symbol):
+            self.protection.sync(symbol, verify=True)
+
+    def _reconcile_journal(self, symbol):
+        self.strategist.journal.reconcile(self.exchange, symbol)
+
+    def _poll_fills(self, symbol):
+        if symbol not in self._warmed_up:
+            self.executioner._warm_up_processed_fills(symbol)
+            self._warmed_up.add(symbol)
+        for trade in self.executioner.poll_new_fills(symbol):
+            self.loop.publish(Fill.from_trade(trade))
+
+    def _on_tick(self, symbol, price, crossed):
+        if self.protection.check(symbol, price):
+            self.strategist.journal.canceled_all(symbol) # The stop-loss canceled every order
+            pause = self.shared_state['paused_until'][symbol] - time.time()
+            self.loop.call_later(max(0, pause), f"resume:{symbol}")
+            return
+
+        if crossed and not self.is_paused(symbol):
+            self.db.log("Engine", f"{symbol} price {price} crossed {len(crossed)} grid level(s): {crossed}", "DEBUG")
+            # A crossed level has likely filled: look for the fill of this symbol now, then back off again
+            if self.db.get_setting('ADAPTIVE_POLLING', DEFAULT_ADAPTIVE_POLLING):
+                self._fill_poll_due(symbol, reset=True)
+                self.scheduler.submit(symbol, self._poll_fills, symbol, key='fills')
+            self.strategist._maintain_grid(symbol, only_levels=crossed, current_price=price)
+
+    def _on_fill(self, event):
+        self.executioner.handle_fill(event.to_trade())
+        self.account.invalidate() # Exposure changed
+        self._fill_poll_due(event.symbol, reset=True) # Fills tend to cluster: keep polling fast
+        if not self.is_paused(event.symbol):
+            self.protection.sync(event.symbol) # Exposure changed: move the exchange stop
+        level = self._detector(event.symbol).nearest(event.price)
+        increment = self.exchange.get_price_increment(event.symbol)
+        if level is None or not increment or self.is_paused(event.symbol):
+            return
+        if grid.to_ticks(level, increment) == grid.to_ticks(event.price, increment):
+            last_price = self.shared_state.get('last_prices', {}).get(event.symbol)
+            self.strategist._maintain_grid(event.symbol, only_levels=[level], current_price=last_price)
+
+    # --- Handlers (run on the event loop thread) ---
+
+    def on_price_tick(self, event):
+        self.shared_state.setdefault('last_prices', {})[event.symbol] = event.price
+        crossed = self._detector(event.symbol).crossed(event.price)
+        self.scheduler.submit(event.symbol, self._on_tick, event.symbol, event.price, crossed)
+
+    def on_fill(self, event):
+        self.scheduler.submit(event.symbol, self._on_fill, event)
+
+    def on_order_ack(self, event):
+        self.shared_state.setdefault('order_acks', deque(maxlen=500)).append(event)
+        self.db.log("Engine", f"Order ack {event.order_id}: {event.side} {event.size} {event.symbol} @ {event.price}", "DEBUG")
+
+    def on_settings_changed(self, event):
+        self.strategist.grid_configs.on_settings_changed(event.keys)
+        self.db.log("Engine", f"Settings changed: {', '.join(event.keys) or 'all'}. Rebuilding grid levels.", "INFO")
+        for symbol in self.db.get_active_symbols():
+            self.scheduler.submit(symbol, self._full_maintenance, symbol, key='maintain')
+
+    def on_timer(self, event):
+        if event.name == 'grid_maintenance':
+            for symbol in self.db.get_active_symbols():
+                self.scheduler.submit(symbol, self._full_maintenance, symbol, key='maintain')
+        elif event.name == 'candle_close':
+            for symbol in self.db.get_active_symbols():
+                if self.strategist.grid_configs.get(symbol).get('GRID_AUTO_RANGE'):
+                    self.scheduler.submit(symbol, self._full_maintenance, symbol, key='maintain')
+        elif event.name == 'fill_poll':
+            for symbol in self.db.get_active_symbols():
+                if self._fill_poll_due(symbol):
+                    self.scheduler.submit(symbol, self._poll_fills, symbol, key='fills')
+        elif event.name.startswith('resume:'):
+            symbol = event.name.split(':', 1)[1]
+            if not self.is_paused(symbol):
+                self.db.log("Engine", f"Stop-loss pause expired for {symbol}. Resuming grid.", "INFO")
+                self.scheduler.submit(symbol, self._full_maintenance, symbol, key='maintain')
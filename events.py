@@ -0,0 +1,172 @@
+import heapq
+import itertools
+import queue
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+# --- Typed Events ---
+
+@dataclass(frozen=True)
+class PriceTick:
+    symbol: str
+    price: float
+    timestamp: float = field(default_factory=time.time)
+
+@dataclass(frozen=True)
+class Fill:
+    symbol: str
+    trade_id: str
+    side: str
+    price: float
+    size: float
+    order_id: str = None
+    timestamp: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_trade(cls, trade):
+        """Builds a Fill event from a connector `get_trade_history` item."""
+        return cls(
+            symbol=trade['symbol'],
+            trade_id=trade['tradeId'],
+            side=trade['side'],
+            price=float(trade['price']),
+            size=float(trade['size']),
+            order_id=trade.get('orderId'),
+            timestamp=trade.get('timestamp') or time.time()
+        )
+
+    def to_trade(self):
+        """Inverse of `from_trade`, for handlers written against connector dicts."""
+        return {
+            'tradeId': self.trade_id,
+            'symbol': self.symbol,
+            'side': self.side,
+            'price': self.price,
+            'size': self.size,
+            'orderId': self.order_id,
+            'timestamp': self.timestamp
+        }
+
+@dataclass(frozen=True)
+class OrderAck:
+    symbol: str
+    order_id: str
+    side: str
+    price: float
+    size: float
+    reduce_only: bool = False
+    timestamp: float = field(default_factory=time.time)
+
+@dataclass(frozen=True)
+class SettingsChanged:
+    keys: tuple = ()
+    timestamp: float = field(default_factory=time.time)
+
+@dataclass(frozen=True)
+class Timer:
+    name: str
+    timestamp: float = field(default_factory=time.time)
+
+
+class EventLoop:
+    """
+    Single-threaded event loop. Producers (feeds, Flask, handlers) publish events from
+    any thread; handlers run one at a time on the loop thread, in FIFO order.
+    Timers are delivered through the same queue as regular `Timer` events.
+
+    `clock` (default: the `time` module) gives the timers' time base: with the mock's
+    accelerated SimClock, queue waits are real seconds, so they are divided by `clock.speed`.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or time
+        self._speed = getattr(self.clock, 'speed', 1.0)
+        self._queue = queue.Queue()
+        self._handlers = defaultdict(list)
+        self._timers = [] # heap of (due, seq, name, interval)
+        self._timers_lock = threading.Lock()
+        self._seq = itertools.count()
+        self._running = False
+
+    def subscribe(self, event_type, handler):
+        self._handlers[event_type].append(handler)
+
+    def publish(self, event):
+        """Thread-safe: enqueue an event for the loop thread."""
+        self._queue.put(event)
+
+    def call_later(self, delay, name):
+        """Schedules a one-shot `Timer(name)` event."""
+        self._schedule(self.clock.monotonic() + delay, name, None)
+
+    def call_every(self, interval, name, initial_delay=0):
+        """
+        Schedules a recurring `Timer(name)` event.
+        `interval` may be a callable, re-evaluated each time (e.g. reading a DB setting).
+        """
+        self._schedule(self.clock.monotonic() + initial_delay, name, interval)
+
+    def cancel_timer(self, name):
+        with self._timers_lock:
+            self._timers = [t for t in self._timers if t[2] != name]
+            heapq.heapify(self._timers)
+
+    def _schedule(self, due, name, interval):
+        with self._timers_lock:
+            heapq.heappush(self._timers, (due, next(self._seq), name, interval))
+        self._queue.put(None) # Wake up the loop so it recomputes its timeout
+
+    def _fire_due_timers(self):
+        """Moves expired timers into the event queue and returns the wait until the next one."""
+        now = self.clock.monotonic()
+        with self._timers_lock:
+            while self._timers and self._timers[0][0] <= now:
+                _, _, name, interval = heapq.heappop(self._timers)
+                self._queue.put(Timer(name))
+                if interval is not None:
+                    delay = interval() if callable(interval) else interval
+                    heapq.heappush(self._timers, (now + delay, next(self._seq), name, interval))
+            if self._timers:
+                return max(0.0, self._timers[0][0] - now)
+        return None
+
+    def dispatch(self, event):
+        for handler in self._handlers.get(type(event), []):
+            try:
+                handler(event)
+            except Exception as e:
+                print(f"⚙️ EVENT LOOP ERROR in {getattr(handler, '__name__', handler)} for {type(event).__name__}: {e}")
+
+    def run(self):
+        self._running = True
+        while self._running:
+            timeout = self._fire_due_timers()
+            if timeout is not None:
+                timeout /= self._speed
+            try:
+                event = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            if event is not None:
+                self.dispatch(event)
+
+    def stop(self):
+        self._running = False
+        self._queue.put(None)
+
+
+# --- Process-wide default loop ---
+# Lets modules that are not wired to the engine (e.g. the Flask settings page)
+# notify it without importing it.
+
+_default_loop = None
+
+def set_default_loop(loop):
+    global _default_loop
+    _default_loop = loop
+
+def publish(event):
+    if _default_loop is not None:
+        _default_loop.publish(event)
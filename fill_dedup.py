@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CAPACITY = 5000 # Trade IDs kept in memory for the recent window
+DEFAULT_GRACE_SECONDS = 300 # Fills this much older than the high-water mark are still checked
+
+
+class FillDeduplicator:
+    """
+    Decides whether a fill has already been handled by the grid, in constant memory.
+
+    - A per-symbol high-water mark (timestamp of the newest handled fill) is kept in
+      the `state` table: anything older than `hwm - grace` is known to be done.
+    - Fills inside the recent window are checked against a bounded LRU of trade IDs.
+    - The durable answer is the `history_fills` primary key: a fill is claimed by
+      flipping its `grid_processed` flag, which succeeds exactly once across restarts.
+    """
+
+    def __init__(self, db_manager, capacity=DEFAULT_CAPACITY, grace=DEFAULT_GRACE_SECONDS):
+        self.db = db_manager
+        self.capacity = capacity
+        self.grace = grace
+        self._recent = OrderedDict()
+        self._hwm = {} # symbol -> timestamp
+        self._lock = threading.Lock()
+
+    def warm_up(self, symbol):
+        """
+        Loads the high-water mark of a symbol. On the very first start the mark is
+        set to now, so fills that happened before the bot existed are never replayed.
+        """
+        state = self.db.get_state(f'fill_hwm:{symbol}')
+        if state.get('timestamp'):
+            hwm = state['timestamp']
+        else:
+            hwm = time.time()
+            self.db.update_state(f'fill_hwm:{symbol}', {'timestamp': hwm})
+        with self._lock:
+            self._hwm[symbol] = hwm
+        return hwm
+
+    def window_start(self, symbol):
+        """Oldest timestamp that may still hold unprocessed fills."""
+        if symbol not in self._hwm:
+            self.warm_up(symbol)
+        return self._hwm[symbol] - self.grace
+
+    def seen(self, fill):
+        """Cheap check (no DB access) used to filter polled fills."""
+        if fill.get('timestamp', 0) < self.window_start(fill['symbol']):
+            return True
+        with self._lock:
+            return fill['tradeId'] in self._recent
+
+    def claim(self, fill):
+        """
+        Atomically marks a fill as handled. Returns True only for the first caller,
+        even across restarts.
+        """
+        if self.seen(fill):
+            return False
+
+        claimed = self.db.claim_fill(fill)
+        symbol = fill['symbol']
+        with self._lock:
+            self._recent[fill['tradeId']] = True
+            while len(self._recent) > self.capacity:
+                self._recent.popitem(last=False)
+            advanced = fill.get('timestamp', 0) > self._hwm.get(symbol, 0)
+            if advanced:
+                self._hwm[symbol] = fill['timestamp']
+        if advanced:
+            self.db.update_state(f'fill_hwm:{symbol}', {'timestamp': fill['timestamp']})
+        return claimed
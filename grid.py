@@ -0,0 +1,88 @@
+from collections import namedtuple
+from decimal import Decimal
+import numpy as np
+
+# Order sides as small integers, so whole grids can be handled as arrays
+SIDE_NONE = 0
+SIDE_BUY = 1
+SIDE_SELL = -1
+SIDE_NAMES = {SIDE_BUY: 'buy', SIDE_SELL: 'sell', SIDE_NONE: None}
+
+DesiredGrid = namedtuple('DesiredGrid', ['level_idx', 'ticks', 'sides'])
+GridDiff = namedtuple('GridDiff', ['place', 'keep', 'keep_live', 'cancel'])
+
+
+def price_precision(increment):
+    """Number of decimals of a price increment (handles scientific notation like 1e-05)."""
+    return max(0, -Decimal(str(increment)).normalize().as_tuple().exponent)
+
+def to_ticks(prices, increment):
+    """Converts prices to integer multiples of the exchange price increment."""
+    return np.rint(np.asarray(prices, dtype=np.float64) / increment).astype(np.int64)
+
+def to_prices(ticks, increment):
+    """Inverse of `to_ticks`, rounded to the increment precision to drop float noise."""
+    return np.round(np.asarray(ticks, dtype=np.int64) * increment, price_precision(increment))
+
+def grid_sides(ticks, current_tick, side='NEUTRAL'):
+    """
+    Vectorized version of the Strategist side rule:
+    NEUTRAL buys below the price and sells at/above it, LONG only buys below,
+    SHORT only sells above.
+    """
+    ticks = np.asarray(ticks, dtype=np.int64)
+    below = ticks < current_tick
+    if side == 'LONG':
+        return np.where(below, SIDE_BUY, SIDE_NONE).astype(np.int8)
+    if side == 'SHORT':
+        return np.where(ticks > current_tick, SIDE_SELL, SIDE_NONE).astype(np.int8)
+    return np.where(below, SIDE_BUY, SIDE_SELL).astype(np.int8)
+
+def desired_grid(low, high, levels, increment, current_price, side='NEUTRAL'):
+    """
+    Builds the desired grid as integer tick arrays.
+    Levels that collapse onto the same tick (grid denser than the increment) are kept once.
+    """
+    ticks = to_ticks(np.linspace(low, high, levels), increment)
+    ticks, level_idx = np.unique(ticks, return_index=True)
+    sides = grid_sides(ticks, to_ticks(current_price, increment), side)
+    return DesiredGrid(level_idx, ticks, sides)
+
+def reconcile(desired_ticks, live_ticks):
+    """
+    Diffs the desired grid against the live grid orders in one pass.
+
+    Returns index arrays:
+      place     -> desired levels with no live order
+      keep      -> desired levels already covered by a live order
+      keep_live -> for each `keep` entry, the index of the live order covering it
+      cancel    -> live orders off the grid, plus duplicates on the same tick
+    """
+    desired_ticks = np.asarray(desired_ticks, dtype=np.int64)
+    live_ticks = np.asarray(live_ticks, dtype=np.int64)
+
+    # The first order on a tick covers it, any further one is a duplicate
+    uniq, first = np.unique(live_ticks, return_index=True)
+    duplicate = np.ones(len(live_ticks), dtype=bool)
+    duplicate[first] = False
+
+    if len(uniq):
+        pos = np.minimum(np.searchsorted(uniq, desired_ticks), len(uniq) - 1)
+        matched = uniq[pos] == desired_ticks
+    else:
+        pos = np.zeros(len(desired_ticks), dtype=np.int64)
+        matched = np.zeros(len(desired_ticks), dtype=bool)
+
+    if len(desired_ticks):
+        sorted_desired = np.sort(desired_ticks)
+        idx = np.minimum(np.searchsorted(sorted_desired, live_ticks), len(sorted_desired) - 1)
+        wanted = sorted_desired[idx] == live_ticks
+    else:
+        wanted = np.zeros(len(live_ticks), dtype=bool)
+
+    return GridDiff(
+        place=np.flatnonzero(~matched),
+        keep=np.flatnonzero(matched),
+        keep_live=first[pos[matched]],
+        cancel=np.flatnonzero(duplicate | ~wanted)
+    )
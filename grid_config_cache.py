@@ -0,0 +1,54 @@
+import threading
+import time
+
+DEFAULT_MAX_AGE = 60 # Seconds: safety net for a settings change that published no event
+
+
+class GridConfigCache:
+    """
+    In-memory copy of `db.get_grid_config(symbol)` for the tick path (stop watcher,
+    ticker targets, crossing replenishment): one SQLite read per symbol, then
+    dictionary lookups.
+
+    Settings change through the web app, which publishes `SettingsChanged`: the engine
+    calls invalidate() on it (the whole cache, or one symbol for a `grid:<symbol>` key).
+    Entries also expire after `max_age` seconds.
+
+    Returned configs are shared between callers and must not be modified.
+    """
+
+    def __init__(self, db_manager, max_age=DEFAULT_MAX_AGE):
+        self.db = db_manager
+        self.max_age = max_age
+        self._entries = {} # symbol -> (time.monotonic() of the read, config)
+        self._lock = threading.Lock()
+        self._generation = 0 # Bumped by invalidate(): a read that raced with it is not stored
+
+    def get(self, symbol):
+        with self._lock:
+            entry = self._entries.get(symbol)
+            generation = self._generation
+        if entry and time.monotonic() - entry[0] < self.max_age:
+            return entry[1]
+        config = self.db.get_grid_config(symbol)
+        with self._lock:
+            if generation == self._generation:
+                self._entries[symbol] = (time.monotonic(), config)
+        return config
+
+    def invalidate(self, symbol=None):
+        with self._lock:
+            self._generation += 1
+            if symbol is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(symbol, None)
+
+    def on_settings_changed(self, keys):
+        """Drops what a `SettingsChanged` event touched: `grid:<symbol>` keys only their symbol."""
+        symbols = [k.split(':', 1)[1] for k in keys if k.startswith('grid:')]
+        if not keys or len(symbols) < len(keys):
+            self.invalidate() # A global setting: every symbol may fall back on it
+            return
+        for symbol in symbols:
+            self.invalidate(symbol)
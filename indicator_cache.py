@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+import technical_analysis as ta
+
+DEFAULT_CAPACITY = 1000 # Indicator results kept in memory
+DEFAULT_CANDLES = 200 # Closed candles an indicator is computed on
+
+
+class IndicatorCache:
+    """
+    Memoized technical_analysis results, keyed by
+    (symbol, timeframe, indicator, params, candles, last closed candle timestamp).
+
+    Within a bar every read after the first is a dictionary lookup: the key only needs
+    the timestamp of the last closed candle, not the candles themselves. Entries go out
+    in LRU order past `capacity`, and those of a timeframe are dropped as soon as the
+    candle store reports that one of its bars closed.
+
+    Results are shared between callers and must not be modified.
+    """
+
+    def __init__(self, candles, capacity=DEFAULT_CAPACITY):
+        self.candles = candles
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        candles.subscribe(self.invalidate)
+
+    def get(self, symbol, timeframe, indicator, candles=DEFAULT_CANDLES, now=None, **params):
+        """
+        `indicator` is the name of a technical_analysis function taking a DataFrame,
+        e.g. get(symbol, '4h', 'calculate_rsi', period=14). It runs on the last
+        `candles` closed candles; None when no candle has closed yet.
+        """
+        now = now or time.time()
+        closed = self.candles.last_closed(symbol, timeframe, now)
+        if closed is None:
+            return None
+        key = (symbol, timeframe, indicator, tuple(sorted(params.items())), candles, closed)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        df = self.candles.get_historical_data(symbol, timeframe, candles + 1, now=now)
+        df = df[df['timestamp'] <= closed].tail(candles).reset_index(drop=True)
+        value = getattr(ta, indicator)(df, **params)
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, symbol=None, timeframe=None):
+        """Drops the entries of a symbol/timeframe (everything when both are None)."""
+        with self._lock:
+            for key in [k for k in self._entries if (symbol is None or k[0] == symbol) and (timeframe is None or k[1] == timeframe)]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
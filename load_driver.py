@@ -0,0 +1,147 @@
+import argparse
+import base64
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+DEFAULT_ENDPOINTS = ['/api/stats', '/api/logs', '/api/history', '/api/history?days=365']
+DEFAULT_CONCURRENCY = 8
+DEFAULT_DURATION = 30 # Seconds
+PERCENTILES = (50, 90, 95, 99)
+
+
+def summarize(latencies, elapsed):
+    """{'count', 'rps', 'mean', 'p50', ..., 'max'} of a list of latencies in seconds (reported in ms)."""
+    if not latencies:
+        return {'count': 0, 'rps': 0.0}
+    values = np.asarray(latencies) * 1000
+    summary = {'count': len(values), 'rps': len(values) / elapsed if elapsed else 0.0, 'mean': float(values.mean())}
+    for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f'p{p}'] = float(v)
+    summary['max'] = float(values.max())
+    return summary
+
+
+class LoadDriver:
+    """
+    Closed-loop load: `concurrency` workers each send one request, wait for the
+    answer and immediately send the next, cycling through the endpoints, until the
+    duration (or the request budget) runs out. Latencies are kept per endpoint.
+    """
+
+    def __init__(self, base_url, endpoints=None, concurrency=DEFAULT_CONCURRENCY, auth=None, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.endpoints = endpoints or DEFAULT_ENDPOINTS
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.headers = {}
+        if auth:
+            token = base64.b64encode(f"{auth[0]}:{auth[1]}".encode()).decode()
+            self.headers['Authorization'] = f"Basic {token}"
+        self._lock = threading.Lock()
+        self._latencies = {e: [] for e in self.endpoints}
+        self._errors = {e: 0 for e in self.endpoints}
+        self._sent = 0
+
+    def _request(self, endpoint):
+        req = urllib.request.Request(self.base_url + endpoint, headers=self.headers)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                resp.read()
+                ok = resp.status < 400
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return ok, time.perf_counter() - started
+
+    def _worker(self, offset, deadline, max_requests):
+        i = offset
+        while time.perf_counter() < deadline:
+            with self._lock:
+                if max_requests and self._sent >= max_requests:
+                    return
+                self._sent += 1
+            endpoint = self.endpoints[i % len(self.endpoints)]
+            i += 1
+            ok, latency = self._request(endpoint)
+            with self._lock:
+                if ok:
+                    self._latencies[endpoint].append(latency)
+                else:
+                    self._errors[endpoint] += 1
+
+    def run(self, duration=DEFAULT_DURATION, max_requests=None, warmup=0):
+        """Returns {endpoint: summary} plus an 'all' entry. `warmup` seconds of load are discarded first."""
+        if warmup:
+            self._run(warmup, None)
+            self._latencies = {e: [] for e in self.endpoints}
+            self._errors = {e: 0 for e in self.endpoints}
+            self._sent = 0
+        elapsed = self._run(duration, max_requests)
+        report = {}
+        for endpoint in self.endpoints:
+            report[endpoint] = summarize(self._latencies[endpoint], elapsed)
+            report[endpoint]['errors'] = self._errors[endpoint]
+        report['all'] = summarize([l for ls in self._latencies.values() for l in ls], elapsed)
+        report['all']['errors'] = sum(self._errors.values())
+        return report
+
+    def _run(self, duration, max_requests):
+        started = time.perf_counter()
+        deadline = started + duration
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for w in range(self.concurrency):
+                pool.submit(self._worker, w, deadline, max_requests)
+        return time.perf_counter() - started
+
+def serve(db_path, host='127.0.0.1', port=0):
+    """Starts the dashboard on a threaded WSGI server over `db_path`, in a daemon thread. Returns its base URL."""
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    import app as webapp
+    from db_manager import DatabaseManager
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass # One access-log line per request would skew the latencies
+
+    webapp.db = DatabaseManager(db_path)
+    server = make_server(host, port, webapp.app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name='load-server').start()
+    return f"http://{host}:{server.server_port}"
+
+def print_report(report):
+    header = f"{'endpoint':<28}{'count':>8}{'rps':>9}{'mean':>9}" + ''.join(f"{'p' + str(p):>9}" for p in PERCENTILES) + f"{'max':>9}{'err':>6}"
+    print(header)
+    for endpoint, s in report.items():
+        if not s['count']:
+            print(f"{endpoint:<28}{0:>8}{'-':>9}" + ' ' * 9 * (len(PERCENTILES) + 2) + f"{s['errors']:>6}")
+            continue
+        print(f"{endpoint:<28}{s['count']:>8}{s['rps']:>9.1f}{s['mean']:>9.1f}"
+              + ''.join(f"{s[f'p{p}']:>9.1f}" for p in PERCENTILES) + f"{s['max']:>9.1f}{s['errors']:>6}")
+    print("(latencies in ms)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load against the dashboard API, with latency percentiles.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', default='http://127.0.0.1:5000', help="Base URL of a running dashboard")
+    target.add_argument('--serve', metavar='DB', help="Start the dashboard in-process over this database instead")
+    parser.add_argument('--endpoints', default=','.join(DEFAULT_ENDPOINTS))
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION)
+    parser.add_argument('--requests', type=int, default=None, help="Stop after this many requests")
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--user', default=None, help="Basic auth user (for protected endpoints)")
+    parser.add_argument('--password', default=None)
+    args = parser.parse_args()
+
+    base_url = serve(args.serve) if args.serve else args.url
+    auth = (args.user, args.password) if args.user else None
+    driver = LoadDriver(base_url, args.endpoints.split(','), args.concurrency, auth)
+    print(f"🔥 LOAD: {args.concurrency} workers against {base_url} for {args.duration:g}s...")
+    print_report(driver.run(args.duration, args.requests, args.warmup))
+
+if __name__ == '__main__':
+    main()
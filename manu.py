@@ -1,22 +1,17 @@
+from startup import startup # First: the startup timings start here
 import threading
 import time
 import logging
 import os
-from config import *
-from db_manager import DatabaseManager
-from app import app # Flask App
+with startup.phase('import config/db'):
+    from config import *
+    from db_manager import DatabaseManager
+with startup.phase('import web app'):
+    from app import app # Flask App
 
-# --- Dynamic Connector Import based on Environment ---
 IS_TEST_ENV = os.getenv('IS_TEST_ENV', 'false').lower() == 'true'
-if IS_TEST_ENV:
-    from mock_connector import MockKuCoinConnector as KuCoinConnector
-else:
-    from connector_kucoin import KuCoinConnector
-# --- End Dynamic Import ---
-
-from strategist import Strategist
-from executioner import Executioner
-
+# The connector, the trading modules and their pandas/NumPy/SDK dependencies are
+# imported by the bot thread, while the web interface is already serving.
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 
@@ -31,9 +26,22 @@ def init_db_settings(db):
         'GRID_LEVELS': DEFAULT_GRID_LEVELS,
         'GRID_SIDE': DEFAULT_GRID_SIDE,
         'PROFIT_PER_GRID': DEFAULT_PROFIT_PER_GRID,
+        'GRID_AUTO_RANGE': DEFAULT_GRID_AUTO_RANGE,
+        'AUTO_RANGE_TIMEFRAME': DEFAULT_AUTO_RANGE_TIMEFRAME,
+        'AUTO_RANGE_SPACING_ATR': DEFAULT_AUTO_RANGE_SPACING_ATR,
+        'AUTO_RANGE_BB_STD': DEFAULT_AUTO_RANGE_BB_STD,
+        'SCANNER_ENABLED': DEFAULT_SCANNER_ENABLED,
+        'SCANNER_TIMEFRAME': DEFAULT_SCANNER_TIMEFRAME,
         'STOP_LOSS_PRICE': DEFAULT_STOP_LOSS_PRICE,
+        'STOP_LOSS_PRICE_HIGH': DEFAULT_STOP_LOSS_PRICE_HIGH,
         'STRATEGIST_INTERVAL': DEFAULT_STRATEGIST_INTERVAL,
         'EXECUTION_INTERVAL': DEFAULT_EXECUTION_INTERVAL,
+        'TICK_INTERVAL': DEFAULT_TICK_INTERVAL,
+        'ADAPTIVE_POLLING': DEFAULT_ADAPTIVE_POLLING,
+        'TICK_INTERVAL_MIN': DEFAULT_TICK_INTERVAL_MIN,
+        'TICK_INTERVAL_MAX': DEFAULT_TICK_INTERVAL_MAX,
+        'EXECUTION_INTERVAL_MIN': DEFAULT_EXECUTION_INTERVAL_MIN,
+        'GRID_WORKERS': DEFAULT_GRID_WORKERS,
     }
 
     # Clear old AI-related settings
@@ -44,83 +52,142 @@ def init_db_settings(db):
         # Or just let them be, and they won't be used. Let's just initialize the new ones.
         pass
 
+    missing = object() # A setting stored as None (e.g. a disabled stop) is not missing
     for key, val in defaults.items():
-        if db.get_setting(key) is None:
+        if db.get_setting(key, missing) is missing:
             db.set_setting(key, val)
             print(f"⚙️ Initialized default setting: {key}")
 
 def bot_loop(db, exchange):
+    with startup.phase('import trading modules'):
+        from strategist import Strategist
+        from executioner import Executioner
+        from engine import TradingEngine
+
     shared_state = {}
-    strategist = Strategist(exchange, shared_state, db)
-    executioner = Executioner(exchange, shared_state, db)
+    with startup.phase('init engine'):
+        strategist = Strategist(exchange, shared_state, db)
+        executioner = Executioner(exchange, shared_state, db)
 
-    t_strat = threading.Thread(target=strategist.run, daemon=True, name="Strategist")
-    t_exec = threading.Thread(target=executioner.run, daemon=True, name="Executioner")
+        # Strategist and Executioner handlers run on a single event loop.
+        # The mock exchange's clock keeps the engine timers in simulated time.
+        engine = TradingEngine(exchange, db, strategist, executioner, clock=getattr(exchange, 'clock', None))
+        engine.start()
+    startup.mark('trading')
+    startup.report(db)
 
-    t_strat.start()
-    t_exec.start()
+    # The mock exchange keeps its own fills and ledger, so history sync runs in test env too
+    t_sync = threading.Thread(target=history_sync_loop, args=(db, exchange), daemon=True, name="HistorySync")
+    t_sync.start()
 
-    # History sync is disabled in test env to avoid mock complexity
-    if not IS_TEST_ENV:
-        t_sync = threading.Thread(target=history_sync_loop, args=(db, exchange), daemon=True, name="HistorySync")
-        t_sync.start()
+    t_scanner = threading.Thread(target=scanner_loop, args=(db, exchange), daemon=True, name="Scanner")
+    t_scanner.start()
 
     try:
         while True:
             db.update_state('main_loop', {'status': 'running', 'timestamp': time.time()})
             time.sleep(60)
     except KeyboardInterrupt:
+        engine.stop()
         print("\n🛑 SHUTDOWN...")
 
 def history_sync_loop(db, exchange):
     """Background loop to sync Trade History and PnL Ledger from KuCoin."""
     print("📜 HISTORY SYNCHRONIZER STARTED.")
+    from backfill import HistoryBackfill
+    backfill = HistoryBackfill(exchange, db)
     while True:
         try:
-            symbols = db.get_setting('SYMBOLS', [])
             last_sync_state = db.get_state('history_sync')
             existing_fills = db.get_history_fills(limit=1, days=365)
             is_empty = len(existing_fills) == 0
 
-            if is_empty:
+            if is_empty and not last_sync_state.get('last_ts'):
                 start_ts = time.time() - (30 * 86400)
+                # Kept until the whole range is in: a retry resumes the cold start, not the last day
+                db.update_state('history_sync', {'last_ts': start_ts})
             else:
                 start_ts = last_sync_state.get('last_ts', time.time() - 86400)
 
+            # Windows fetched concurrently and checkpointed: a failure only costs the failed windows
             new_last_ts = time.time()
-            for symbol in symbols:
-                fills = exchange.get_trade_history(symbol, start_at=start_ts)
-                for fill in fills:
-                    db.save_fill(fill)
-                time.sleep(0.5)
-
-            ledger_items = exchange.get_ledger_history(start_at=start_ts)
-            for item in ledger_items:
-                db.save_ledger_item(item)
-
-            db.update_state('history_sync', {'last_ts': new_last_ts})
+            result = backfill.run(start_ts, new_last_ts)
+            if not result['failed']:
+                db.update_state('history_sync', {'last_ts': new_last_ts})
         except Exception as e:
             print(f"⚠️ HISTORY SYNC ERROR: {e}")
         time.sleep(60)
 
+def scanner_loop(db, exchange):
+    """Background loop ranking every USDT-M contract as a grid candidate, once per STRATEGIST_INTERVAL."""
+    from scanner import ContractScanner
+    scanner = ContractScanner(exchange, db)
+    print("🔭 CONTRACT SCANNER STARTED.")
+    while True:
+        started = time.monotonic()
+        interval = db.get_setting('STRATEGIST_INTERVAL', DEFAULT_STRATEGIST_INTERVAL)
+        try:
+            if db.get_setting('SCANNER_ENABLED', DEFAULT_SCANNER_ENABLED):
+                scanner.run_once(interval)
+        except Exception as e:
+            print(f"⚠️ SCANNER ERROR: {e}")
+        time.sleep(max(1, interval - (time.monotonic() - started)))
+
+def create_exchange():
+    """The connector for this environment, with the optional replay/recording wrappers."""
+    replay_path = os.getenv('REPLAY_PATH')
+    if IS_TEST_ENV and replay_path:
+        # Replays a recording on the paper exchange (speed from MOCK_SPEED)
+        from recorder import ReplayConnector
+        return ReplayConnector(replay_path, speed=float(os.getenv('MOCK_SPEED', 1)), install_clock=True)
+    with startup.phase('import connector'):
+        if IS_TEST_ENV:
+            from mock_connector import MockKuCoinConnector as KuCoinConnector
+        else:
+            from connector_kucoin import KuCoinConnector
+    with startup.phase('connect exchange'):
+        if IS_TEST_ENV:
+            # The paper bot is the only process that runs on the mock's accelerated clock
+            exchange = KuCoinConnector(KUCOIN_API_KEY, KUCOIN_SECRET, KUCOIN_PASSPHRASE, install_clock=True)
+        else:
+            exchange = KuCoinConnector(KUCOIN_API_KEY, KUCOIN_SECRET, KUCOIN_PASSPHRASE)
+    if os.getenv('RECORD_MARKET_DATA', 'false').lower() == 'true':
+        from recorder import RecordingConnector
+        exchange = RecordingConnector(exchange)
+        print(f"📼 Recording market data to {exchange.recorder.directory}/")
+    return exchange
+
+def start_bot(db):
+    try:
+        exchange = create_exchange()
+        print(f"✅ Connesso a KuCoin.")
+    except Exception as e:
+        print(f"❌ Errore Hardware (Bot Offline): {e}")
+        return
+    bot_loop(db, exchange)
+
+def serve(host='0.0.0.0', port=5002):
+    from werkzeug.serving import make_server
+    with startup.phase('bind web server'):
+        server = make_server(host, port, app, threaded=True)
+    startup.mark('serving')
+    server.serve_forever()
+
 def main():
     print("\n--- MANU: HIGH-FREQUENCY SCALPER ACTIVATED ---")
     if IS_TEST_ENV:
         print("--- RUNNING IN TEST ENVIRONMENT (MOCKED DATA) ---")
 
-    db = DatabaseManager()
-    init_db_settings(db)
+    with startup.phase('init db'):
+        db = DatabaseManager()
+        init_db_settings(db)
 
-    try:
-        exchange = KuCoinConnector(KUCOIN_API_KEY, KUCOIN_SECRET, KUCOIN_PASSPHRASE)
-        print(f"✅ Connesso a KuCoin.")
-        bot_thread = threading.Thread(target=bot_loop, args=(db, exchange), daemon=True)
-        bot_thread.start()
-    except Exception as e:
-        print(f"❌ Errore Hardware (Bot Offline): {e}")
+    # The bot connects and loads its modules in its own thread: the web interface does not wait
+    bot_thread = threading.Thread(target=start_bot, args=(db,), daemon=True, name="Bot")
+    bot_thread.start()
 
     print("🚀 Avvio Interfaccia Web su porta 5002...")
-    app.run(host='0.0.0.0', port=5002, debug=False, use_reloader=False)
+    serve()
 
 if __name__ == "__main__":
     main()
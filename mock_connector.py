@@ -1,89 +1,481 @@
 # mock_connector.py
-# This is a mock KuCoinConnector to allow the application to run in an offline test environment.
+# Paper-trading exchange with the KuCoinConnector interface, to run the whole bot offline.
+#
+# - Prices follow a scripted path (CSV / list) or a seeded random walk, one step per
+#   MOCK_STEP_SECONDS of simulated time.
+# - Resting limit orders live in a per-symbol book and are matched in price-time
+#   priority against every step (at most MOCK_STEP_VOLUME lots trade per step).
+# - Positions are one-way (netted) like KuCoin Futures, with realized PnL, fees,
+#   fills (get_trade_history) and ledger entries (get_ledger_history).
+# - MOCK_SPEED > 1 runs an accelerated clock: simulated time advances SPEED times
+#   faster than the wall clock. Only the paper/replay entry point (manu.py) installs
+#   it process-wide (install_clock=True): time.time/time.sleep/time.monotonic then
+#   follow it, so every interval of the bot shrinks accordingly. Everywhere else
+#   (tests, benchmark, library use) the clock is only read through `exchange.clock`.
 
-import pandas as pd
+import itertools
+import math
+import os
+import threading
 import time
+import uuid
+import zlib
+import numpy as np
+import pandas as pd
+
+DEFAULT_START_PRICE = 65000.0
+DEFAULT_VOLATILITY = 0.0005 # Std of the log return per step
+DEFAULT_STEP_SECONDS = 1.0
+DEFAULT_STEP_VOLUME = 1e9 # Lots traded per step, shared by the orders in priority order
+DEFAULT_HISTORY_SECONDS = 86400 # Random walks start with this much past, so klines exist at once
+DEFAULT_PRICE_INCREMENT = 0.1
+DEFAULT_CONTRACTS = 'BTC/USDT:USDT,ETH/USDT:USDT,SOL/USDT:USDT,XRP/USDT:USDT,DOGE/USDT:USDT,ADA/USDT:USDT,LINK/USDT:USDT,AVAX/USDT:USDT'
+MAKER_FEE = 0.0002
+TAKER_FEE = 0.0006
+
+TF_SECONDS = {'1m': 60, '5m': 300, '15m': 900, '30m': 1800, '1h': 3600, '4h': 14400, '1d': 86400}
+
+
+class SimClock:
+    """Simulated time: starts at the wall clock and runs `speed` times faster."""
+
+    def __init__(self, speed=1.0):
+        self.speed = float(speed)
+        self._real_time = time.time
+        self._real_sleep = time.sleep
+        self._real_monotonic = time.monotonic
+        self._wall_start = self._real_time()
+        self._mono_start = self._real_monotonic()
+
+    def time(self):
+        return self._wall_start + (self._real_time() - self._wall_start) * self.speed
+
+    def monotonic(self):
+        return self._mono_start + (self._real_monotonic() - self._mono_start) * self.speed
+
+    def sleep(self, seconds):
+        self._real_sleep(max(0.0, seconds) / self.speed)
+
+    def install(self):
+        """
+        Makes the whole process (every `import time` user) run on this clock.
+        Blocking waits with a timeout (queue.get, Event.wait, ...) still count real
+        seconds: code that waits that way must take the clock and divide by `speed`
+        (EventLoop and AccountCache do).
+        """
+        if self.speed != 1.0:
+            time.time, time.sleep, time.monotonic = self.time, self.sleep, self.monotonic
+            print(f"🔧 MOCK: accelerated clock x{self.speed:g} installed.")
+
+
+class PricePath:
+    """
+    Price of one symbol per step. A scripted path is replayed as-is and then held
+    at its last price; otherwise a random walk is generated lazily, deterministic
+    for a given seed.
+    """
+
+    def __init__(self, start_price=DEFAULT_START_PRICE, volatility=DEFAULT_VOLATILITY, seed=None, script=None):
+        self.volatility = volatility
+        self.rng = np.random.default_rng(seed)
+        self.scripted = script is not None
+        self.prices = np.asarray(script if script is not None else [start_price], dtype=np.float64)
+
+    def price(self, step):
+        if step >= len(self.prices):
+            if self.scripted:
+                return float(self.prices[-1])
+            n = max(step + 1 - len(self.prices), 1024)
+            walk = self.prices[-1] * np.exp(np.cumsum(self.rng.normal(0.0, self.volatility, n)))
+            self.prices = np.concatenate([self.prices, walk])
+        return float(self.prices[step])
+
+
+def _load_script(path):
+    """CSV with a 'price' or 'close' column (one row per step), or one price per line."""
+    try:
+        df = pd.read_csv(path)
+        column = 'price' if 'price' in df.columns else 'close'
+        return df[column].astype(float).to_numpy()
+    except (KeyError, ValueError):
+        return np.loadtxt(path, dtype=np.float64)
+
 
 class MockKuCoinConnector:
-    def __init__(self, api_key, api_secret, api_passphrase):
-        """Mocks the initialization. Does not connect to any real service."""
-        print("🔧 MOCK KuCoinConnector initialized.")
-        self._positions = []
-
-    def get_historical_data(self, symbol, timeframe, limit=200):
-        """Returns a DataFrame with fake kline data."""
-        # print(f"🔧 MOCK: Getting historical data for {symbol} ({timeframe})")
-        end_time = int(time.time() * 1000)
-        start_time = end_time - limit * self._tf_to_ms(timeframe)
-
-        timestamps = pd.to_datetime(range(start_time, end_time, self._tf_to_ms(timeframe)), unit='ms')
-
-        data = {
-            'timestamp': [ts.timestamp() * 1000 for ts in timestamps],
-            'open': [100 + i for i in range(len(timestamps))],
-            'high': [105 + i for i in range(len(timestamps))],
-            'low': [95 + i for i in range(len(timestamps))],
-            'close': [102 + i for i in range(len(timestamps))],
-            'volume': [1000 + i * 10 for i in range(len(timestamps))]
+    def __init__(self, api_key=None, api_secret=None, api_passphrase=None, speed=None, price_path=None,
+                 seed=None, start_price=None, volatility=None, step_seconds=None, step_volume=None,
+                 price_increment=DEFAULT_PRICE_INCREMENT, install_clock=False):
+        """Simulated exchange. Every argument left to None is read from the MOCK_* env vars."""
+        env = os.getenv
+        self.clock = SimClock(speed if speed is not None else float(env('MOCK_SPEED', 1)))
+        if install_clock:
+            self.clock.install()
+
+        script_path = env('MOCK_PRICE_PATH')
+        self._script = price_path if price_path is not None else (_load_script(script_path) if script_path else None)
+        self._seed = seed if seed is not None else (int(env('MOCK_SEED')) if env('MOCK_SEED') else None)
+        self._start_price = start_price or float(env('MOCK_START_PRICE', DEFAULT_START_PRICE))
+        self._volatility = volatility or float(env('MOCK_VOLATILITY', DEFAULT_VOLATILITY))
+        self.step_seconds = step_seconds or float(env('MOCK_STEP_SECONDS', DEFAULT_STEP_SECONDS))
+        self.step_volume = step_volume or float(env('MOCK_STEP_VOLUME', DEFAULT_STEP_VOLUME))
+        self.price_increment = price_increment
+
+        self._lock = threading.RLock()
+        # Random walks get a past (klines/indicators work at once); scripts start now
+        history = 0 if self._script is not None else float(env('MOCK_HISTORY_SECONDS', DEFAULT_HISTORY_SECONDS))
+        self._t0 = self.clock.time() - history
+        self._paths = {} # symbol -> PricePath
+        self._last_step = {} # symbol -> last matched step
+        self._orders = {} # order id -> order dict (resting limit and stop orders)
+        self._by_client_oid = {} # client OID -> order dict, also once filled or canceled
+        self._positions = {} # symbol -> {'qty', 'entry', 'leverage'}
+        self._fills = [] # connector-format trades, oldest first
+        self._ledger = []
+        self._seq = itertools.count()
+        self.balance = 10000.0
+        print(f"🔧 MOCK KuCoinConnector initialized (paper trading, speed x{self.clock.speed:g}).")
+
+    # --- Simulated market ---
+
+    def _path(self, symbol):
+        if symbol not in self._paths:
+            if self._script is not None:
+                self._paths[symbol] = PricePath(script=self._script)
+            else:
+                # Every symbol gets its own reproducible walk
+                seed = None if self._seed is None else self._seed + zlib.crc32(symbol.encode())
+                self._paths[symbol] = PricePath(self._start_price, self._volatility, seed)
+            # Nothing rests on a new symbol: matching starts from the current step
+            self._last_step[symbol] = self._step_at(self.clock.time()) - 1
+        return self._paths[symbol]
+
+    def _symbols(self):
+        return list(self._paths)
+
+    def _step_at(self, ts):
+        return max(0, int((ts - self._t0) // self.step_seconds))
+
+    def _advance(self, symbol):
+        """Matches the book of `symbol` against every step up to now. Returns the current price."""
+        path = self._path(symbol)
+        now_step = self._step_at(self.clock.time())
+        for step in range(self._last_step[symbol] + 1, now_step + 1):
+            self._match(symbol, path.price(step), self._t0 + step * self.step_seconds)
+        self._last_step[symbol] = max(self._last_step[symbol], now_step)
+        return path.price(now_step)
+
+    def _match(self, symbol, price, ts):
+        resting = [o for o in self._orders.values() if o['symbol'] == symbol]
+        if not resting:
+            return
+
+        # 1. Stop orders trigger at market
+        for o in [o for o in resting if o['type'] == 'stop']:
+            if (o['stop'] == 'down' and price <= o['stopPrice']) or (o['stop'] == 'up' and price >= o['stopPrice']):
+                del self._orders[o['id']]
+                self._execute(o, o['size'], price, ts, TAKER_FEE)
+
+        # 2. Limit orders: best price first, then oldest (price-time priority)
+        volume = self.step_volume
+        bids = sorted((o for o in resting if o['type'] == 'limit' and o['side'] == 'buy' and o['price'] >= price),
+                      key=lambda o: (-o['price'], o['seq']))
+        asks = sorted((o for o in resting if o['type'] == 'limit' and o['side'] == 'sell' and o['price'] <= price),
+                      key=lambda o: (o['price'], o['seq']))
+        for book in (bids, asks):
+            remaining = volume
+            for o in book:
+                if remaining <= 0:
+                    break
+                if o['id'] not in self._orders: # Already gone (e.g. canceled by a fill callback)
+                    continue
+                qty = min(o['size'] - o['filled'], remaining)
+                qty = self._execute(o, qty, o['price'], ts, MAKER_FEE)
+                remaining -= qty
+                o['filled'] += qty
+                if o['filled'] >= o['size'] or qty == 0:
+                    self._orders.pop(o['id'], None)
+
+    def _execute(self, order, qty, price, ts, fee_rate):
+        """Applies a fill to the position. Returns the quantity actually traded."""
+        symbol, side = order['symbol'], order['side']
+        pos = self._positions.setdefault(symbol, {'qty': 0.0, 'entry': 0.0, 'leverage': order.get('leverage', 10)})
+        signed = qty if side == 'buy' else -qty
+
+        if order.get('reduceOnly'):
+            # Reduce-only never opens or flips a position
+            if pos['qty'] == 0 or (pos['qty'] > 0) == (signed > 0):
+                return 0
+            signed = math.copysign(min(abs(signed), abs(pos['qty'])), signed)
+            qty = abs(signed)
+        if qty <= 0:
+            return 0
+
+        realized = 0.0
+        if pos['qty'] != 0 and (pos['qty'] > 0) != (signed > 0):
+            closed = min(abs(signed), abs(pos['qty']))
+            realized = closed * (price - pos['entry']) * (1 if pos['qty'] > 0 else -1)
+            new_qty = pos['qty'] + signed
+            if new_qty != 0 and (new_qty > 0) != (pos['qty'] > 0):
+                pos['entry'] = price # Flipped: the remainder opens at the fill price
+            pos['qty'] = new_qty
+        else:
+            total = abs(pos['qty']) + qty
+            pos['entry'] = (pos['entry'] * abs(pos['qty']) + price * qty) / total
+            pos['qty'] += signed
+        if pos['qty'] == 0:
+            pos['entry'] = 0.0
+
+        fee = qty * price * fee_rate
+        self.balance += realized - fee
+        self._fills.append({
+            'tradeId': uuid.uuid4().hex,
+            'symbol': symbol,
+            'side': side,
+            'price': price,
+            'size': float(qty),
+            'value': qty * price,
+            'fee': fee,
+            'feeCurrency': 'USDT',
+            'timestamp': ts,
+            'orderId': order['id'],
+            'tradeType': 'trade',
+            'liquidity': 'maker' if fee_rate == MAKER_FEE else 'taker'
+        })
+        if realized:
+            self._ledger.append({'timestamp': ts, 'amount': realized, 'type': 'RealisedPNL', 'currency': 'USDT', 'remark': symbol})
+        return qty
+
+    def _new_order(self, symbol, side, size, order_type, price=0.0, reduce_only=False, **extra):
+        order = {
+            'id': f"mock_{uuid.uuid4().hex[:16]}",
+            'clientOid': extra.pop('client_oid', None) or str(uuid.uuid4()),
+            'symbol': symbol, 'side': side, 'type': order_type, 'size': int(size), 'filled': 0,
+            'price': float(price), 'stopPrice': 0.0, 'reduceOnly': bool(reduce_only),
+            'status': 'open', 'seq': next(self._seq),
         }
-        df = pd.DataFrame(data)
-        return df
+        order.update(extra)
+        self._by_client_oid[order['clientOid']] = order
+        return order
+
+    # --- Market data ---
 
     def get_ticker_price(self, symbol):
-        """Returns a fake ticker price."""
-        return 102.5
+        with self._lock:
+            return self.round_price(symbol, self._advance(symbol))
+
+    def get_all_ticker_prices(self):
+        with self._lock:
+            return {s: self.round_price(s, self._advance(s)) for s in list(self._paths)}
+
+    def get_historical_data(self, symbol, timeframe='5m', limit=100):
+        """Candles built from the price path, up to the (still forming) current candle."""
+        with self._lock:
+            self._advance(symbol)
+            path = self._path(symbol)
+            tf = TF_SECONDS.get(timeframe, 300)
+            now = self.clock.time()
+            now_step = self._step_at(now)
+            path.price(now_step) # Make sure the path reaches now
+            end = (int(now) // tf + 1) * tf
+            rows = []
+            for open_ts in range(end - limit * tf, end, tf):
+                if open_ts + tf <= self._t0:
+                    continue # Before the simulated history
+                first = self._step_at(max(open_ts, self._t0))
+                last = min(self._step_at(open_ts + tf - 1e-6), now_step)
+                prices = path.prices[first:last + 1]
+                if not len(prices):
+                    continue
+                rows.append([open_ts * 1000.0, prices[0], prices.max(), prices.min(), prices[-1], float(len(prices))])
+            return pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+
+    def get_order_book(self, symbol, limit=20):
+        with self._lock:
+            price = self._advance(symbol)
+            bids, asks = {}, {}
+            for o in self._orders.values():
+                if o['symbol'] == symbol and o['type'] == 'limit':
+                    book = bids if o['side'] == 'buy' else asks
+                    book[o['price']] = book.get(o['price'], 0) + o['size'] - o['filled']
+            # Synthetic liquidity around the last price
+            for i in range(1, limit + 1):
+                bids.setdefault(self.round_price(symbol, price - i * self.price_increment), 10.0)
+                asks.setdefault(self.round_price(symbol, price + i * self.price_increment), 10.0)
+            return {
+                'bids': sorted(([p, q] for p, q in bids.items()), reverse=True)[:limit],
+                'asks': sorted([p, q] for p, q in asks.items())[:limit],
+            }
+
+    def get_funding_rate(self, symbol):
+        return 0.0
+
+    def get_24h_stats(self, symbol):
+        return {'price_change_percent': 0.0}
+
+    def get_active_contracts(self):
+        """The simulated contract list (MOCK_CONTRACTS) plus every symbol already traded."""
+        names = [s for s in os.getenv('MOCK_CONTRACTS', DEFAULT_CONTRACTS).split(',') if s]
+        with self._lock:
+            return {symbol: 1e9 for symbol in dict.fromkeys(names + self._symbols())}
+
+    def get_price_increment(self, symbol):
+        return self.price_increment
+
+    def round_price(self, symbol, price):
+        precision = max(0, -int(math.floor(math.log10(self.price_increment))))
+        return round(round(price / self.price_increment) * self.price_increment, precision)
+
+    # --- Account ---
 
     def get_all_open_positions(self):
-        """Returns the list of mock open positions."""
-        return self._positions
+        with self._lock:
+            marks = {symbol: self._advance(symbol) for symbol in self._symbols()}
+            results = []
+            for symbol, pos in self._positions.items():
+                if pos['qty'] == 0:
+                    continue
+                mark = marks[symbol]
+                pnl = pos['qty'] * (mark - pos['entry'])
+                margin = abs(pos['qty']) * pos['entry'] / pos['leverage'] if pos['leverage'] else 0
+                results.append({
+                    'symbol': symbol,
+                    'pnl': pnl,
+                    'unrealisedPnl': pnl,
+                    'unrealisedPnlPcnt': pnl / margin if margin else 0,
+                    'markPrice': mark,
+                    'side': 'long' if pos['qty'] > 0 else 'short',
+                    'quantity': abs(pos['qty']),
+                    'entryPrice': pos['entry'],
+                    'leverage': pos['leverage'],
+                    'marginMode': 'ISOLATED'
+                })
+            return results
+
+    def get_account_balance(self, currency='USDT'):
+        with self._lock:
+            marks = {symbol: self._advance(symbol) for symbol in self._symbols()}
+            unrealised = margin = 0.0
+            for symbol, pos in self._positions.items():
+                if pos['qty']:
+                    unrealised += pos['qty'] * (marks[symbol] - pos['entry'])
+                    margin += abs(pos['qty']) * pos['entry'] / pos['leverage'] if pos['leverage'] else 0
+            return {
+                'currency': currency,
+                'equity': self.balance + unrealised,
+                'availableBalance': self.balance - margin,
+                'marginBalance': self.balance + unrealised,
+                'positionMargin': margin,
+                'orderMargin': 0.0,
+                'unrealisedPnl': unrealised,
+            }
+
+    def get_trade_history(self, symbol, start_at=None, limit=20, end_at=None, strict=False):
+        with self._lock:
+            self._advance(symbol)
+            return [dict(f) for f in self._fills if f['symbol'] == symbol and (not start_at or f['timestamp'] >= start_at)
+                    and (not end_at or f['timestamp'] < end_at)]
+
+    def get_ledger_history(self, start_at=None, end_at=None, strict=False):
+        with self._lock:
+            for symbol in self._symbols():
+                self._advance(symbol)
+            return [dict(l) for l in self._ledger if (not start_at or l['timestamp'] >= start_at)
+                    and (not end_at or l['timestamp'] < end_at)]
+
+    # --- Orders ---
 
     def get_open_orders(self, symbol):
-        """Returns an empty list of open orders."""
-        return []
+        with self._lock:
+            self._advance(symbol)
+            return [
+                {k: o[k] for k in ('id', 'symbol', 'status', 'type', 'side', 'size', 'stopPrice', 'price', 'reduceOnly', 'clientOid')}
+                for o in sorted(self._orders.values(), key=lambda o: o['seq']) if o['symbol'] == symbol
+            ]
 
-    def cancel_all_orders(self, symbol):
-        """Mocks cancelling all orders."""
-        print(f"🔧 MOCK: Canceled all orders for {symbol}")
-        return True
-
-    def place_stop_market_order(self, symbol, side, quantity, stop_price, stop_dir, margin_mode):
-        """Mocks placing a stop market order."""
-        print(f"🔧 MOCK: Placed STOP MARKET order for {symbol} ({side}, {quantity} @ {stop_price})")
-        return {'id': f'mock_stop_{int(time.time())}'}
-
-    def place_market_order(self, symbol, side, qty, reduce_only=False):
-        """Mocks placing a market order."""
-        print(f"🔧 MOCK: Placed MARKET order for {symbol} ({side}, {qty})")
-        if reduce_only:
-            self._positions = [p for p in self._positions if p['symbol'] != symbol]
-        return {'id': f'mock_market_{int(time.time())}'}
-
-    def execute_trade(self, symbol, side, amount, leverage):
-        """Mocks executing a trade and simulates adding a position."""
-        print(f"🔧 MOCK: Executed TRADE for {symbol} ({side}, ${amount}, {leverage}x)")
-
-        new_pos = {
-            'symbol': symbol,
-            'side': side,
-            'quantity': amount / 100,
-            'entryPrice': self.get_ticker_price(symbol),
-            'unrealisedPnl': 0.0,
-            'marginMode': 'isolated'
-        }
-        self._positions.append(new_pos)
+    def get_order_status(self, symbol, order_id):
+        with self._lock:
+            self._advance(symbol)
+            if order_id in self._orders:
+                return 'open'
+            return 'done' if any(f['orderId'] == order_id for f in self._fills) else 'missing'
 
-        return {'id': f'mock_trade_{int(time.time())}'}
+    def get_order_by_client_oid(self, symbol, client_oid):
+        with self._lock:
+            self._advance(symbol)
+            order = self._by_client_oid.get(client_oid)
+            if order is None:
+                return None
+            return {
+                'id': order['id'], 'status': 'open' if order['id'] in self._orders else 'done',
+                'size': float(order['size']), 'filledSize': float(order['filled']), 'price': order['price'],
+                'side': order['side'], 'clientOid': client_oid,
+            }
 
-    def get_trade_history(self, symbol, start_at):
-        return []
+    def place_limit_order(self, symbol, side, size, price, reduce_only=False, client_oid=None):
+        if int(size) <= 0:
+            return None
+        with self._lock:
+            market = self._advance(symbol)
+            if market is None:
+                return None
+            order = self._new_order(symbol, side, size, 'limit', self.round_price(symbol, price), reduce_only, client_oid=client_oid)
+            crosses = (side == 'buy' and order['price'] >= market) or (side == 'sell' and order['price'] <= market)
+            if crosses:
+                # Marketable limit: fills at once at the current price, as a taker
+                self._execute(order, order['size'], market, self.clock.time(), TAKER_FEE)
+            else:
+                self._orders[order['id']] = order
+            return {'id': order['id']}
 
-    def get_ledger_history(self, start_at):
-        return []
+    def place_limit_orders(self, symbol, orders):
+        return [self.place_limit_order(symbol, o['side'], o['size'], o['price'], o.get('reduce_only', False), o.get('client_oid'))
+                for o in orders]
 
-    def _tf_to_ms(self, timeframe):
-        if timeframe == '1m': return 60 * 1000
-        if timeframe == '5m': return 5 * 60 * 1000
-        if timeframe == '15m': return 15 * 60 * 1000
-        if timeframe == '1h': return 60 * 60 * 1000
-        if timeframe == '4h': return 4 * 60 * 60 * 1000
-        return 60 * 1000
+    def amend_orders(self, symbol, amendments):
+        new_orders = self.place_limit_orders(symbol, amendments)
+        canceled = self.cancel_orders(symbol, [a['id'] for a, new in zip(amendments, new_orders) if new])
+        return new_orders, canceled
+
+    def place_market_order(self, symbol, side, size, reduce_only=True):
+        with self._lock:
+            market = self._advance(symbol)
+            if market is None:
+                return None
+            order = self._new_order(symbol, side, size, 'market', reduce_only=reduce_only)
+            if not self._execute(order, order['size'], market, self.clock.time(), TAKER_FEE) and reduce_only:
+                return None
+            return {'id': order['id']}
+
+    def execute_trade(self, symbol, side, amount_usdt, leverage):
+        with self._lock:
+            price = self._advance(symbol)
+            lots = int(amount_usdt * leverage / price)
+            if lots <= 0:
+                return None
+            self._positions.setdefault(symbol, {'qty': 0.0, 'entry': 0.0, 'leverage': leverage})['leverage'] = leverage
+            return self.place_market_order(symbol, 'buy' if side.lower() == 'buy' else 'sell', lots, reduce_only=False)
+
+    def place_stop_market_order(self, symbol, side, amount, stop_price, stop_dir, margin_mode=None):
+        with self._lock:
+            self._advance(symbol)
+            order = self._new_order(symbol, side, amount, 'stop', reduce_only=True, stop=stop_dir, stopPrice=float(stop_price))
+            self._orders[order['id']] = order
+            return {'id': order['id']}
+
+    def cancel_order(self, symbol, order_id, silent=False):
+        with self._lock:
+            self._advance(symbol)
+            return self._orders.pop(order_id, None) is not None
+
+    def cancel_orders(self, symbol, order_ids):
+        with self._lock:
+            self._advance(symbol)
+            return [oid for oid in order_ids if self._orders.pop(oid, None) is not None]
+
+    def cancel_all_orders(self, symbol):
+        with self._lock:
+            self._advance(symbol)
+            for oid in [oid for oid, o in self._orders.items() if o['symbol'] == symbol]:
+                del self._orders[oid]
+            print(f"🔧 MOCK: Canceled all orders for {symbol}")
+            return True
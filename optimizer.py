@@ -0,0 +1,153 @@
+import argparse
+import itertools
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+from backtest import run_backtest, load_ohlcv
+
+OHLCV_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close')
+DEFAULT_CHUNK_SIZE = 16 # Parameter sets per task: amortizes the task round-trip
+
+# Per-worker state, set once by _init_worker
+_BARS = None
+_SHM = None
+_BASE_CONFIG = None
+_INCREMENT = None
+
+
+def grid_samples(space):
+    """Cartesian product of a {config key: list of values} space."""
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+def random_samples(space, n, seed=None):
+    """
+    n random parameter sets. Values given as a (low, high) tuple are drawn uniformly
+    (integers for int bounds), lists are sampled as choices.
+    """
+    rng = np.random.default_rng(seed)
+    samples = []
+    for _ in range(n):
+        params = {}
+        for key, values in space.items():
+            if isinstance(values, tuple):
+                lo, hi = values
+                if isinstance(lo, int) and isinstance(hi, int):
+                    params[key] = int(rng.integers(lo, hi + 1))
+                else:
+                    params[key] = float(rng.uniform(lo, hi))
+            else:
+                params[key] = values[int(rng.integers(len(values)))]
+        samples.append(params)
+    return samples
+
+def _init_worker(shm_name, n_bars, base_config, increment):
+    global _BARS, _SHM, _BASE_CONFIG, _INCREMENT
+    # Workers share the parent's resource tracker: the parent alone unlinks the block
+    _SHM = shared_memory.SharedMemory(name=shm_name)
+    matrix = np.ndarray((len(OHLCV_COLUMNS), n_bars), dtype=np.float64, buffer=_SHM.buf)
+    _BARS = dict(zip(OHLCV_COLUMNS, matrix)) # Zero-copy views on the shared block
+    _BASE_CONFIG = base_config
+    _INCREMENT = increment
+
+def _run_chunk(chunk):
+    results = []
+    for params in chunk:
+        try:
+            metrics = run_backtest(_BARS, dict(_BASE_CONFIG, **params), increment=_INCREMENT)
+        except ValueError:
+            continue # Invalid combination (e.g. empty range)
+        results.append((params, metrics))
+    return results
+
+def run_sweep(bars, base_config, param_sets, db=None, sweep_id=None, increment=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Backtests every parameter set on a process pool and streams the results into
+    the `sweep_results` table as chunks complete.
+
+    The OHLCV arrays are copied once into a shared memory block; workers map it
+    read-only at start-up, so no task pickles the bars.
+    Returns (sweep_id, number of results).
+    """
+    sweep_id = sweep_id or uuid.uuid4().hex[:12]
+    workers = workers or os.cpu_count()
+    n_bars = len(bars['close'])
+
+    matrix = np.vstack([np.asarray(bars[c], dtype=np.float64) if c in bars else np.asarray(bars['close'], dtype=np.float64)
+                        for c in OHLCV_COLUMNS])
+    shm = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+    done = 0
+    try:
+        np.ndarray(matrix.shape, dtype=np.float64, buffer=shm.buf)[:] = matrix
+        del matrix
+
+        chunks = [param_sets[i:i + chunk_size] for i in range(0, len(param_sets), chunk_size)]
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, n_bars, base_config, increment)) as pool:
+            futures = [pool.submit(_run_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                results = future.result()
+                if db is not None and results:
+                    db.save_sweep_results(sweep_id, results)
+                done += len(results)
+                print(f"🔬 SWEEP {sweep_id}: {done}/{len(param_sets)} ({time.perf_counter() - started:.1f}s)")
+    finally:
+        shm.close()
+        shm.unlink()
+    return sweep_id, done
+
+def _parse_values(text, cast):
+    """'10,20,40' -> list of values, '10:40' -> (low, high) range for random sampling."""
+    if ':' in text:
+        lo, hi = text.split(':')
+        return (cast(lo), cast(hi))
+    return [cast(v) for v in text.split(',')]
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep of the grid backtester.")
+    parser.add_argument('csv', help="CSV with timestamp, open, high, low, close, volume")
+    parser.add_argument('--symbol', default=None, help="Base grid config of this symbol from the DB")
+    parser.add_argument('--increment', type=float, default=None)
+    parser.add_argument('--low', help="GRID_RANGE_LOW values, e.g. 58000,60000 or 55000:60000")
+    parser.add_argument('--high', help="GRID_RANGE_HIGH values")
+    parser.add_argument('--levels', help="GRID_LEVELS values")
+    parser.add_argument('--profit', help="PROFIT_PER_GRID values (%%)")
+    parser.add_argument('--leverage', help="LEVERAGE values")
+    parser.add_argument('--random', type=int, default=0, help="Draw N random samples instead of the full grid")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--rank', choices=['net_pnl', 'return_dd'], default='net_pnl')
+    args = parser.parse_args()
+
+    from db_manager import DatabaseManager
+    db = DatabaseManager()
+    base_config = db.get_grid_config(args.symbol)
+
+    space = {}
+    for key, text, cast in [('GRID_RANGE_LOW', args.low, float), ('GRID_RANGE_HIGH', args.high, float),
+                            ('GRID_LEVELS', args.levels, int), ('PROFIT_PER_GRID', args.profit, float),
+                            ('LEVERAGE', args.leverage, int)]:
+        if text:
+            space[key] = _parse_values(text, cast)
+
+    if args.random:
+        param_sets = random_samples(space, args.random, args.seed)
+    else:
+        if any(isinstance(v, tuple) for v in space.values()):
+            parser.error("low:high ranges need --random N")
+        param_sets = grid_samples(space)
+
+    bars = load_ohlcv(args.csv)
+    sweep_id, done = run_sweep(bars, base_config, param_sets, db=db, increment=args.increment, workers=args.workers)
+
+    print(f"🏆 Top {args.top} of sweep {sweep_id} ({done} results) by {args.rank}:")
+    for row in db.get_top_sweep_results(sweep_id, args.top, args.rank):
+        print(f"   net {row['net_pnl']:>12.2f} | dd {row['max_drawdown']:>10.2f} | fills {row['fills']:>6} | {row['params']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import time
+import uuid
+
+GRID = 'grid'
+TAKE_PROFIT = 'take_profit'
+
+ACTIVE_STATUSES = ('pending', 'open') # pending: journaled, no ack yet
+TERMINAL_STATUSES = ('filled', 'canceled', 'rejected', 'lost')
+DEFAULT_RETENTION_DAYS = 7 # Terminal entries older than this are pruned at reconcile
+
+
+def take_profit_oid(fill):
+    """Client OID of the profit-take of a fill: the same on every attempt to handle that fill."""
+    return uuid.uuid5(uuid.NAMESPACE_OID, f"take_profit:{fill['tradeId']}").hex
+
+
+class OrderJournal:
+    """
+    Durable record of the limit orders the bot sends (grid orders and profit-takes).
+
+    Every intent gets its own client OID and is written to the `order_journal` table
+    *before* the request goes out, then moved along by acks, fills and cancels:
+
+        pending -> open -> filled | canceled
+        pending -> rejected (refused) | lost (never reached the exchange, found at reconcile)
+
+    After a restart only the active entries are reconciled, by client OID: an order
+    sent right before a crash is adopted instead of being placed twice, and a
+    profit-take that never left the bot is re-sent under the same client OID.
+    """
+
+    def __init__(self, db_manager, retention_days=DEFAULT_RETENTION_DAYS):
+        self.db = db_manager
+        self.retention_days = retention_days
+
+    def intent(self, symbol, side, size, price, kind=GRID, level_idx=None, reduce_only=False, client_oid=None):
+        """A new, not yet recorded, intent. Its `client_oid` (random unless given) must be sent with the order."""
+        return {
+            'client_oid': client_oid or uuid.uuid4().hex, 'symbol': symbol, 'kind': kind, 'level_idx': level_idx,
+            'side': side, 'size': size, 'price': price, 'reduce_only': reduce_only,
+        }
+
+    def record(self, intents, replace=True):
+        """
+        Journals the intents as 'pending'. Call right before sending them.
+        replace=False keeps an entry already journaled under the same client OID.
+        """
+        self.db.save_order_intents(intents, replace=replace)
+
+    def acked(self, intents, orders):
+        """Applies the connector results (aligned with `intents`): {'id': ...} or None if refused."""
+        self.db.update_order_entries([
+            (i['client_oid'], order['id'], 'open', None) if order else (i['client_oid'], None, 'rejected', None)
+            for i, order in zip(intents, orders)
+        ])
+
+    def canceled(self, order_ids):
+        self.db.set_order_status(list(order_ids), 'canceled')
+
+    def canceled_all(self, symbol):
+        """After a cancel-all (e.g. a stop-loss): every active order of the symbol is gone."""
+        self.db.update_order_entries([(e['client_oid'], None, 'canceled', None) for e in self.active(symbol) if e['order_id']])
+
+    def filled(self, order_id, size):
+        if order_id:
+            self.db.add_order_fill(order_id, float(size))
+
+    def entry(self, client_oid):
+        return self.db.get_order_entry(client_oid)
+
+    def active(self, symbol=None):
+        return self.db.get_order_entries(symbol, ACTIVE_STATUSES)
+
+    def reconcile(self, exchange, symbol):
+        """
+        Settles the active entries of a symbol against the exchange: one open-orders
+        request, plus a client OID lookup only for the entries no longer on the book.
+        Returns the count of entries per outcome.
+        """
+        summary = {'open': 0, 'filled': 0, 'canceled': 0, 'lost': 0, 'resent': 0, 'rejected': 0, 'unknown': 0}
+        self.db.prune_order_journal(time.time() - self.retention_days * 86400, TERMINAL_STATUSES)
+        entries = self.active(symbol)
+        if not entries:
+            return summary
+
+        on_book = {o['clientOid']: o for o in exchange.get_open_orders(symbol) if o.get('clientOid')}
+        updates, resend = [], []
+        for entry in entries:
+            oid = entry['client_oid']
+            if oid in on_book:
+                updates.append((oid, on_book[oid]['id'], 'open', None))
+                summary['open'] += 1
+                continue
+            try:
+                order = exchange.get_order_by_client_oid(symbol, oid)
+            except Exception as e:
+                self.db.log("OrderJournal", f"Lookup of {oid} ({symbol}) failed: {e}", "WARNING")
+                summary['unknown'] += 1
+                continue
+            if order is None:
+                # The crash came between the journal write and the request
+                if entry['kind'] == TAKE_PROFIT:
+                    resend.append(entry)
+                else:
+                    updates.append((oid, None, 'lost', None)) # The next grid pass replenishes the level
+                    summary['lost'] += 1
+            elif order['status'] == 'open':
+                updates.append((oid, order['id'], 'open', order['filledSize']))
+                summary['open'] += 1
+            else:
+                status = 'filled' if order['filledSize'] >= entry['size'] else 'canceled'
+                updates.append((oid, order['id'], status, order['filledSize']))
+                summary[status] += 1
+        self.db.update_order_entries(updates)
+
+        for entry in resend:
+            order = exchange.place_limit_order(symbol, entry['side'], entry['size'], entry['price'],
+                                               reduce_only=bool(entry['reduce_only']), client_oid=entry['client_oid'])
+            self.acked([entry], [order])
+            summary['resent' if order else 'rejected'] += 1
+
+        self.db.log("OrderJournal", f"Reconciled {len(entries)} journaled orders of {symbol}: {summary}", "INFO")
+        return summary
@@ -0,0 +1,80 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_STACK_DEPTH = 128
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profiling session is requested while another one is running."""
+
+
+class SamplingProfiler:
+    """
+    On-demand statistical sampler over every thread of the process.
+
+    Nothing runs until `profile()` is called: the sampler thread lives only for the
+    duration of a session, so the bot pays no overhead while the profiler is idle.
+    Each sample walks `sys._current_frames()` and counts the collapsed stack of every
+    thread, prefixed with the thread name (Strategist, Executioner, HistorySync, ...).
+    The output is the "collapsed stack" format consumed by flamegraph.pl / speedscope.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self._lock.locked()
+
+    def profile(self, seconds=10.0, interval=0.005, exclude_current=True):
+        """Samples all threads for `seconds` and returns the collapsed stacks as text."""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profiling session is already running.")
+        try:
+            skip = {threading.get_ident()} if exclude_current else set()
+            counts = Counter()
+
+            sampler = threading.Thread(
+                target=self._sample_loop,
+                args=(seconds, interval, skip, counts),
+                daemon=True,
+                name="Profiler"
+            )
+            sampler.start()
+            sampler.join()
+            return self._format(counts)
+        finally:
+            self._lock.release()
+
+    def _sample_loop(self, seconds, interval, skip, counts):
+        skip = skip | {threading.get_ident()}
+        deadline = time.perf_counter() + seconds
+
+        while time.perf_counter() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident in skip:
+                    continue
+                stack = self._collapse(frame)
+                thread_name = names.get(ident, f"thread-{ident}").replace(';', '_')
+                counts[f"{thread_name};{stack}" if stack else thread_name] += 1
+            time.sleep(interval)
+
+    def _collapse(self, frame):
+        labels = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            labels.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        labels.reverse() # Root first, as expected by flamegraph tools
+        return ';'.join(label.replace(';', '_') for label in labels)
+
+    def _format(self, counts):
+        lines = [f"{stack} {count}" for stack, count in sorted(counts.items())]
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,157 @@
+import time
+
+STOP_LOSS_PAUSE_SECONDS = 3600 # Pause after a global stop loss
+
+
+class ProtectiveStopManager:
+    """
+    Two lines of defense against a price run out of the grid:
+
+    1. An exchange-side stop-market order (reduce-only) kept in sync with the
+       grid exposure: long exposure is protected by a sell stop at STOP_LOSS_PRICE,
+       short exposure by a buy stop at STOP_LOSS_PRICE_HIGH. The exchange triggers
+       it with its own latency, even if the bot is down.
+    2. A local watcher evaluated on every price tick. When the price is beyond a
+       stop it closes what is left, cancels the grid and pauses the symbol
+       (non-blocking, through shared_state['paused_until']).
+
+    Positions come from the shared AccountCache when one is given. When they are
+    unknown (None: the fetch failed) the resting stop is never removed.
+    Stop prices come from the shared GridConfigCache when one is given (`configs`).
+    """
+
+    def __init__(self, exchange, db_manager, shared_state, account=None, configs=None):
+        self.exchange = exchange
+        self.db = db_manager
+        self.shared_state = shared_state
+        self.account = account
+        self.configs = configs
+        self.exposure = {} # symbol -> signed position quantity (lots), from the last sync
+        self.stops = {} # symbol -> {'id', 'side', 'size', 'stop_price', 'stop_dir'}
+
+    def is_paused(self, symbol):
+        return self.shared_state.get('paused_until', {}).get(symbol, 0) > time.time()
+
+    def _stop_prices(self, symbol):
+        config = self.configs.get(symbol) if self.configs is not None else self.db.get_grid_config(symbol)
+        return config['STOP_LOSS_PRICE'], config['STOP_LOSS_PRICE_HIGH']
+
+    def _tracked_stop(self, symbol):
+        if symbol not in self.stops:
+            self.stops[symbol] = self.db.get_state(f'protective_stop:{symbol}') or None
+        return self.stops[symbol]
+
+    def _positions(self, max_age=None):
+        """Open positions, or None when they are unknown (failed fetch, stale snapshot)."""
+        if self.account is not None:
+            positions = self.account.positions(max_age)
+            return None if self.account.is_stale() else positions
+        return self.exchange.get_all_open_positions()
+
+    def _set_tracked_stop(self, symbol, stop):
+        self.stops[symbol] = stop
+        self.db.update_state(f'protective_stop:{symbol}', stop or {})
+
+    def sync(self, symbol, positions=None, verify=False):
+        """
+        Makes the resting exchange stop match the current exposure of `symbol`.
+        The replacement stop is placed before the old one is canceled, so the
+        position is never left unprotected. With verify=True the tracked stop is
+        checked against the open stop orders first (it may have fired or been canceled).
+        """
+        if positions is None:
+            positions = self._positions()
+        if positions is None:
+            self.db.log("Protection", f"Positions unknown. Keeping the protective stop of {symbol} as it is.", "WARNING")
+            return self._tracked_stop(symbol)
+
+        qty = 0.0
+        for pos in positions:
+            if pos['symbol'] == symbol:
+                qty += pos['quantity'] if pos['side'] == 'long' else -pos['quantity']
+        self.exposure[symbol] = qty
+
+        current = self._tracked_stop(symbol)
+        if current and verify:
+            stop_ids = {o['id'] for o in self.exchange.get_open_orders(symbol) if o['type'] == 'stop'}
+            if current['id'] not in stop_ids:
+                self.db.log("Protection", f"Protective stop {current['id']} for {symbol} is gone. Re-syncing.", "WARNING")
+                self._set_tracked_stop(symbol, None)
+                current = None
+
+        low_stop, high_stop = self._stop_prices(symbol)
+        desired = None
+        if qty > 0 and low_stop:
+            desired = {'side': 'sell', 'size': int(qty), 'stop_price': low_stop, 'stop_dir': 'down'}
+        elif qty < 0 and high_stop:
+            desired = {'side': 'buy', 'size': int(-qty), 'stop_price': high_stop, 'stop_dir': 'up'}
+        if desired and desired['size'] <= 0:
+            desired = None
+
+        if current and desired and all(current.get(k) == v for k, v in desired.items()):
+            return current # Already in sync
+
+        if desired:
+            order = self.exchange.place_stop_market_order(
+                symbol, desired['side'], desired['size'], desired['stop_price'], desired['stop_dir']
+            )
+            if not order:
+                self.db.log("Protection", f"Failed to place protective stop for {symbol}. Keeping the previous one.", "ERROR")
+                return current
+            self.db.log("Protection", f"Protective stop {desired['side']} {desired['size']} {symbol} @ {desired['stop_price']} ({desired['stop_dir']})", "INFO")
+
+        if current:
+            self.exchange.cancel_order(symbol, current['id'], silent=True)
+
+        new_stop = dict(desired, id=order['id']) if desired else None
+        self._set_tracked_stop(symbol, new_stop)
+        return new_stop
+
+    def check(self, symbol, price):
+        """
+        Local watcher, called on every tick. Returns True when the stop fired
+        and the symbol entered the paused state.
+        """
+        if self.is_paused(symbol):
+            return False
+
+        low_stop, high_stop = self._stop_prices(symbol)
+        breached_low = bool(low_stop) and price <= low_stop
+        breached_high = bool(high_stop) and price >= high_stop
+        if not (breached_low or breached_high):
+            return False
+
+        # Nothing to protect: no known exposure and no resting stop that may have fired
+        if not self.exposure.get(symbol) and not self._tracked_stop(symbol):
+            return False
+
+        self.trigger(symbol, price)
+        return True
+
+    def trigger(self, symbol, price):
+        self.db.log("Protection", f"!!! GLOBAL STOP LOSS TRIGGERED for {symbol} at {price} !!!", "CRITICAL")
+
+        # 1. Close whatever the exchange stop has not closed yet (both directions)
+        positions = self._positions(max_age=0) # Fresh: these orders close real positions
+        for pos in positions or []:
+            if pos['symbol'] == symbol:
+                close_side = 'sell' if pos['side'] == 'long' else 'buy'
+                self.exchange.place_market_order(symbol, close_side, pos['quantity'], reduce_only=True)
+
+        # 2. Cancel grid, profit-take and stop orders to stop the grid
+        if positions is None:
+            # Nothing could be closed: the exchange stop stays as the last line of defense
+            self.db.log("Protection", f"Positions unknown: {symbol} not closed, keeping its protective stop.", "CRITICAL")
+            self.exchange.cancel_orders(symbol, [o['id'] for o in self.exchange.get_open_orders(symbol) if o['type'] != 'stop'])
+        else:
+            self.exchange.cancel_all_orders(symbol)
+            self.exposure[symbol] = 0.0
+            self._set_tracked_stop(symbol, None)
+        if self.account is not None:
+            self.account.invalidate()
+
+        # 3. Pause the grid (non-blocking: every component checks the deadline)
+        until = time.time() + STOP_LOSS_PAUSE_SECONDS
+        self.shared_state.setdefault('paused_until', {})[symbol] = until
+        self.db.update_state(f'paused:{symbol}', {'until': until, 'price': price})
+        self.db.log("Protection", f"PANIC: {symbol} positions closed, orders canceled. Grid paused for {STOP_LOSS_PAUSE_SECONDS}s.", "CRITICAL")
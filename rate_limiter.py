@@ -0,0 +1,53 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every caller of the exchange connector.
+    Tokens may go negative: each caller reserves the next free slot under the lock
+    and then sleeps outside it, so waiting threads are served in arrival order.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else rate)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cost=1):
+        """Blocks until `cost` requests fit in the budget. Returns the time waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= cost
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def available(self):
+        """Tokens currently available (negative when callers are queued)."""
+        with self._lock:
+            now = time.monotonic()
+            return min(self.burst, self._tokens + (now - self._last) * self.rate)
+
+
+class ThrottledApi:
+    """Proxy around an SDK API object: every method call first acquires the shared limiter."""
+
+    def __init__(self, api, limiter):
+        self._api = api
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self._limiter.acquire()
+            return attr(*args, **kwargs)
+        return call
@@ -0,0 +1,233 @@
+import glob
+import gzip
+import itertools
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+import pandas as pd
+from mock_connector import MockKuCoinConnector, TF_SECONDS
+
+DEFAULT_RECORD_DIR = 'recordings'
+DEFAULT_SEGMENT_SECONDS = 3600 # A new file every hour
+FLUSH_EVERY = 200 # Records between gzip sync flushes (readable even after a crash)
+
+# Connector calls that carry market data, with the kind stored in the file
+RECORDED_METHODS = {
+    'get_ticker_price': 'ticker',
+    'get_all_ticker_prices': 'tickers',
+    'get_historical_data': 'klines',
+    'get_order_book': 'book',
+    'get_trade_history': 'fills',
+}
+
+
+def _to_jsonable(value):
+    if isinstance(value, pd.DataFrame):
+        return {'columns': list(value.columns), 'data': value.values.tolist()}
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    if hasattr(value, 'model_dump'):
+        return value.model_dump()
+    if isinstance(value, dict):
+        return {k: _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+def read_records(path):
+    """Every record of a recording (a directory of segments or one segment), in order."""
+    files = sorted(glob.glob(os.path.join(path, '*.jsonl.gz'))) if os.path.isdir(path) else [path]
+    records = []
+    for name in files:
+        try:
+            with gzip.open(name, 'rt') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break # Truncated tail of a segment that was being written
+        except (EOFError, OSError):
+            pass
+    records.sort(key=lambda r: (r['t'], r['n']))
+    return records
+
+
+class MarketRecorder:
+    """
+    Append-only writer of timestamped market data into gzip'd JSON-lines segments.
+    Each record: {"t": time, "n": sequence, "k": kind, "m": method, "a": args, "r": result}.
+    """
+
+    def __init__(self, directory=DEFAULT_RECORD_DIR, segment_seconds=DEFAULT_SEGMENT_SECONDS):
+        self.directory = directory
+        self.segment_seconds = segment_seconds
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._file = None
+        self._segment_start = 0
+        self._unflushed = 0
+
+    def _rotate(self, now):
+        if self._file:
+            self._file.close()
+        name = time.strftime('market-%Y%m%d-%H%M%S', time.gmtime(now)) + f'-{os.getpid()}.jsonl.gz'
+        self._file = gzip.open(os.path.join(self.directory, name), 'at')
+        self._segment_start = now
+
+    def write(self, kind, method, args, result):
+        now = time.time()
+        line = json.dumps({'t': now, 'n': next(self._seq), 'k': kind, 'm': method,
+                           'a': _to_jsonable(args), 'r': _to_jsonable(result)}, separators=(',', ':'))
+        with self._lock:
+            if self._file is None or now - self._segment_start >= self.segment_seconds:
+                self._rotate(now)
+            self._file.write(line + '\n')
+            self._unflushed += 1
+            if self._unflushed >= FLUSH_EVERY:
+                self.flush()
+
+    def flush(self):
+        if self._file:
+            self._file.flush()
+            self._unflushed = 0
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+class RecordingConnector:
+    """
+    Wraps a connector and records every market-data response it returns.
+    Everything else (orders, positions) passes through untouched.
+    """
+
+    def __init__(self, exchange, recorder=None):
+        self._exchange = exchange
+        self.recorder = recorder or MarketRecorder(os.getenv('RECORD_DIR', DEFAULT_RECORD_DIR))
+
+    def __getattr__(self, name):
+        attr = getattr(self._exchange, name)
+        if name not in RECORDED_METHODS or not callable(attr):
+            return attr
+
+        def recorded(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            try:
+                self.recorder.write(RECORDED_METHODS[name], name, {'args': list(args), 'kwargs': kwargs}, result)
+            except Exception as e:
+                print(f"📼 RECORDER ERROR: {e}")
+            return result
+        return recorded
+
+
+class ReplayConnector(MockKuCoinConnector):
+    """
+    Paper exchange driven by a recording instead of a synthetic path.
+    Recorded tickers become the price path (matched tick by tick, in recording
+    order), recorded klines and order books are served as of the replay time,
+    and the bot's own orders fill on the mock matching engine.
+    The recording is shifted to start now and played `speed` times faster
+    (1x-1000x) through the mock's accelerated clock. Kline timestamps are shifted
+    by whole candles of their timeframe, so they keep their bucket boundaries.
+    """
+
+    def __init__(self, path, speed=1.0, install_clock=False, **kwargs):
+        super().__init__(speed=speed, price_path=[], install_clock=install_clock, **kwargs)
+        records = read_records(path)
+        if not records:
+            raise ValueError(f"No records found in {path}")
+        self._offset = self._t0 - records[0]['t'] # Recording time -> replay time
+        self.end_time = records[-1]['t'] + self._offset
+
+        ticks = {} # symbol -> ([times], [prices])
+        self._snapshots = {} # (kind, symbol, extra) -> ([times], [results])
+        for r in records:
+            t = r['t'] + self._offset
+            args = r['a'].get('args', [])
+            if r['k'] == 'ticker' and r['r'] and args:
+                self._append(ticks, args[0], t, float(r['r']))
+            elif r['k'] == 'tickers' and r['r']:
+                for symbol, price in r['r'].items():
+                    if price:
+                        self._append(ticks, symbol, t, float(price))
+            elif r['k'] == 'klines' and args:
+                timeframe = args[1] if len(args) > 1 else r['a'].get('kwargs', {}).get('timeframe', '5m')
+                self._append(self._snapshots, ('klines', args[0], timeframe), t, r['r'])
+            elif r['k'] == 'book' and args:
+                self._append(self._snapshots, ('book', args[0]), t, r['r'])
+        self._ticks = ticks
+        print(f"📼 REPLAY: {len(records)} records, {len(ticks)} symbols, {self.end_time - self._t0:.0f}s of market at x{self.clock.speed:g}.")
+
+    @staticmethod
+    def _append(index, key, t, value):
+        times, values = index.setdefault(key, ([], []))
+        times.append(t)
+        values.append(value)
+
+    def _snapshot(self, key):
+        times, values = self._snapshots.get(key, ([], []))
+        i = bisect_right(times, self.clock.time())
+        return values[i - 1] if i else None
+
+    # --- Price path from the recorded ticks ---
+
+    def _symbols(self):
+        return list(self._ticks)
+
+    def _path(self, symbol):
+        if symbol not in self._last_step:
+            times = self._ticks.get(symbol, ([], []))[0]
+            self._last_step[symbol] = bisect_right(times, self.clock.time()) - 1
+        return None
+
+    def _advance(self, symbol):
+        self._path(symbol)
+        times, prices = self._ticks.get(symbol, ([], []))
+        now_idx = bisect_right(times, self.clock.time()) - 1
+        for i in range(self._last_step[symbol] + 1, now_idx + 1):
+            self._match(symbol, prices[i], times[i])
+        self._last_step[symbol] = max(self._last_step[symbol], now_idx)
+        return prices[now_idx] if now_idx >= 0 else None
+
+    def get_ticker_price(self, symbol):
+        with self._lock:
+            return self._advance(symbol)
+
+    def get_all_ticker_prices(self):
+        with self._lock:
+            prices = {s: self._advance(s) for s in self._ticks}
+            return {s: p for s, p in prices.items() if p is not None}
+
+    def get_historical_data(self, symbol, timeframe='5m', limit=100):
+        with self._lock:
+            self._advance(symbol)
+            data = self._snapshot(('klines', symbol, timeframe))
+            if not data:
+                return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            df = pd.DataFrame(data['data'], columns=data['columns'])
+            df['timestamp'] = df['timestamp'] + self._kline_offset(timeframe) * 1000 # Candles follow the shifted timeline
+            return df.tail(limit).reset_index(drop=True)
+
+    def _kline_offset(self, timeframe):
+        """The replay offset rounded to whole candles, so shifted candles stay on the timeframe's buckets."""
+        step = TF_SECONDS.get(timeframe)
+        if not step:
+            return self._offset
+        return round(self._offset / step) * step
+
+    def get_order_book(self, symbol, limit=20):
+        with self._lock:
+            self._advance(symbol)
+            return self._snapshot(('book', symbol))
+
+    @property
+    def finished(self):
+        return self.clock.time() >= self.end_time
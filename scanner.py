@@ -0,0 +1,191 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import pandas as pd
+import technical_analysis as ta
+from autorange import TIMEFRAME_SECONDS
+from config import DEFAULT_SCANNER_TIMEFRAME, DEFAULT_STRATEGIST_INTERVAL
+from rate_limiter import RateLimiter
+
+DEFAULT_SCANNER_WORKERS = 8
+SCANNER_RATE_SHARE = 0.5 # Share of the connector's request budget the scanner may use with no grid running
+GRID_RATE_RESERVE = 0.1 # Share taken back from the scanner for every active grid
+MIN_SCANNER_RATE_SHARE = 0.05
+SCANNER_BARS = 100 # Closed candles kept per contract
+MIN_SCORED_BARS = 40 # Shorter histories (new listings) are not ranked
+MIN_TURNOVER = 1_000_000 # USDT traded in 24h: below this a grid would not fill
+CONTRACTS_REFRESH = 3600 # Seconds between reloads of the contract list
+DEADLINE_SHARE = 0.8 # Part of STRATEGIST_INTERVAL a refresh may take
+
+# Scoring: grids earn on volatility inside a range, and lose on trends
+ADX_RANGING = 15 # At or below: fully range-bound
+ADX_TRENDING = 35 # At or above: trending, score 0
+
+
+def score_candidates(metrics, turnover=None):
+    """
+    Ranks the scan_metrics() rows. Volatility is the ATR% percentile across the
+    contracts; range-boundness goes from 1 (ADX <= ADX_RANGING) to 0 (ADX >= ADX_TRENDING).
+    score = 100 * volatility * range-boundness. Returns a DataFrame, best first.
+    """
+    m = metrics.dropna(subset=['atr_pct', 'adx', 'bb_width']).copy()
+    if turnover is not None:
+        m['turnover'] = pd.Series(turnover, dtype=np.float64).reindex(m.index)
+        m = m[m['turnover'].fillna(0) >= MIN_TURNOVER]
+    if m.empty:
+        return m.assign(score=pd.Series(dtype=np.float64))
+    volatility = m['atr_pct'].rank(pct=True)
+    ranging = ((ADX_TRENDING - m['adx']) / (ADX_TRENDING - ADX_RANGING)).clip(0, 1)
+    m['score'] = 100 * volatility * ranging
+    return m.sort_values(['score', 'atr_pct'], ascending=False)
+
+
+class ContractScanner:
+    """
+    Keeps the closed candles of every active USDT-M contract current and publishes
+    a ranked list of grid candidates (`scanner_candidates` table, /api/scanner).
+
+    Kline requests are spread over a worker pool; each request also takes a token
+    from the scanner's own limiter, capped at a share of the connector's budget that
+    shrinks with the number of active grids, so the live grids keep theirs. A contract
+    is only fetched again once a new candle has closed, and the refresh stops at a
+    deadline inside STRATEGIST_INTERVAL: fetches not started by then take no token and
+    are picked up on the next run, those already in flight still store their candles.
+    """
+
+    def __init__(self, exchange, db_manager, workers=DEFAULT_SCANNER_WORKERS):
+        self.exchange = exchange
+        self.db = db_manager
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scanner')
+        connector_limiter = getattr(exchange, 'rate_limiter', None)
+        self.limiter = RateLimiter(connector_limiter.rate * SCANNER_RATE_SHARE) if connector_limiter else None
+        self._connector_rate = connector_limiter.rate if connector_limiter else None
+        self.klines = {} # symbol -> DataFrame of closed candles
+        self._klines_lock = threading.Lock()
+        self.contracts = {} # symbol -> 24h turnover
+        self._contracts_ts = 0
+        self._timeframe = None
+        self.in_flight = 0 # Fetches still running after the last deadline
+        self._running = {} # symbol -> future of its last fetch
+        self._lock = threading.Lock()
+
+    def _load_contracts(self, now):
+        if self.contracts and now - self._contracts_ts < CONTRACTS_REFRESH:
+            return
+        contracts = self.exchange.get_active_contracts()
+        if contracts:
+            self.contracts = contracts
+            self._contracts_ts = now
+            with self._klines_lock:
+                for gone in set(self.klines) - set(contracts):
+                    del self.klines[gone] # Delisted
+
+    def _stale(self, timeframe, now):
+        """Contracts whose cached candles miss the last closed one."""
+        tf = TIMEFRAME_SECONDS[timeframe]
+        last_closed_open = (int(now) // tf - 1) * tf
+        return [s for s in self.contracts
+                if s not in self.klines or not len(self.klines[s]) or self.klines[s]['timestamp'].iloc[-1] / 1000 < last_closed_open]
+
+    def _rate_share(self):
+        grids = len(self.db.get_active_symbols())
+        return max(MIN_SCANNER_RATE_SHARE, SCANNER_RATE_SHARE - GRID_RATE_RESERVE * grids)
+
+    def _fetch(self, symbol, timeframe, now, deadline):
+        """
+        Fetches and stores the closed candles of a contract. Returns True when stored,
+        False when the exchange had none, None when skipped (deadline passed, no token taken).
+        The candles are stored here, so a fetch that ends after the deadline is not lost.
+        """
+        if time.monotonic() >= deadline:
+            return None
+        if self.limiter:
+            self.limiter.acquire()
+        df = self.exchange.get_historical_data(symbol, timeframe=timeframe, limit=SCANNER_BARS + 1)
+        if df is None or df.empty:
+            return False
+        tf = TIMEFRAME_SECONDS[timeframe]
+        df = df[df['timestamp'] / 1000 + tf <= now] # Closed candles only
+        with self._klines_lock:
+            if self._timeframe == timeframe:
+                self.klines[symbol] = df.tail(SCANNER_BARS).reset_index(drop=True)
+        return True
+
+    def refresh(self, timeframe, deadline, now=None):
+        """
+        Fetches the stale contracts until `deadline` (time.monotonic). Returns (fetched,
+        errors, pending): pending ones were not started and wait for the next run.
+        """
+        now = now or time.time()
+        self._load_contracts(now)
+        if timeframe != self._timeframe:
+            with self._klines_lock:
+                self.klines, self._timeframe = {}, timeframe
+        # A fetch still in flight from the previous run is not started twice
+        self._running = {s: f for s, f in self._running.items() if not f.done()}
+        stale = [s for s in self._stale(timeframe, now) if s not in self._running]
+        for s in stale:
+            self._running[s] = self.pool.submit(self._fetch, s, timeframe, now, deadline)
+        futures = {self._running[s] for s in stale}
+        fetched = errors = pending = 0
+        while futures:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, futures = wait(futures, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    stored = future.result()
+                except Exception:
+                    errors += 1
+                    continue
+                if stored is None:
+                    pending += 1
+                elif stored:
+                    fetched += 1
+                else:
+                    errors += 1
+        for future in futures:
+            if future.cancel():
+                pending += 1 # Not started yet: next run
+        # In-flight fetches finish in the background and keep their candles
+        self.in_flight = sum(1 for f in futures if not f.cancelled())
+        return fetched, errors, pending
+
+    def run_once(self, interval=None):
+        """One refresh + scoring pass. Returns the ranked candidates DataFrame."""
+        started = time.monotonic()
+        interval = interval or self.db.get_setting('STRATEGIST_INTERVAL', DEFAULT_STRATEGIST_INTERVAL)
+        timeframe = self.db.get_setting('SCANNER_TIMEFRAME', DEFAULT_SCANNER_TIMEFRAME)
+        if timeframe not in TIMEFRAME_SECONDS:
+            timeframe = DEFAULT_SCANNER_TIMEFRAME
+        now = time.time()
+        if self.limiter:
+            self.limiter.rate = self._connector_rate * self._rate_share()
+
+        with self._lock:
+            fetched, errors, pending = self.refresh(timeframe, started + interval * DEADLINE_SHARE, now)
+            fetch_time = time.monotonic() - started
+
+            with self._klines_lock:
+                frames = {s: df for s, df in self.klines.items() if len(df) >= MIN_SCORED_BARS}
+            ranked = score_candidates(ta.scan_metrics(frames), self.contracts)
+
+        candidates = [dict(symbol=symbol, **{k: float(v) for k, v in row.items()}) for symbol, row in ranked.iterrows()]
+        self.db.save_scanner_candidates(candidates, timeframe)
+        elapsed = time.monotonic() - started
+        self.db.update_state('scanner', {
+            'contracts': len(self.contracts), 'scored': len(frames), 'candidates': len(candidates),
+            'fetched': fetched, 'errors': errors, 'pending': pending, 'in_flight': self.in_flight, 'timeframe': timeframe,
+            'fetch_seconds': round(fetch_time, 3), 'seconds': round(elapsed, 3),
+        })
+        if pending or self.in_flight:
+            self.db.log("Scanner", f"Refresh hit its deadline: {pending} contracts left for the next run, {self.in_flight} still in flight.", "WARNING")
+        if fetched or errors:
+            top = ', '.join(candidates[i]['symbol'] for i in range(min(3, len(candidates))))
+            self.db.log("Scanner", f"Scanned {len(frames)} contracts ({fetched} refreshed, {errors} errors) in {elapsed:.1f}s. Top: {top}", "INFO")
+        return ranked
+
+    def stop(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
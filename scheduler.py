@@ -0,0 +1,64 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class SymbolScheduler:
+    """
+    Runs per-symbol work on a bounded thread pool.
+    Tasks of the same symbol run one at a time, in submission order (a "lane"),
+    while different symbols run concurrently. Tasks submitted with a `key` are
+    coalesced: while one with the same (symbol, key) is queued, new ones are dropped.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, on_error=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="GridWorker")
+        self._lock = threading.Lock()
+        self._lanes = {} # symbol -> deque of (key, fn, args, kwargs)
+        self._running = set() # symbols with a task on the pool
+        self._queued_keys = set() # (symbol, key) waiting in a lane
+        self._on_error = on_error
+
+    def submit(self, symbol, fn, *args, key=None, **kwargs):
+        with self._lock:
+            if key is not None:
+                if (symbol, key) in self._queued_keys:
+                    return False
+                self._queued_keys.add((symbol, key))
+            self._lanes.setdefault(symbol, deque()).append((key, fn, args, kwargs))
+            if symbol not in self._running:
+                self._start_next(symbol)
+        return True
+
+    def _start_next(self, symbol):
+        """Pops the next task of a lane onto the pool. Must hold the lock."""
+        lane = self._lanes.get(symbol)
+        if not lane:
+            self._running.discard(symbol)
+            self._lanes.pop(symbol, None)
+            return
+        key, fn, args, kwargs = lane.popleft()
+        self._queued_keys.discard((symbol, key))
+        self._running.add(symbol)
+        self._pool.submit(self._run_task, symbol, fn, args, kwargs)
+
+    def _run_task(self, symbol, fn, args, kwargs):
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            if self._on_error:
+                self._on_error(symbol, fn, e)
+        finally:
+            with self._lock:
+                self._start_next(symbol)
+
+    def pending(self, symbol=None):
+        with self._lock:
+            if symbol is not None:
+                return len(self._lanes.get(symbol, ())) + (symbol in self._running)
+            return sum(len(lane) for lane in self._lanes.values()) + len(self._running)
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,56 @@
+import threading
+import time
+from contextlib import contextmanager
+
+PROCESS_START = time.perf_counter() # Imported first by the entry points: the origin of every timing
+
+
+class StartupTimer:
+    """
+    Records how long each import and initialization phase of a process takes, and
+    when it reaches its milestones ("serving", "trading"), from PROCESS_START.
+
+        with startup.phase('import connector'):
+            from connector_kucoin import KuCoinConnector
+        startup.mark('trading')
+    """
+
+    def __init__(self):
+        self.phases = [] # (name, thread, seconds)
+        self.marks = {} # milestone -> seconds since PROCESS_START
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append((name, threading.current_thread().name, time.perf_counter() - started))
+
+    def mark(self, milestone):
+        elapsed = time.perf_counter() - PROCESS_START
+        with self._lock:
+            self.marks[milestone] = elapsed
+        print(f"⏱️ STARTUP: {milestone} after {elapsed:.2f}s")
+        return elapsed
+
+    def report(self, db=None):
+        """Prints the phases, slowest first, and stores them in the `startup` state."""
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: -p[2])
+            marks = dict(self.marks)
+        print("⏱️ STARTUP REPORT:")
+        for name, thread, seconds in phases:
+            print(f"   {name:<32} {seconds * 1000:>9.1f} ms  [{thread}]")
+        for milestone, seconds in sorted(marks.items(), key=lambda m: m[1]):
+            print(f"   ➜ {milestone:<30} {seconds * 1000:>9.1f} ms")
+        if db is not None:
+            db.update_state('startup', {
+                'phases': [{'name': n, 'thread': t, 'seconds': round(s, 4)} for n, t, s in phases],
+                'marks': {m: round(s, 4) for m, s in marks.items()},
+            })
+
+
+startup = StartupTimer()
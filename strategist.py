@@ -1,5 +1,12 @@
 import time
 import numpy as np
+import grid
+from autorange import AutoRanger
+from candles import CandleAggregator
+from indicator_cache import IndicatorCache
+from events import OrderAck
+from order_journal import OrderJournal
+from grid_config_cache import GridConfigCache
 
 class Strategist:
     def __init__(self, exchange, shared_state, db_manager):
@@ -8,97 +15,197 @@ class Strategist:
         self.db = db_manager
         # Cache to prevent re-creating the grid on every check if nothing has changed
         self.grid_orders_placed = False
-
-    def run(self):
-        print("📈 STRATEGIST: Online. Mode: GRID BOT.")
-        while True:
-            interval = self.db.get_setting('STRATEGIST_INTERVAL', 60)
-            try:
-                self._maintain_grid()
-            except Exception as e:
-                print(f"📈 STRATEGIST ERROR: {e}")
-                self.db.log("Strategist", f"CRITICAL ERROR: {e}", "ERROR")
-            time.sleep(interval)
-
-    def _maintain_grid(self):
+        # Hook used by the engine to receive OrderAck events
+        self.publish = lambda event: None
+        # One 1m stream per symbol feeds every timeframe the strategy reads
+        self.candles = CandleAggregator(exchange)
+        # Indicator reads are free until the next candle of their timeframe closes
+        self.indicators = IndicatorCache(self.candles)
+        # Volatility-derived ranges (GRID_AUTO_RANGE mode)
+        self.auto_range = AutoRanger(self.candles, db_manager, indicators=self.indicators)
+        # Every grid order is journaled under its client OID before it is sent
+        self.journal = OrderJournal(db_manager)
+        # Grid configs read on the tick path, invalidated by the engine on SettingsChanged
+        self.grid_configs = GridConfigCache(db_manager)
+
+    def _grid_config(self, symbol):
+        """Grid config of a symbol, with range and levels replaced by the auto-range when enabled."""
+        config = dict(self.grid_configs.get(symbol))
+        if config.get('GRID_AUTO_RANGE'):
+            auto = self.auto_range.current(symbol)
+            if auto:
+                config['GRID_RANGE_LOW'] = auto['low']
+                config['GRID_RANGE_HIGH'] = auto['high']
+                config['GRID_LEVELS'] = auto['levels']
+        return config
+
+    def update_auto_range(self, symbol):
+        """
+        Recomputes the ATR/Bollinger range of a symbol when a new candle has closed.
+        Returns True when the range changed; the next grid pass then moves only the
+        levels that differ (levels sit on a fixed lattice, see autorange.compute_range).
+        """
+        config = self.grid_configs.get(symbol)
+        if not config.get('GRID_AUTO_RANGE'):
+            return False
+        increment = self.exchange.get_price_increment(symbol)
+        if not increment:
+            return False
+        new = self.auto_range.update(symbol, increment, config['GRID_LEVELS'])
+        if not new:
+            return False
+        self.db.log("Strategist", f"Auto-range {symbol}: {new['low']} - {new['high']}, {new['levels']} levels (ATR {new['atr']:.2f}, spacing {new['spacing_ticks']} ticks)", "INFO")
+        return True
+
+    def grid_levels(self, symbol):
+        """Returns the tick-rounded grid prices of a symbol (empty if not configured)."""
+        config = self._grid_config(symbol)
+        low, high, levels = config['GRID_RANGE_LOW'], config['GRID_RANGE_HIGH'], config['GRID_LEVELS']
+        if not all([low, high, levels]):
+            return []
+        increment = self.exchange.get_price_increment(symbol)
+        if not increment:
+            return []
+        ticks = np.unique(grid.to_ticks(np.linspace(low, high, levels), increment))
+        return grid.to_prices(ticks, increment).tolist()
+
+    def _maintain_grid(self, symbol, only_levels=None, current_price=None):
         """
-        Calculates and places the grid limit orders.
-        This is the core logic to set up the static grid based on user settings.
+        Reconciles the desired grid of `symbol` with its live grid orders and persists
+        the result in the `grid_levels` table.
+        Prices are compared as integer ticks, so rounding noise can never produce a
+        missed match or a duplicate order. When `only_levels` is given, only those grid
+        prices are replenished and nothing is canceled (used by the engine when a price
+        move crosses specific levels).
         """
-        # Grid bot is designed to run on ONE symbol at a time
-        symbols = self.db.get_setting('SYMBOLS', [])
-        if not symbols:
+        if self.shared_state.get('paused_until', {}).get(symbol, 0) > time.time():
             return
-        symbol = symbols[0]
 
-        # Get grid parameters from DB
-        low = self.db.get_setting('GRID_RANGE_LOW')
-        high = self.db.get_setting('GRID_RANGE_HIGH')
-        levels = self.db.get_setting('GRID_LEVELS')
-        side = self.db.get_setting('GRID_SIDE', 'NEUTRAL')
+        # Get grid parameters (per-symbol config, falling back to global settings)
+        config = self._grid_config(symbol)
+        low = config['GRID_RANGE_LOW']
+        high = config['GRID_RANGE_HIGH']
+        levels = config['GRID_LEVELS']
+        side = config['GRID_SIDE']
 
         if not all([low, high, levels]):
-            self.db.log("Strategist", "Grid parameters are not fully configured. Halting.", "WARNING")
+            self.db.log("Strategist", f"Grid parameters for {symbol} are not fully configured. Halting.", "WARNING")
             return
 
-        # --- Grid Calculation ---
-        # Create a series of prices from low to high
-        grid_prices = np.linspace(low, high, levels)
+        increment = self.exchange.get_price_increment(symbol)
+        if not increment:
+            self.db.log("Strategist", f"Unknown price increment for {symbol}. Skipping grid maintenance.", "WARNING")
+            return
 
         # --- Get Current State ---
-        current_price = self.exchange.get_ticker_price(symbol)
+        if not current_price:
+            current_price = self.exchange.get_ticker_price(symbol)
         if not current_price:
             self.db.log("Strategist", f"Could not fetch current price for {symbol}. Skipping grid maintenance.", "WARNING")
             return
 
+        # --- Grid Calculation (integer ticks) ---
+        desired = grid.desired_grid(low, high, levels, increment, current_price, side)
+
+        # Grid orders are the plain limit orders; reduce-only limits are profit-takes
         open_orders = self.exchange.get_open_orders(symbol)
-        open_order_prices = {float(o['price']) for o in open_orders if o['type'] == 'limit'}
-
-        self.db.log("Strategist", f"Maintaining grid for {symbol}. Found {len(open_order_prices)} open limit orders.", "DEBUG")
-
-        # --- Place Missing Orders ---
-        for price in grid_prices:
-            # Round the calculated price to the correct precision for the exchange
-            rounded_price = self.exchange.round_price(symbol, price)
-
-            if rounded_price in open_order_prices:
-                continue # Order already exists
-
-            # Determine order side based on price relative to current market price
-            order_side = None
-            if side == 'NEUTRAL':
-                if rounded_price < current_price:
-                    order_side = 'buy'
-                else:
-                    order_side = 'sell'
-            elif side == 'LONG':
-                 if rounded_price < current_price:
-                    order_side = 'buy'
-            elif side == 'SHORT':
-                if rounded_price > current_price:
-                    order_side = 'sell'
-
-            if order_side:
-                self.db.log("Strategist", f"Placing missing grid order: {order_side} {symbol} @ {rounded_price}", "INFO")
-
-                order_size_usdt = self.db.get_setting('BASE_ORDER_SIZE')
-                leverage = self.db.get_setting('LEVERAGE')
-
-                # Calculate the size in base currency (e.g., BTC) for the limit order
-                # This is a simplified calculation. A more robust one would use the contract multiplier.
-                # Size = (USDT Amount * Leverage) / Price
-                notional_size = (order_size_usdt * leverage) / rounded_price
-
-                # KuCoin Futures orders are in integer lots, so we must round down.
-                order_size_lots = int(notional_size)
-
-                if order_size_lots > 0:
-                    self.exchange.place_limit_order(
-                        symbol,
-                        order_side,
-                        order_size_lots,
-                        rounded_price
-                    )
-                else:
-                    self.db.log("Strategist", f"Order size for {symbol} @ {rounded_price} is zero. Skipping. Increase BASE_ORDER_SIZE.", "WARNING")
-                time.sleep(0.2) # Avoid rate limiting
+        live_orders = [o for o in open_orders if o['type'] == 'limit' and not o.get('reduceOnly')]
+        live_ticks = grid.to_ticks([o['price'] for o in live_orders], increment)
+
+        diff = grid.reconcile(desired.ticks, live_ticks)
+
+        self.db.log("Strategist", f"Maintaining grid for {symbol}. {len(diff.keep)} kept, {len(diff.place)} missing, {len(diff.cancel)} stale.", "DEBUG")
+
+        order_ids = np.full(len(desired.ticks), None, dtype=object)
+        order_ids[diff.keep] = [live_orders[i]['id'] for i in diff.keep_live]
+
+        to_place = diff.place
+        if only_levels is not None:
+            subset = grid.to_ticks(only_levels, increment)
+            to_place = to_place[np.isin(desired.ticks[to_place], subset)]
+
+        prices = grid.to_prices(desired.ticks, increment)
+        order_size_usdt = config['BASE_ORDER_SIZE']
+        leverage = config['LEVERAGE']
+
+        # Calculate the size in base currency (e.g., BTC) for the limit order
+        # This is a simplified calculation. A more robust one would use the contract multiplier.
+        # Size = (USDT Amount * Leverage) / Price
+        # KuCoin Futures orders are in integer lots, so we must round down.
+        sizes = np.floor((order_size_usdt * leverage) / prices).astype(np.int64)
+
+        placements = [] # desired level indexes to fill
+        for i in to_place:
+            order_side = grid.SIDE_NAMES[int(desired.sides[i])]
+            if not order_side:
+                continue
+            if sizes[i] <= 0:
+                self.db.log("Strategist", f"Order size for {symbol} @ {float(prices[i])} is zero. Skipping. Increase BASE_ORDER_SIZE.", "WARNING")
+                continue
+            placements.append(int(i))
+
+        # --- Move stale orders onto missing levels (full pass only) ---
+        # A re-center turns into N moves instead of N cancels plus N placements.
+        # Orders whose tick did not change are never touched and keep their queue priority.
+        stale = [int(li) for li in diff.cancel] if only_levels is None else []
+        n_moves = min(len(stale), len(placements))
+        moves = list(zip(stale[:n_moves], placements[:n_moves])) # (live index, desired index)
+        stale, placements = stale[n_moves:], placements[n_moves:]
+
+        def _request(i):
+            return {'side': grid.SIDE_NAMES[int(desired.sides[i])], 'size': int(sizes[i]), 'price': float(prices[i])}
+
+        def _journaled(indexes):
+            intents = [self.journal.intent(symbol, level_idx=int(desired.level_idx[i]), **_request(i)) for i in indexes]
+            self.journal.record(intents)
+            return intents
+
+        def _acked(i, order):
+            if order:
+                order_ids[i] = order['id']
+                req = _request(i)
+                self.publish(OrderAck(symbol, order['id'], req['side'], req['price'], req['size']))
+
+        if moves:
+            self.db.log("Strategist", f"Repricing {len(moves)} grid orders for {symbol}.", "INFO")
+            intents = _journaled([i for _, i in moves])
+            amendments = [dict(_request(i), id=live_orders[li]['id'], client_oid=intent['client_oid'])
+                          for (li, i), intent in zip(moves, intents)]
+            results, canceled = self.exchange.amend_orders(symbol, amendments)
+            self.journal.acked(intents, results)
+            self.journal.canceled(canceled or []) # A failed cancel leaves the old order live: it stays journaled as open
+            for (_, i), order in zip(moves, results):
+                _acked(i, order)
+
+        # --- Place Missing Orders (batched) ---
+        if placements:
+            self.db.log("Strategist", f"Placing {len(placements)} missing grid orders for {symbol}.", "INFO")
+            intents = _journaled(placements)
+            requests = [dict(_request(i), client_oid=intent['client_oid']) for i, intent in zip(placements, intents)]
+            results = self.exchange.place_limit_orders(symbol, requests)
+            self.journal.acked(intents, results)
+            for i, order in zip(placements, results):
+                _acked(i, order)
+
+        # --- Cancel what is left of the stale / duplicate orders, after the new ones are on the book ---
+        if stale:
+            for li in stale:
+                order = live_orders[li]
+                self.db.log("Strategist", f"Canceling stale grid order {order['id']} {order['side']} @ {order['price']}", "INFO")
+            canceled = self.exchange.cancel_orders(symbol, [live_orders[li]['id'] for li in stale])
+            self.journal.canceled(canceled or [])
+
+        # --- Persist Level Table ---
+        rows = [
+            {
+                'level_idx': int(desired.level_idx[i]),
+                'tick_price': int(desired.ticks[i]),
+                'price': float(prices[i]),
+                'side': grid.SIDE_NAMES[int(desired.sides[i])],
+                'order_id': order_ids[i],
+                'state': 'open' if order_ids[i] else 'empty'
+            }
+            for i in range(len(desired.ticks))
+            if only_levels is None or order_ids[i]
+        ]
+        self.db.save_grid_levels(symbol, rows, replace=only_levels is None)
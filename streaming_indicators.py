@@ -0,0 +1,344 @@
+import math
+from collections import deque
+
+NAN = float('nan')
+
+# Stateful, O(1)-per-candle versions of the technical_analysis indicators.
+# Each one reproduces the pandas recurrences of the batch function (rolling windows
+# with Kahan/Welford updates, ewm with adjust=False), so after the same candles
+# `value` equals the batch `.iloc[-1]`.
+#
+#   rsi = RSI(14); rsi.warm_up(df)          # history, oldest first
+#   rsi.update(closed_candle)               # a candle closed: folded into the state
+#   rsi.peek(forming_candle)                # tentative value, state untouched
+
+
+def _price(candle, key='close'):
+    if isinstance(candle, (int, float)):
+        return float(candle)
+    return float(candle[key])
+
+def _div(a, b):
+    """a / b with the IEEE results pandas gives (inf, nan) instead of ZeroDivisionError."""
+    if b == 0:
+        if a == 0 or a != a:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+def _signbit(x):
+    return math.copysign(1.0, x) < 0
+
+
+# --- Primitives: step(x, commit) returns the new output; commit=False leaves the state as it was ---
+
+class RollingMean:
+    """`Series.rolling(window).mean()`: Kahan-compensated running sum over a ring buffer."""
+
+    def __init__(self, window):
+        self.window = window
+        self._buf = deque()
+        self._state = (0.0, 0.0, 0, 0, 0, NAN) # sum, compensation, nobs, negatives, same-value run, last value
+
+    def step(self, x, commit=True):
+        total, comp, nobs, neg, same, prev = self._state
+        if len(self._buf) == self.window:
+            old = self._buf[0]
+            if old == old:
+                nobs -= 1
+                y = -old - comp
+                t = total + y
+                comp = t - total - y
+                total = t
+                if _signbit(old):
+                    neg -= 1
+        if x == x:
+            nobs += 1
+            y = x - comp
+            t = total + y
+            comp = t - total - y
+            total = t
+            if _signbit(x):
+                neg += 1
+            same = same + 1 if x == prev else 1
+            prev = x
+
+        if nobs >= self.window:
+            result = total / nobs
+            if same >= nobs:
+                result = prev # Constant window: exact
+            elif neg == 0 and result < 0:
+                result = 0.0
+            elif neg == nobs and result > 0:
+                result = 0.0
+        else:
+            result = NAN
+
+        if commit:
+            self._buf.append(x)
+            if len(self._buf) > self.window:
+                self._buf.popleft()
+            self._state = (total, comp, nobs, neg, same, prev)
+        return result
+
+
+class RollingStd:
+    """`Series.rolling(window).std()` (ddof=1): Welford add/remove over a ring buffer."""
+
+    def __init__(self, window, ddof=1):
+        self.window = window
+        self.ddof = ddof
+        self._buf = deque()
+        self._state = (0, 0.0, 0.0, 0.0) # nobs, mean, sum of squared deviations, compensation
+
+    def step(self, x, commit=True):
+        nobs, mean, ssqdm, comp = self._state
+        if len(self._buf) == self.window:
+            old = self._buf[0]
+            if old == old:
+                nobs -= 1
+                if nobs:
+                    prev_mean = mean - comp
+                    y = old - comp
+                    t = y - mean
+                    comp = t + mean - y
+                    mean = mean - t / nobs
+                    ssqdm = ssqdm - (old - prev_mean) * (old - mean)
+                else:
+                    mean = ssqdm = 0.0
+        if x == x:
+            nobs += 1
+            prev_mean = mean - comp
+            y = x - comp
+            t = y - mean
+            comp = t + mean - y
+            mean = mean + t / nobs
+            ssqdm = ssqdm + (x - prev_mean) * (x - mean)
+
+        if nobs >= self.window and nobs > self.ddof:
+            var = 0.0 if nobs == 1 else max(ssqdm / (nobs - self.ddof), 0.0)
+            result = math.sqrt(var)
+        else:
+            result = NAN
+
+        if commit:
+            self._buf.append(x)
+            if len(self._buf) > self.window:
+                self._buf.popleft()
+            self._state = (nobs, mean, ssqdm, comp)
+        return result
+
+
+class RollingExtreme:
+    """`Series.rolling(window).min()` / `.max()` with a monotonic deque (amortized O(1))."""
+
+    def __init__(self, window, mode='min'):
+        self.window = window
+        self._better = (lambda a, b: a <= b) if mode == 'min' else (lambda a, b: a >= b)
+        self._deque = deque() # (index, value), values monotonic, front = extreme of the window
+        self._n = 0
+        self._last_nan = -math.inf
+
+    def step(self, x, commit=True):
+        i = self._n
+        start = i - self.window + 1
+        if x != x or start < 0 or self._last_nan >= start:
+            result = NAN
+        else:
+            result = x
+            for idx, value in self._deque: # At most one entry has expired
+                if idx >= start:
+                    if self._better(value, x):
+                        result = value
+                    break
+
+        if commit:
+            self._n += 1
+            while self._deque and self._deque[0][0] <= i - self.window:
+                self._deque.popleft()
+            if x != x:
+                self._last_nan = i
+                self._deque.clear() # Whatever came before the NaN leaves the window with it
+            else:
+                while self._deque and self._better(x, self._deque[-1][1]):
+                    self._deque.pop()
+                self._deque.append((i, x))
+        return result
+
+
+class EWM:
+    """`Series.ewm(..., adjust=False).mean()`, same float operations as pandas (NaN gaps included)."""
+
+    def __init__(self, span=None, alpha=None):
+        # pandas goes through the center of mass, so alpha is derived the same way
+        com = (span - 1) / 2.0 if span is not None else (1 - alpha) / alpha
+        self.alpha = 1.0 / (1.0 + com)
+        self._factor = 1.0 - self.alpha
+        self._state = (NAN, 1.0) # weighted, old weight
+
+    def step(self, x, commit=True):
+        weighted, old_wt = self._state
+        if weighted == weighted:
+            old_wt *= self._factor
+            if x == x:
+                if weighted != x:
+                    weighted = old_wt * weighted + self.alpha * x
+                    weighted /= (old_wt + self.alpha)
+                old_wt = 1.0
+        elif x == x:
+            weighted = x
+        if commit:
+            self._state = (weighted, old_wt)
+        return weighted
+
+
+# --- Indicators ---
+
+class StreamingIndicator:
+    """update() folds a closed candle into the state, peek() evaluates the forming one without doing so."""
+    value = None
+
+    def update(self, candle):
+        self.value = self._step(candle, True)
+        return self.value
+
+    def peek(self, candle):
+        return self._step(candle, False)
+
+    def warm_up(self, candles):
+        """Feeds a history (DataFrame or iterable of candles), oldest first."""
+        if hasattr(candles, 'to_dict'):
+            candles = candles.to_dict('records')
+        for candle in candles:
+            self.update(candle)
+        return self.value
+
+    def _step(self, candle, commit):
+        raise NotImplementedError
+
+
+class _TrueRange:
+    """TR = max(high - low, |high - prev close|, |low - prev close|); the first bar is high - low."""
+
+    def __init__(self):
+        self.prev = None # (high, low, close) of the last closed candle
+
+    def step(self, candle, commit=True):
+        high, low, close = _price(candle, 'high'), _price(candle, 'low'), _price(candle, 'close')
+        tr = high - low
+        if self.prev is not None:
+            prev_close = self.prev[2]
+            tr = max(tr, abs(high - prev_close), abs(low - prev_close))
+        prev = self.prev
+        if commit:
+            self.prev = (high, low, close)
+        return tr, prev
+
+
+class EMA(StreamingIndicator):
+    def __init__(self, span=200):
+        self._ewm = EWM(span=span)
+
+    def _step(self, candle, commit):
+        return self._ewm.step(_price(candle), commit)
+
+
+class ATR(StreamingIndicator):
+    def __init__(self, period=14):
+        self._tr = _TrueRange()
+        self._mean = RollingMean(period)
+
+    def _step(self, candle, commit):
+        tr, _ = self._tr.step(candle, commit)
+        return self._mean.step(tr, commit)
+
+
+class RSI(StreamingIndicator):
+    def __init__(self, period=14):
+        self._prev = None
+        self._gain = RollingMean(period)
+        self._loss = RollingMean(period)
+
+    def _step(self, candle, commit):
+        close = _price(candle)
+        delta = close - self._prev if self._prev is not None else NAN
+        # As in pandas: where() turns the missing first delta into 0, and the loss side is -0.0 when flat
+        gain = self._gain.step(delta if delta > 0 else 0.0, commit)
+        loss = self._loss.step(-(delta if delta < 0 else 0.0), commit)
+        if commit:
+            self._prev = close
+        return 100 - _div(100, 1 + _div(gain, loss))
+
+
+class StochRSI(StreamingIndicator):
+    def __init__(self, period=14, k_period=3, d_period=3):
+        self._rsi = RSI(period)
+        self._min = RollingExtreme(period, 'min')
+        self._max = RollingExtreme(period, 'max')
+        self._k = RollingMean(k_period)
+        self._d = RollingMean(d_period)
+
+    def _step(self, candle, commit):
+        rsi = self._rsi.update(candle) if commit else self._rsi.peek(candle)
+        low, high = self._min.step(rsi, commit), self._max.step(rsi, commit)
+        stoch = _div(rsi - low, high - low) * 100
+        k = self._k.step(stoch, commit)
+        return {'k': k, 'd': self._d.step(k, commit)}
+
+
+class MACD(StreamingIndicator):
+    def __init__(self, fast=12, slow=26, signal=9):
+        self._fast = EWM(span=fast)
+        self._slow = EWM(span=slow)
+        self._signal = EWM(span=signal)
+
+    def _step(self, candle, commit):
+        close = _price(candle)
+        macd = self._fast.step(close, commit) - self._slow.step(close, commit)
+        signal = self._signal.step(macd, commit)
+        return {'macd': macd, 'signal': signal, 'hist': macd - signal}
+
+
+class BollingerBands(StreamingIndicator):
+    def __init__(self, window=20, no_of_std=2):
+        self.no_of_std = no_of_std
+        self._mean = RollingMean(window)
+        self._std = RollingStd(window)
+
+    def _step(self, candle, commit):
+        close = _price(candle)
+        middle, std = self._mean.step(close, commit), self._std.step(close, commit)
+        upper = middle + (std * self.no_of_std)
+        lower = middle - (std * self.no_of_std)
+        return {
+            'upper': upper,
+            'middle': middle,
+            'lower': lower,
+            'percent_b': _div(close - lower, upper - lower)
+        }
+
+
+class ADX(StreamingIndicator):
+    def __init__(self, period=14):
+        self._tr = _TrueRange()
+        self._atr = EWM(alpha=1 / period)
+        self._plus = EWM(alpha=1 / period)
+        self._minus = EWM(alpha=1 / period)
+        self._adx = EWM(alpha=1 / period)
+
+    def _step(self, candle, commit):
+        tr, prev = self._tr.step(candle, commit)
+        plus_dm = minus_dm = 0.0
+        if prev is not None:
+            up_move = _price(candle, 'high') - prev[0]
+            down_move = prev[1] - _price(candle, 'low')
+            if up_move > down_move and up_move > 0:
+                plus_dm = up_move
+            if down_move > up_move and down_move > 0:
+                minus_dm = down_move
+
+        atr = self._atr.step(tr, commit)
+        plus_di = 100 * _div(self._plus.step(plus_dm, commit), atr)
+        minus_di = 100 * _div(self._minus.step(minus_dm, commit), atr)
+        dx = _div(100 * abs(plus_di - minus_di), plus_di + minus_di)
+        return self._adx.step(dx, commit)
@@ -0,0 +1,177 @@
+import argparse
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from db_manager import DB_PATH, DatabaseManager
+
+DEFAULT_SYMBOLS = {
+    'BTC/USDT:USDT': 65000.0,
+    'ETH/USDT:USDT': 3200.0,
+    'SOL/USDT:USDT': 150.0,
+    'XRP/USDT:USDT': 0.6,
+}
+DEFAULT_GRID_SPACING = 0.002 # Levels on a geometric lattice, 0.2% apart
+DEFAULT_ORDER_VALUE = 2000 # USDT per level (BASE_ORDER_SIZE * LEVERAGE)
+DEFAULT_FEE_RATE = 0.0002 # Maker
+BATCH_ROWS = 50_000 # Rows per executemany
+PATH_CHUNK = 1_000_000 # Steps generated at once
+
+
+def price_path(rng, start, steps, prev=None, sigma=0.0004, ranging_sigma=0.0012, half_life=2000):
+    """
+    Log-price of a ranging market: a slow random walk (the trend) plus a mean-reverting
+    AR(1) swing around it, which is what keeps a grid busy.
+    `prev` = (trend, swing) at the end of the previous chunk, so chunks join seamlessly.
+    Returns (prices, (trend, swing)).
+    """
+    alpha = 1 - 0.5 ** (1 / half_life)
+    trend0, swing0 = prev if prev else (np.log(start), 0.0)
+    trend = trend0 + np.cumsum(rng.normal(0, sigma, steps))
+    # AR(1) x_t = (1 - alpha) x_{t-1} + e_t, i.e. an EWM of e / alpha seeded with x_{-1}
+    shocks = np.concatenate(([swing0 * alpha], rng.normal(0, ranging_sigma, steps)))
+    swing = pd.Series(shocks).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:] / alpha
+    return np.exp(trend + swing), (trend[-1], swing[-1])
+
+def lattice_fills(prices, spacing):
+    """
+    Grid fills of a price path on a geometric lattice of levels: every level crossed
+    between two steps is one fill, a buy on the way down and a sell on the way up.
+    Returns (step index, level, side +1 buy / -1 sell) arrays, in execution order.
+    """
+    level = np.floor(np.log(prices) / np.log1p(spacing)).astype(np.int64)
+    moves = np.diff(level)
+    steps = np.flatnonzero(moves) + 1
+    counts = np.abs(moves[steps - 1])
+    direction = np.sign(moves[steps - 1])
+    starts = np.cumsum(counts) - counts
+    offset = np.arange(counts.sum()) - np.repeat(starts, counts) # 0..count-1 within a move
+    # Moving up from k to k+n crosses k+1..k+n; moving down from k to k-n crosses k..k-n+1
+    from_level = np.repeat(level[steps - 1], counts)
+    step_dir = np.repeat(direction, counts)
+    crossed = np.where(step_dir > 0, from_level + 1 + offset, from_level - offset)
+    return np.repeat(steps, counts), crossed, -step_dir
+
+def simulate_symbol(rng, start, target_fills, spacing=DEFAULT_GRID_SPACING):
+    """Draws path chunks until the grid has produced target_fills. Returns (fill arrays, total steps)."""
+    parts, prev, total_steps, found = [], None, 0, 0
+    while found < target_fills:
+        prices, prev = price_path(rng, start, PATH_CHUNK, prev)
+        steps, levels, sides = lattice_fills(prices, spacing)
+        parts.append((steps + total_steps, levels, sides))
+        total_steps += PATH_CHUNK
+        found += len(steps)
+    steps, levels, sides = (np.concatenate(a)[:target_fills] for a in zip(*parts))
+    return steps, levels, sides, total_steps
+
+def _chunks(n, size=BATCH_ROWS):
+    for lo in range(0, n, size):
+        yield lo, min(n, lo + size)
+
+def generate(db_path=DB_PATH, fills=1_000_000, days=365, symbols=None, logs_per_fill=2, spacing=DEFAULT_GRID_SPACING,
+             order_value=DEFAULT_ORDER_VALUE, fee_rate=DEFAULT_FEE_RATE, seed=None, end_time=None, clear=False):
+    """
+    Writes `fills` grid fills split across `symbols` (symbol -> start price) over
+    the last `days`, plus the RealisedPNL ledger entries of the fills that close
+    inventory and `logs_per_fill` Executioner log rows per fill.
+
+    Rows go in through executemany batches, one transaction per symbol, with
+    journaling relaxed for the load. Returns {'fills', 'ledger', 'logs'} counts.
+    """
+    symbols = symbols or DEFAULT_SYMBOLS
+    rng = np.random.default_rng(seed)
+    end_time = end_time or time.time()
+    span = days * 86400
+    DatabaseManager(db_path) # Schema
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    cursor = conn.cursor()
+    if clear:
+        for table in ('history_fills', 'history_ledger', 'logs'):
+            cursor.execute(f"DELETE FROM {table}")
+
+    counts = {'fills': 0, 'ledger': 0, 'logs': 0}
+    per_symbol = np.full(len(symbols), fills // len(symbols))
+    per_symbol[:fills % len(symbols)] += 1
+    for s, ((symbol, start), target) in enumerate(zip(symbols.items(), per_symbol)):
+        if target == 0:
+            continue
+        started = time.perf_counter()
+        steps, levels, sides, total_steps = simulate_symbol(rng, start, int(target), spacing)
+        # The path covers the whole window: step i happens at i / total_steps of it
+        ts = np.sort(end_time - span + (steps + rng.uniform(0, 1, len(steps))) * (span / total_steps))
+        price = np.exp(levels * np.log1p(spacing)) # The level itself is the limit price
+        # Same notional per level, rounded like a lot size
+        size = np.maximum(np.round(order_value / price, 4 if start > 10 else 0), 10.0 ** -4 if start > 10 else 1.0)
+        value = price * size
+        fee = value * fee_rate
+
+        # Inventory before each fill: a fill against it closes the level below/above, one spacing of profit
+        position = np.cumsum(sides)
+        before = position - sides
+        closes = (before != 0) & (np.sign(before) != sides)
+        pnl = value * spacing - 2 * fee
+
+        side_name = np.where(sides > 0, 'buy', 'sell')
+        tag = f"syn{s}"
+        for lo, hi in _chunks(len(steps)):
+            cursor.executemany('''
+                INSERT OR IGNORE INTO history_fills
+                (trade_id, symbol, side, price, size, value, fee, fee_currency, timestamp, order_id, trade_type, grid_processed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 'USDT', ?, ?, 'trade', 1)
+            ''', ((f"{tag}-{i}", symbol, side_name[i], float(price[i]), float(size[i]), float(value[i]), float(fee[i]),
+                   float(ts[i]), f"{tag}-o{i}") for i in range(lo, hi)))
+            cursor.executemany('''
+                INSERT OR IGNORE INTO history_ledger (timestamp, amount, type, currency, remark)
+                VALUES (?, ?, 'RealisedPNL', 'USDT', ?)
+            ''', ((float(ts[i]), float(pnl[i]), f"{symbol} {tag}-{i}") for i in range(lo, hi) if closes[i]))
+            counts['ledger'] += int(closes[lo:hi].sum())
+            if logs_per_fill:
+                cursor.executemany("INSERT INTO logs (timestamp, level, module, message) VALUES (?, 'INFO', 'Executioner', ?)",
+                                   _log_rows(symbol, side_name, price, size, ts, lo, hi, logs_per_fill, spacing))
+                counts['logs'] += (hi - lo) * logs_per_fill
+        conn.commit()
+        counts['fills'] += len(steps)
+        print(f"🧪 SYNTHETIC: {symbol} {len(steps)} fills, {int(closes.sum())} round trips in {time.perf_counter() - started:.1f}s")
+    conn.close()
+    return counts
+
+def _log_rows(symbol, side_name, price, size, ts, lo, hi, per_fill, spacing):
+    for i in range(lo, hi):
+        yield float(ts[i]), f"New fill detected: {side_name[i]} {size[i]:g} {symbol} @ {price[i]:.6g}"
+        if per_fill > 1:
+            target = price[i] * (1 + spacing) if side_name[i] == 'buy' else price[i] / (1 + spacing)
+            close_side = 'SELL' if side_name[i] == 'buy' else 'BUY'
+            yield float(ts[i]) + 0.05, f"Placing profit-take {close_side} order for {symbol} @ {target:.6g}"
+        for k in range(2, per_fill):
+            yield float(ts[i]) + 0.05 * k, f"Grid maintenance for {symbol}: level {price[i]:.6g} re-armed."
+
+def main():
+    parser = argparse.ArgumentParser(description="Fills the database with a large synthetic grid-trading history.")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--fills', type=int, default=1_000_000)
+    parser.add_argument('--days', type=float, default=365)
+    parser.add_argument('--symbols', default=','.join(DEFAULT_SYMBOLS),
+                        help="Comma-separated symbols; SYMBOL=PRICE sets the start price")
+    parser.add_argument('--logs-per-fill', type=int, default=2)
+    parser.add_argument('--spacing', type=float, default=DEFAULT_GRID_SPACING, help="Grid spacing as a fraction")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--clear', action='store_true', help="Delete existing fills, ledger and logs first")
+    args = parser.parse_args()
+
+    symbols = {}
+    for item in args.symbols.split(','):
+        name, _, price = item.partition('=')
+        symbols[name] = float(price) if price else DEFAULT_SYMBOLS.get(name, 100.0)
+
+    started = time.perf_counter()
+    counts = generate(args.db, args.fills, args.days, symbols, args.logs_per_fill, args.spacing,
+                      seed=args.seed, clear=args.clear)
+    elapsed = time.perf_counter() - started
+    print(f"✅ {counts['fills']} fills, {counts['ledger']} ledger entries, {counts['logs']} logs "
+          f"written to {args.db} in {elapsed:.1f}s ({sum(counts.values()) / elapsed:,.0f} rows/s)")
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
 import pandas as pd
 import numpy as np
+from collections import namedtuple
+from numpy.lib.stride_tricks import sliding_window_view
 
 def calculate_atr(df, period=14):
     high = df['high']
@@ -161,3 +163,243 @@ def analyze_trend_structure(klines_4h):
         return "DOWNTREND"
 
     return "RANGING"
+
+
+# --- Bundle: all the indicators in one pass over raw NumPy arrays ---
+
+BUNDLE_DEFAULTS = {
+    'atr': {'period': 14},
+    'rsi': {'period': 14},
+    'stoch_rsi': {'period': 14, 'k_period': 3, 'd_period': 3},
+    'macd': {'fast': 12, 'slow': 26, 'signal': 9},
+    'bollinger': {'window': 20, 'no_of_std': 2},
+    'ema': {'span': 200},
+    'adx': {'period': 14},
+}
+EWM_BLOCK_GROWTH = 1e3 # Max growth of f^-k inside one EWM block: bounds the rounding error
+
+_BundleFields = namedtuple('IndicatorBundle', [
+    'atr', 'rsi', 'stoch_k', 'stoch_d', 'macd', 'macd_signal', 'macd_hist',
+    'bb_upper', 'bb_middle', 'bb_lower', 'bb_percent_b', 'ema', 'adx'
+], defaults=[None] * 13)
+
+class IndicatorBundle(_BundleFields):
+    """Full indicator series (float64 arrays, time on the last axis); None when not requested."""
+    __slots__ = ()
+
+    def last(self):
+        """Latest value of each computed indicator."""
+        return {k: v[..., -1] if v.ndim > 1 else float(v[-1]) for k, v in self._asdict().items() if v is not None}
+
+
+def _alpha(span=None, alpha=None):
+    # Same derivation as pandas (through the center of mass)
+    com = (span - 1) / 2.0 if span is not None else (1 - alpha) / alpha
+    return 1.0 / (1.0 + com)
+
+def _shift(x):
+    """x shifted one bar to the right along the last axis, NaN first."""
+    out = np.empty_like(x)
+    out[..., 0] = np.nan
+    out[..., 1:] = x[..., :-1]
+    return out
+
+def _ewm(x, alpha):
+    """
+    ewm(alpha=alpha, adjust=False).mean() along the last axis, without a Python step per bar.
+    Inside a block of B bars y_j = f^(j+1) y_prev + alpha f^j cumsum(x_i f^-i), with B
+    small enough that f^-i stays bounded; blocks are chained through y_prev.
+    Leading NaNs (short histories) stay NaN and the average starts at the first value;
+    interior NaNs are carried forward.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = x.shape[-1]
+    valid = ~np.isnan(x)
+    started = np.logical_or.accumulate(valid, axis=-1)
+    if not valid.all():
+        idx = np.maximum.accumulate(np.where(valid, np.arange(n), 0), axis=-1)
+        x = np.take_along_axis(x, idx, axis=-1)
+        first = np.take_along_axis(x, np.argmax(valid, axis=-1)[..., None], axis=-1)
+        x = np.where(started, x, first)
+
+    f = 1.0 - alpha
+    out = np.empty_like(x)
+    out[..., 0] = x[..., 0]
+    m = n - 1
+    if m > 0:
+        block = max(1, min(m, int(np.log(EWM_BLOCK_GROWTH) / -np.log(f)))) if 0 < f < 1 else m
+        blocks = -(-m // block)
+        rest = np.zeros(x.shape[:-1] + (blocks * block,))
+        rest[..., :m] = x[..., 1:]
+        rest = rest.reshape(x.shape[:-1] + (blocks, block))
+        decay = f ** np.arange(block)
+        # Every block from a zero start at once, then the block starts chained in order
+        partial = alpha * decay * np.cumsum(rest / decay, axis=-1)
+        growth = f * decay
+        starts = np.empty(x.shape[:-1] + (blocks,))
+        prev = x[..., 0]
+        for k in range(blocks):
+            starts[..., k] = prev
+            prev = growth[-1] * prev + partial[..., k, -1]
+        out[..., 1:] = (partial + growth * starts[..., None]).reshape(x.shape[:-1] + (blocks * block,))[..., :m]
+    out[~started] = np.nan
+    return out
+
+def _rolling(x, window, reducer, **kwargs):
+    """reducer over a trailing window along the last axis; NaN until the window is full or while it holds a NaN."""
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] >= window:
+        view = sliding_window_view(x, window, axis=-1)
+        out[..., window - 1:] = reducer(view, axis=-1, **kwargs)
+    return out
+
+def compute_indicator_bundle(ohlcv_arrays, spec=None):
+    """
+    Computes the requested indicators in one pass over float64 arrays, sharing the
+    intermediates (true range, close deltas and gain/loss means, EMAs of the close).
+
+    ohlcv_arrays: mapping / DataFrame with 'high', 'low', 'close' (1-D per bar).
+    spec: {name: params} or a list of names, names from BUNDLE_DEFAULTS; missing
+    params take the defaults of the calculate_* functions. None = everything.
+    Returns an IndicatorBundle of full series; `.last()` gives the current values.
+    Semantics follow the pandas versions (rolling means/std/min/max, ewm adjust=False).
+    """
+    if spec is None:
+        spec = list(BUNDLE_DEFAULTS)
+    if not isinstance(spec, dict):
+        spec = {name: {} for name in spec}
+    unknown = set(spec) - set(BUNDLE_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown indicators: {sorted(unknown)}")
+    params = {name: dict(BUNDLE_DEFAULTS[name], **(spec[name] or {})) for name in spec}
+
+    close = np.ascontiguousarray(ohlcv_arrays['close'], dtype=np.float64)
+    needs_hl = 'atr' in params or 'adx' in params
+    high = np.ascontiguousarray(ohlcv_arrays['high'], dtype=np.float64) if needs_hl else None
+    low = np.ascontiguousarray(ohlcv_arrays['low'], dtype=np.float64) if needs_hl else None
+    missing = np.isnan(close) # Panel padding: indicators stay NaN there
+    out = {}
+    cache = {}
+
+    def shared(key, build):
+        if key not in cache:
+            cache[key] = build()
+        return cache[key]
+
+    prev_close = shared('prev_close', lambda: _shift(close)) if needs_hl else None
+    true_range = (lambda: np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))))
+    close_ewm = lambda span: shared(('ewm', span), lambda: _ewm(close, _alpha(span=span)))
+
+    def rsi_series(period):
+        def build():
+            delta = close - _shift(close)
+            # As pandas' where(): the undefined first delta counts as 0 (but padding stays NaN)
+            gain = np.where(missing, np.nan, np.where(delta > 0, delta, 0.0))
+            loss = np.where(missing, np.nan, np.where(delta < 0, -delta, 0.0))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rs = _rolling(gain, period, np.mean) / _rolling(loss, period, np.mean)
+                return 100 - (100 / (1 + rs))
+        return shared(('rsi', period), build)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if 'atr' in params:
+            out['atr'] = _rolling(shared('tr', true_range), params['atr']['period'], np.mean)
+
+        if 'rsi' in params:
+            out['rsi'] = rsi_series(params['rsi']['period'])
+
+        if 'stoch_rsi' in params:
+            p = params['stoch_rsi']
+            rsi = rsi_series(p['period'])
+            lowest, highest = _rolling(rsi, p['period'], np.min), _rolling(rsi, p['period'], np.max)
+            stoch = (rsi - lowest) / (highest - lowest) * 100
+            out['stoch_k'] = _rolling(stoch, p['k_period'], np.mean)
+            out['stoch_d'] = _rolling(out['stoch_k'], p['d_period'], np.mean)
+
+        if 'macd' in params:
+            p = params['macd']
+            macd = close_ewm(p['fast']) - close_ewm(p['slow'])
+            signal = _ewm(macd, _alpha(span=p['signal']))
+            out.update(macd=macd, macd_signal=signal, macd_hist=macd - signal)
+
+        if 'bollinger' in params:
+            p = params['bollinger']
+            middle = _rolling(close, p['window'], np.mean)
+            std = _rolling(close, p['window'], np.std, ddof=1)
+            upper = middle + std * p['no_of_std']
+            lower = middle - std * p['no_of_std']
+            out.update(bb_upper=upper, bb_middle=middle, bb_lower=lower, bb_percent_b=(close - lower) / (upper - lower))
+
+        if 'ema' in params:
+            out['ema'] = close_ewm(params['ema']['span'])
+
+        if 'adx' in params:
+            alpha = _alpha(alpha=1 / params['adx']['period'])
+            up_move = high - _shift(high)
+            down_move = _shift(low) - low
+            pad = np.isnan(high)
+            plus_dm = np.where(pad, np.nan, np.where((up_move > down_move) & (up_move > 0), up_move, 0.0))
+            minus_dm = np.where(pad, np.nan, np.where((down_move > up_move) & (down_move > 0), down_move, 0.0))
+            atr = _ewm(shared('tr', true_range), alpha)
+            plus_di = 100 * (_ewm(plus_dm, alpha) / atr)
+            minus_di = 100 * (_ewm(minus_dm, alpha) / atr)
+            dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+            out['adx'] = _ewm(dx, alpha)
+
+    return IndicatorBundle(**out)
+
+
+# --- Panel mode: one indicator pass for many symbols (symbols x bars) ---
+
+def build_panel(frames, columns=('high', 'low', 'close'), length=None):
+    """
+    Stacks per-symbol OHLC histories into 2-D arrays (symbols x bars), aligned on
+    the latest bar: shorter histories are left-padded with NaN.
+    frames: {symbol: DataFrame or mapping of arrays}, oldest bar first.
+    length: bars kept per symbol (default: the longest history).
+    Returns (symbols, {column: 2-D float64 array}).
+    """
+    symbols = list(frames)
+    sizes = [len(frames[s]['close']) for s in symbols]
+    length = length or max(sizes, default=0)
+    panel = {c: np.full((len(symbols), length), np.nan) for c in columns}
+    for row, symbol in enumerate(symbols):
+        take = min(sizes[row], length)
+        if take == 0:
+            continue
+        for c in columns:
+            panel[c][row, length - take:] = np.asarray(frames[symbol][c], dtype=np.float64)[-take:]
+    return symbols, panel
+
+def compute_indicator_panel(frames, spec=None, length=None):
+    """
+    compute_indicator_bundle for many symbols at once: every indicator is evaluated
+    for the whole (symbols x bars) panel with axis-aware NumPy operations.
+    Symbols whose history is too short for an indicator get NaN for it.
+    Returns (symbols, IndicatorBundle of 2-D series); `.last()` gives one value per symbol.
+    """
+    symbols, panel = build_panel(frames, length=length)
+    return symbols, compute_indicator_bundle(panel, spec)
+
+def scan_metrics(frames, atr_period=14, adx_period=14, bb_window=20, bb_std=2, length=None):
+    """
+    Per-symbol ranging/volatility metrics used to pick grid candidates:
+    ATR% of price, ADX (trend strength) and Bollinger width (% of the middle band).
+    Returns a DataFrame indexed by symbol.
+    """
+    symbols, panel = build_panel(frames, length=length)
+    if not symbols:
+        return pd.DataFrame(columns=['close', 'atr_pct', 'adx', 'bb_width'])
+    bundle = compute_indicator_bundle(panel, {
+        'atr': {'period': atr_period},
+        'adx': {'period': adx_period},
+        'bollinger': {'window': bb_window, 'no_of_std': bb_std},
+    })
+    close = panel['close'][:, -1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pd.DataFrame({
+            'close': close,
+            'atr_pct': bundle.atr[:, -1] / close * 100,
+            'adx': bundle.adx[:, -1],
+            'bb_width': (bundle.bb_upper[:, -1] - bundle.bb_lower[:, -1]) / bundle.bb_middle[:, -1] * 100,
+        }, index=pd.Index(symbols, name='symbol'))
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from account_cache import AccountCache
+from db_manager import DatabaseManager
+from protection import ProtectiveStopManager
+
+SYMBOL = 'BTC/USDT:USDT'
+
+class FakeExchange:
+    def __init__(self, positions=None, delay=0.0):
+        self.positions = positions or []
+        self.delay = delay
+        self.position_calls = 0
+
+    def get_all_open_positions(self):
+        self.position_calls += 1
+        time.sleep(self.delay)
+        return None if self.positions is None else [dict(p) for p in self.positions]
+
+    def get_account_balance(self, currency='USDT'):
+        return {'currency': currency, 'equity': 1000.0, 'availableBalance': 900.0, 'unrealisedPnl': 0.0}
+
+class TestAccountCache(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_consumers_share_one_fetch_per_interval(self):
+        exchange = FakeExchange([{'symbol': SYMBOL, 'side': 'long', 'quantity': 3, 'unrealisedPnl': 1.5}], delay=0.05)
+        cache = AccountCache(exchange, self.db, fast=60)
+        threads = [threading.Thread(target=cache.positions) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        ProtectiveStopManager(exchange, self.db, {}, account=cache).sync(SYMBOL)
+        self.assertEqual(exchange.position_calls, 1)
+
+        # Published for the dashboard
+        self.assertEqual(self.db.get_state('open_positions')[0]['quantity'], 3)
+        self.assertEqual(self.db.get_state('account')['equity'], 1000.0)
+
+        cache.invalidate() # e.g. a fill
+        cache.positions()
+        self.assertEqual(exchange.position_calls, 2)
+        cache.positions(max_age=0)
+        self.assertEqual(exchange.position_calls, 3)
+
+    def test_failed_fetch_keeps_the_snapshot_and_the_stop(self):
+        exchange = FakeExchange([{'symbol': SYMBOL, 'side': 'long', 'quantity': 3}])
+        self.db.set_setting('STOP_LOSS_PRICE', 58000.0)
+        cache = AccountCache(exchange, self.db, fast=60)
+        manager = ProtectiveStopManager(exchange, self.db, {}, account=cache)
+        exchange.place_stop_market_order = lambda *args, **kwargs: {'id': 'stop1'}
+        exchange.cancel_order = lambda *args, **kwargs: self.fail("the stop must not be canceled")
+        manager.sync(SYMBOL)
+
+        exchange.positions = None # Transient REST error
+        cache.invalidate()
+        self.assertEqual(cache.positions()[0]['quantity'], 3)
+        self.assertTrue(cache.is_stale())
+        self.assertEqual(self.db.get_state('open_positions')[0]['quantity'], 3) # Never published as flat
+        self.assertEqual(manager.sync(SYMBOL)['id'], 'stop1')
+        calls = exchange.position_calls
+        cache.positions()
+        self.assertEqual(exchange.position_calls, calls) # Retried after the fast interval, not on every read
+
+        exchange.positions = []
+        cache.refresh()
+        self.assertFalse(cache.is_stale())
+
+    def test_interval_adapts_to_exposure(self):
+        exchange = FakeExchange()
+        cache = AccountCache(exchange, self.db, fast=5, slow=30)
+        cache.positions()
+        self.assertEqual(cache.interval(), 30)
+        exchange.positions = [{'symbol': SYMBOL, 'side': 'short', 'quantity': 1}]
+        cache.refresh()
+        self.assertEqual(cache.interval(), 5)
+
+if __name__ == '__main__':
+    unittest.main()
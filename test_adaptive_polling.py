@@ -0,0 +1,52 @@
+import unittest
+from adaptive_polling import AdaptivePollingScheduler, ExponentialBackoff, nearest_targets
+
+SYMBOL = 'BTC/USDT:USDT'
+
+class TestAdaptivePolling(unittest.TestCase):
+    def scheduler(self, **kwargs):
+        polling = AdaptivePollingScheduler(0.25, 5, **kwargs)
+        # A quiet market: 0.01% moves per second
+        price = 100.0
+        for t in range(20):
+            price *= 1.0001 if t % 2 else 0.9999
+            polling.observe(SYMBOL, price, now=float(t))
+        return polling, price
+
+    def test_backs_off_mid_cell_and_tightens_near_a_level(self):
+        polling, price = self.scheduler()
+        far = {SYMBOL: nearest_targets(price, [90.0, 110.0])}
+        intervals = [polling.next_interval({SYMBOL: price}, far) for _ in range(5)]
+        self.assertEqual(intervals, [0.5, 1.0, 2.0, 4.0, 5]) # Exponential back-off up to the max
+
+        near = {SYMBOL: nearest_targets(price, [price * 1.0001, 110.0])}
+        self.assertEqual(polling.next_interval({SYMBOL: price}, near), 0.25) # Tightens at once
+
+    def test_volatility_spike_and_rate_limit(self):
+        polling, price = self.scheduler(rate_limit=2)
+        targets = {SYMBOL: [price * 1.002]}
+        calm = polling.desired_interval(SYMBOL, price, targets[SYMBOL])
+        for t in range(20, 25):
+            price *= 1.01
+            polling.observe(SYMBOL, price, now=float(t))
+        self.assertLess(polling.desired_interval(SYMBOL, price, [price * 1.002]), calm)
+        # Never faster than the request budget allows
+        self.assertEqual(polling.next_interval({SYMBOL: price}, {SYMBOL: [price * 1.002]}), 0.5)
+
+    def test_no_estimate_or_no_targets(self):
+        polling = AdaptivePollingScheduler(0.25, 5)
+        self.assertEqual(polling.desired_interval(SYMBOL, 100.0, [101.0]), 0.25)
+        self.assertEqual(polling.desired_interval(SYMBOL, 100.0, []), 5)
+        # A symbol that has not moved backs off instead of polling at the minimum
+        polling.observe(SYMBOL, 100.0, now=0.0)
+        polling.observe(SYMBOL, 100.0, now=1.0)
+        self.assertEqual(polling.desired_interval(SYMBOL, 100.0, [100.1]), 5)
+
+    def test_exponential_backoff(self):
+        backoff = ExponentialBackoff(2, 10)
+        self.assertEqual([backoff.next() for _ in range(5)], [2, 4, 8, 10, 10])
+        backoff.reset()
+        self.assertEqual(backoff.next(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import base64
+import os
+import tempfile
+import unittest
+import app as web
+import config
+import events
+from db_manager import DatabaseManager
+
+FORM = {
+    'symbol': 'BTC/USDT:USDT', 'GRID_RANGE_LOW': '60000', 'GRID_RANGE_HIGH': '70000', 'GRID_LEVELS': '10',
+    'PROFIT_PER_GRID': '0.5', 'BASE_ORDER_SIZE': '10', 'LEVERAGE': '5', 'STOP_LOSS_PRICE': '58000',
+    'STOP_LOSS_PRICE_HIGH': '72000', 'GRID_SIDE': 'SHORT', 'AUTO_RANGE_TIMEFRAME': '1h', 'GRID_AUTO_RANGE': 'on',
+    'STRATEGIST_INTERVAL': '60', 'EXECUTION_INTERVAL': '10',
+}
+
+class RecordingLoop:
+    def __init__(self):
+        self.events = []
+
+    def publish(self, event):
+        self.events.append(event)
+
+class TestSettingsForm(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.db.set_setting('STOP_LOSS_PRICE_HIGH', 72000.0)
+        self._db, web.db = web.db, self.db
+        self.loop = RecordingLoop()
+        events.set_default_loop(self.loop)
+        self.client = web.app.test_client()
+        token = base64.b64encode(f"admin:{config.ADMIN_PASSWORD}".encode()).decode()
+        self.auth = {'Authorization': f'Basic {token}'}
+
+    def tearDown(self):
+        web.db = self._db
+        events.set_default_loop(None)
+        os.remove(self.db_path)
+
+    def post(self, **changes):
+        return self.client.post('/settings', data={**FORM, **changes}, headers=self.auth)
+
+    def test_blank_short_stop_disables_it(self):
+        self.post(STOP_LOSS_PRICE_HIGH='')
+        self.assertIsNone(self.db.get_setting('STOP_LOSS_PRICE_HIGH', 72000.0))
+        self.assertEqual(self.db.get_setting('GRID_SIDE'), 'SHORT')
+        self.assertEqual(self.db.get_setting('AUTO_RANGE_TIMEFRAME'), '1h')
+        self.assertTrue(self.db.get_setting('GRID_AUTO_RANGE'))
+        self.assertEqual(len(self.loop.events), 1)
+        self.assertIn('STOP_LOSS_PRICE_HIGH', self.loop.events[0].keys)
+        self.assertIsNone(self.db.get_grid_config('BTC/USDT:USDT')['STOP_LOSS_PRICE_HIGH'])
+
+        page = self.client.get('/settings', headers=self.auth).get_data(as_text=True)
+        self.assertIn('name="STOP_LOSS_PRICE_HIGH" class="form-control bg-dark text-light border-secondary" value=""', page)
+
+    def test_bad_field_saves_nothing(self):
+        self.post(LEVERAGE='abc')
+        self.assertIsNone(self.db.get_setting('GRID_RANGE_LOW'))
+        self.assertEqual(self.db.get_setting('STOP_LOSS_PRICE_HIGH'), 72000.0)
+        self.assertEqual(self.loop.events, [])
+
+if __name__ == '__main__':
+    unittest.main()
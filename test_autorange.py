@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import grid
+from autorange import AutoRanger, compute_range
+from db_manager import DatabaseManager
+
+SYMBOL = 'BTC/USDT:USDT'
+
+def make_klines(n=60, start_ts=0, tf_ms=900_000, seed=1, base=100.0):
+    rng = np.random.default_rng(seed)
+    close = base + np.cumsum(rng.normal(0, 0.3, n))
+    return pd.DataFrame({
+        'timestamp': start_ts + np.arange(n) * tf_ms,
+        'open': close, 'high': close + 0.4, 'low': close - 0.4, 'close': close,
+        'volume': np.ones(n),
+    })
+
+class FakeExchange:
+    def __init__(self, df):
+        self.df = df
+        self.fetches = 0
+
+    def get_historical_data(self, symbol, timeframe='5m', limit=100):
+        self.fetches += 1
+        return self.df.tail(limit).copy()
+
+class TestComputeRange(unittest.TestCase):
+    def test_levels_sit_on_a_fixed_lattice(self):
+        df = make_klines()
+        r = compute_range(df, 0.01, max_levels=50)
+        ticks = grid.to_ticks(np.linspace(r['low'], r['high'], r['levels']), 0.01)
+        self.assertTrue(np.all(ticks % r['spacing_ticks'] == 0))
+        self.assertLessEqual(r['low'], df['close'].iloc[-1])
+        self.assertGreaterEqual(r['high'], df['close'].iloc[-1])
+
+    def test_small_drift_changes_only_edge_levels(self):
+        df = make_klines()
+        first = compute_range(df, 0.01, max_levels=50)
+        moved = df.copy()
+        moved.loc[len(moved)] = moved.iloc[-1] + [900_000, 0.3, 0.3, 0.3, 0.3, 0]
+        second = compute_range(moved, 0.01, max_levels=50, prev=first)
+
+        self.assertEqual(second['spacing_ticks'], first['spacing_ticks'])
+        before = set(grid.to_ticks(np.linspace(first['low'], first['high'], first['levels']), 0.01).tolist())
+        after = set(grid.to_ticks(np.linspace(second['low'], second['high'], second['levels']), 0.01).tolist())
+        self.assertLessEqual(len(before ^ after), 4)
+
+    def test_level_count_is_capped_around_the_close(self):
+        r = compute_range(make_klines(), 0.01, max_levels=5)
+        self.assertEqual(r['levels'], 5)
+
+class TestAutoRanger(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.db.set_setting('AUTO_RANGE_TIMEFRAME', '15m')
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_recomputes_only_on_closed_candles(self):
+        df = make_klines(61) # last row is still forming at `now`
+        exchange = FakeExchange(df)
+        ranger = AutoRanger(exchange, self.db)
+        now = df['timestamp'].iloc[-1] / 1000 + 60
+
+        self.assertIsNotNone(ranger.update(SYMBOL, 0.01, 50, now=now))
+        self.assertEqual(len(ranger.klines[(SYMBOL, '15m')]), 60)
+        self.assertIsNone(ranger.update(SYMBOL, 0.01, 50, now=now + 300))
+        self.assertEqual(exchange.fetches, 1)
+
+        # Persisted: a new instance starts from the same range
+        self.assertEqual(AutoRanger(exchange, self.db).current(SYMBOL)['low'], ranger.current(SYMBOL)['low'])
+
+    def test_timeframe_change_starts_a_fresh_cache(self):
+        now = 100 * 3600 + 60
+        exchange = FakeExchange(make_klines(61, start_ts=(now - 60 * 900 - 60) * 1000))
+        ranger = AutoRanger(exchange, self.db)
+        ranger.update(SYMBOL, 0.01, 50, now=now)
+
+        self.db.set_setting('AUTO_RANGE_TIMEFRAME', '1h')
+        exchange.df = make_klines(61, start_ts=(now - 60 * 3600 - 60) * 1000, tf_ms=3_600_000, base=200.0)
+        self.assertIsNotNone(ranger.update(SYMBOL, 0.01, 50, now=now))
+        self.assertEqual(list(ranger.klines), [(SYMBOL, '1h')])
+        hourly = ranger.klines[(SYMBOL, '1h')]
+        self.assertEqual(len(hourly), 60)
+        self.assertTrue((hourly['close'] > 150).all()) # No 15m candle merged in
+
+if __name__ == '__main__':
+    unittest.main()
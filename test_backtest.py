@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+import grid
+from backtest import run_backtest, run_backtest_ticks
+
+CONFIG = {
+    'GRID_RANGE_LOW': 90.0, 'GRID_RANGE_HIGH': 110.0, 'GRID_LEVELS': 5, 'GRID_SIDE': 'NEUTRAL',
+    'BASE_ORDER_SIZE': 100.0, 'LEVERAGE': 10, 'PROFIT_PER_GRID': 2.0,
+    'STOP_LOSS_PRICE': None, 'STOP_LOSS_PRICE_HIGH': None,
+}
+
+def reference_pnl(open_, high, low, config, increment):
+    """Bar-by-bar loop of the live rules, used to check the vectorized version."""
+    desired = grid.desired_grid(config['GRID_RANGE_LOW'], config['GRID_RANGE_HIGH'], config['GRID_LEVELS'], increment, open_[0])
+    prices = grid.to_prices(desired.ticks, increment)
+    margin = config['PROFIT_PER_GRID'] / 100
+    fills, gross = 0, 0.0
+    for tick, price in zip(desired.ticks, prices):
+        size = np.floor(config['BASE_ORDER_SIZE'] * config['LEVERAGE'] / price)
+        order, takes = None, [] # resting grid side, open profit-takes (side, target, fill bar)
+        for t in range(len(high)):
+            if order is None:
+                order = int(grid.grid_sides([tick], grid.to_ticks(open_[t], increment))[0]) # Pass at the bar open
+            for take in list(takes):
+                side, target, filled_at = take
+                if t > filled_at and ((side > 0 and high[t] >= target) or (side < 0 and low[t] <= target)):
+                    takes.remove(take)
+                    fills += 1
+                    gross += size * side * (target - price)
+            if (order > 0 and low[t] <= price) or (order < 0 and high[t] >= price):
+                target = float(grid.to_prices(grid.to_ticks(price * (1 + margin * order), increment), increment))
+                takes.append((order, target, t))
+                fills += 1
+                order = None # Refilled at the next pass
+    return fills, gross
+
+class TestBacktest(unittest.TestCase):
+    def test_matches_bar_by_bar_reference(self):
+        rng = np.random.default_rng(7)
+        close = 100 + np.cumsum(rng.normal(0, 1.0, 2000))
+        close = np.clip(close, 85, 115)
+        high, low = close + rng.uniform(0, 1, 2000), close - rng.uniform(0, 1, 2000)
+        result = run_backtest({'open': close, 'high': high, 'low': low, 'close': close}, CONFIG, increment=0.01)
+
+        fills, gross = reference_pnl(close, high, low, CONFIG, 0.01)
+        self.assertEqual(result['fills'], fills)
+        self.assertAlmostEqual(result['gross_pnl'], gross, places=6)
+        self.assertGreater(result['fees'], 0)
+
+    def test_filled_level_is_refilled_with_the_current_side(self):
+        # 95 buys, is refilled as a sell (price now below it) and sells on the way back up
+        result = run_backtest_ticks([99, 95, 94, 95.5], CONFIG, increment=0.1)
+        self.assertEqual(result['buy_fills'], 1)
+        self.assertEqual(result['sell_fills'], 1)
+        self.assertEqual(result['round_trips'], 0) # Both profit-takes are still open
+        self.assertEqual(result['open_position'], 0)
+
+    def test_round_trip_on_ticks(self):
+        # Buy level at 95 fills, its profit-take at 96.9 closes it
+        result = run_backtest_ticks([99, 95, 97, 99], CONFIG, increment=0.1)
+        self.assertEqual(result['round_trips'], 1)
+        self.assertAlmostEqual(result['gross_pnl'], 10 * (96.9 - 95.0), places=6)
+        self.assertEqual(result['open_position'], 0)
+
+    def test_stop_loss_closes_and_ends_the_run(self):
+        config = dict(CONFIG, STOP_LOSS_PRICE=88.0)
+        result = run_backtest_ticks([99, 95, 91, 87, 100, 110], config, increment=0.1, keep_equity=True)
+        self.assertTrue(result['stopped'])
+        self.assertEqual(result['bars'], 4)
+        self.assertEqual(result['open_position'], 0)
+        # Longs from 95 and 90 closed at 88
+        self.assertAlmostEqual(result['gross_pnl'], 10 * (88 - 95) + 11 * (88 - 90), places=6)
+        self.assertGreater(result['max_drawdown'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,14 @@
+import unittest
+from benchmark import compare
+
+
+class TestBaselineCompare(unittest.TestCase):
+    def test_only_slower_than_threshold_is_a_regression(self):
+        baseline = {'cases': {'a': {'median': 1.0}, 'b': {'median': 1.0}, 'gone': {'median': 1.0}}}
+        results = {'cases': {'a': {'median': 1.2}, 'b': {'median': 1.5}, 'new': {'median': 9.0}}}
+        regressions = compare(results, baseline, threshold=1.25)
+        self.assertEqual([r[0] for r in regressions], ['b'])
+        self.assertAlmostEqual(regressions[0][3], 1.5)
+
+if __name__ == '__main__':
+    unittest.main()
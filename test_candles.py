@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+import pandas as pd
+from autorange import TIMEFRAME_SECONDS
+from candles import CandleAggregator
+
+SYMBOL = 'BTC/USDT:USDT'
+TICK = 10 # Seconds between trades
+
+class TickExchange:
+    """Candles of any timeframe cut from 10-second trades up to `now`, forming candle included."""
+
+    def __init__(self, days=3, seed=0):
+        rng = np.random.default_rng(seed)
+        n = days * 86400 // TICK
+        self.ts = np.arange(n) * TICK
+        self.price = 100 + np.cumsum(rng.normal(0, 0.05, n))
+        self.volume = rng.uniform(0, 2, n)
+        self.now = 0
+        self.requests = []
+
+    def get_historical_data(self, symbol, timeframe='5m', limit=100):
+        self.requests.append(timeframe)
+        tf = TIMEFRAME_SECONDS[timeframe]
+        seen = self.ts <= self.now
+        df = pd.DataFrame({'bucket': self.ts[seen] // tf * tf * 1000.0, 'price': self.price[seen], 'volume': self.volume[seen]})
+        g = df.groupby('bucket')
+        out = pd.DataFrame({
+            'timestamp': g['bucket'].first(), 'open': g['price'].first(), 'high': g['price'].max(),
+            'low': g['price'].min(), 'close': g['price'].last(), 'volume': g['volume'].sum(),
+        }).reset_index(drop=True)
+        return out.tail(limit).reset_index(drop=True)
+
+class TestCandleAggregator(unittest.TestCase):
+    def assert_matches_exchange(self, exchange, candles, timeframe, limit=50):
+        got = candles.get_historical_data(SYMBOL, timeframe, limit, now=exchange.now)
+        expected = exchange.get_historical_data(SYMBOL, timeframe, limit)
+        pd.testing.assert_frame_equal(got, expected, check_exact=False, rtol=1e-9)
+
+    def test_higher_timeframes_follow_the_base_stream(self):
+        exchange = TickExchange()
+        candles = CandleAggregator(exchange, base_history=300)
+        exchange.now = 86400 + 5 * 3600 + 7 * 60 + 25 # Mid-candle on every timeframe
+        candles.warm_up(SYMBOL, now=exchange.now)
+        seeded = len(exchange.requests)
+
+        for step in range(40):
+            exchange.now += 137 # Not aligned to candles: forming bars get updated in place
+            candles.sync(SYMBOL, now=exchange.now)
+        self.assertEqual(exchange.requests[seeded:], ['1m'] * 40) # Only the base is fetched
+
+        exchange.requests.clear()
+        for timeframe in ('5m', '15m', '1h', '4h', '1d'):
+            self.assert_matches_exchange(exchange, candles, timeframe)
+        self.assertEqual(exchange.requests, ['5m', '15m', '1h', '4h', '1d']) # The reference calls only
+
+    def test_new_timeframe_and_long_gap_are_seeded(self):
+        exchange = TickExchange()
+        candles = CandleAggregator(exchange, base_history=120)
+        exchange.now = 86400 + 3600 + 45
+        candles.get_historical_data(SYMBOL, '15m', now=exchange.now)
+
+        exchange.now += 3 * 3600 + 11 # Longer than the base history
+        candles.sync(SYMBOL, now=exchange.now)
+        self.assert_matches_exchange(exchange, candles, '15m')
+        self.assert_matches_exchange(exchange, candles, '1h') # First use: seeded, forming bar from the base
+
+    def test_base_is_synced_once_per_closed_base_candle(self):
+        exchange = TickExchange()
+        candles = CandleAggregator(exchange)
+        exchange.now = 7200
+        candles.get_historical_data(SYMBOL, '5m', now=exchange.now)
+        candles.get_historical_data(SYMBOL, '5m', now=exchange.now + 30)
+        self.assertEqual(exchange.requests, ['1m', '5m'])
+        candles.get_historical_data(SYMBOL, '5m', now=exchange.now + 60)
+        self.assertEqual(exchange.requests, ['1m', '5m', '1m'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from db_manager import DatabaseManager
+from engine import GridCrossingDetector, TradingEngine
+from events import EventLoop, PriceTick, Timer
+from executioner import Executioner
+from strategist import Strategist
+
+class TestGridCrossingDetector(unittest.TestCase):
+    def test_reports_exactly_the_crossed_levels(self):
+        detector = GridCrossingDetector([100, 110, 120, 130, 140])
+        self.assertEqual(detector.crossed(115), []) # First tick only sets the reference
+        self.assertEqual(detector.crossed(135), [120, 130])
+        self.assertEqual(detector.crossed(105), [110, 120, 130])
+        self.assertEqual(detector.crossed(106), [])
+
+    def test_touching_a_level_counts_once(self):
+        detector = GridCrossingDetector([100, 110])
+        detector.crossed(105)
+        self.assertEqual(detector.crossed(110), [110])
+        self.assertEqual(detector.crossed(108), [])
+        self.assertEqual(detector.crossed(100), [100])
+
+    def test_nearest_level(self):
+        detector = GridCrossingDetector([100, 110, 120])
+        self.assertEqual(detector.nearest(104), 100)
+        self.assertEqual(detector.nearest(117), 120)
+        self.assertEqual(detector.nearest(500), 120)
+
+class TestEventLoop(unittest.TestCase):
+    def test_dispatches_events_and_timers_in_order(self):
+        loop = EventLoop()
+        received = []
+        done = threading.Event()
+
+        loop.subscribe(PriceTick, lambda e: received.append(('tick', e.price)))
+        def on_timer(e):
+            received.append(('timer', e.name))
+            if e.name == 'stop':
+                done.set()
+        loop.subscribe(Timer, on_timer)
+
+        thread = threading.Thread(target=loop.run, daemon=True)
+        thread.start()
+        loop.publish(PriceTick('BTC/USDT:USDT', 100.0))
+        loop.call_later(0.05, 'stop')
+        self.assertTrue(done.wait(2))
+        loop.stop()
+        thread.join(2)
+
+        self.assertEqual(received, [('tick', 100.0), ('timer', 'stop')])
+
+    def test_recurring_timer(self):
+        loop = EventLoop()
+        fired = []
+        loop.subscribe(Timer, lambda e: fired.append(time.monotonic()))
+        loop.call_every(0.02, 'poll')
+        thread = threading.Thread(target=loop.run, daemon=True)
+        thread.start()
+        time.sleep(0.15)
+        loop.stop()
+        thread.join(2)
+        self.assertTrue(len(fired) >= 3)
+
+    def test_timers_follow_an_accelerated_clock(self):
+        from mock_connector import SimClock
+        loop = EventLoop(clock=SimClock(speed=50)) # Not installed: only the loop runs on it
+        done = threading.Event()
+        loop.subscribe(Timer, lambda e: done.set())
+        thread = threading.Thread(target=loop.run, daemon=True)
+        thread.start()
+        loop.call_later(5, 'sim') # 5 simulated seconds = 0.1 real seconds
+        self.assertTrue(done.wait(2))
+        loop.stop()
+        thread.join(2)
+
+class TestFillPolling(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.db.set_setting('EXECUTION_INTERVAL_MIN', 2)
+        self.db.set_setting('EXECUTION_INTERVAL', 10)
+        shared_state = {}
+        self.engine = TradingEngine(None, self.db, Strategist(None, shared_state, self.db), Executioner(None, shared_state, self.db))
+
+    def tearDown(self):
+        self.engine.scheduler.shutdown(wait=False)
+        os.remove(self.db_path)
+
+    def test_each_symbol_backs_off_on_its_own(self):
+        engine = self.engine
+        self.assertTrue(engine._fill_poll_due('BTC'))
+        self.assertTrue(engine._fill_poll_due('ETH'))
+        self.assertFalse(engine._fill_poll_due('BTC')) # Not due for 2s
+        engine._fill_due['BTC'] = engine._fill_due['ETH'] = 0 # Time passes
+        engine._fill_poll_due('BTC')
+        engine._fill_poll_due('ETH')
+        self.assertEqual(engine.fill_backoffs['BTC'].current, 8) # 2, 4, then 8
+
+        engine._fill_poll_due('BTC', reset=True) # A level of BTC was crossed
+        self.assertEqual(engine.fill_backoffs['BTC'].current, 4)
+        self.assertEqual(engine.fill_backoffs['ETH'].current, 8) # ETH keeps backing off
+
+    def test_fixed_interval_without_adaptive_polling(self):
+        self.db.set_setting('ADAPTIVE_POLLING', False)
+        self.assertEqual(self.engine._fill_poll_interval(), 10)
+        self.assertTrue(self.engine._fill_poll_due('BTC'))
+        self.assertTrue(self.engine._fill_poll_due('BTC'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import time
+import unittest
+from db_manager import DatabaseManager
+from fill_dedup import FillDeduplicator
+
+SYMBOL = 'BTC/USDT:USDT'
+
+def make_fill(trade_id, ts):
+    return {'tradeId': trade_id, 'symbol': SYMBOL, 'side': 'buy', 'price': 100.0, 'size': 1.0, 'timestamp': ts}
+
+class TestFillDeduplicator(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_first_start_ignores_older_fills(self):
+        dedup = FillDeduplicator(self.db)
+        dedup.warm_up(SYMBOL)
+        self.assertTrue(dedup.seen(make_fill('old', time.time() - 3600)))
+        self.assertTrue(dedup.claim(make_fill('new', time.time() + 1)))
+        self.assertFalse(dedup.claim(make_fill('new', time.time() + 1)))
+
+    def test_restart_never_replays(self):
+        now = time.time() + 10
+        first = FillDeduplicator(self.db)
+        first.warm_up(SYMBOL)
+        self.assertTrue(first.claim(make_fill('t1', now)))
+
+        # New process: empty memory, same DB
+        second = FillDeduplicator(self.db)
+        second.warm_up(SYMBOL)
+        self.assertFalse(second.claim(make_fill('t1', now)))
+        self.assertTrue(second.claim(make_fill('t2', now + 1)))
+
+    def test_memory_is_bounded(self):
+        dedup = FillDeduplicator(self.db, capacity=10)
+        dedup.warm_up(SYMBOL)
+        base = time.time() + 10
+        for i in range(50):
+            dedup.claim(make_fill(f"t{i}", base + i))
+        self.assertEqual(len(dedup._recent), 10)
+        # Evicted IDs are still rejected through the history_fills flag
+        self.assertFalse(dedup.claim(make_fill('t45', base + 45)))
+        self.assertFalse(dedup.claim(make_fill('t0', base)))
+
+if __name__ == '__main__':
+    unittest.main()
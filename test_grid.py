@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+import grid
+
+class TestGridReconciliation(unittest.TestCase):
+    def test_ticks_round_trip_without_float_noise(self):
+        ticks = grid.to_ticks([0.1 + 0.2, 0.3, 60000.05], 0.01)
+        self.assertEqual(ticks.tolist(), [30, 30, 6000005])
+        self.assertEqual(grid.to_prices([30, 6000005], 0.01).tolist(), [0.3, 60000.05])
+        self.assertEqual(grid.to_ticks(102.5, 0.5), 205)
+
+    def test_desired_grid_sides(self):
+        desired = grid.desired_grid(100, 110, 5, 0.5, 104, 'NEUTRAL')
+        self.assertEqual(grid.to_prices(desired.ticks, 0.5).tolist(), [100.0, 102.5, 105.0, 107.5, 110.0])
+        self.assertEqual(desired.sides.tolist(), [1, 1, -1, -1, -1])
+
+        long_grid = grid.desired_grid(100, 110, 5, 0.5, 104, 'LONG')
+        self.assertEqual(long_grid.sides.tolist(), [1, 1, 0, 0, 0])
+
+    def test_dense_grid_collapses_duplicate_ticks(self):
+        desired = grid.desired_grid(100, 101, 11, 0.5, 100, 'NEUTRAL')
+        self.assertEqual(len(np.unique(desired.ticks)), len(desired.ticks))
+
+    def test_reconcile_place_keep_cancel(self):
+        desired = np.array([200, 205, 210, 215, 220])
+        live = np.array([205, 999, 215, 215])
+        diff = grid.reconcile(desired, live)
+        self.assertEqual(diff.place.tolist(), [0, 2, 4])
+        self.assertEqual(diff.keep.tolist(), [1, 3])
+        self.assertEqual(diff.keep_live.tolist(), [0, 2])
+        # Off-grid order and the duplicate on tick 215 are canceled
+        self.assertEqual(diff.cancel.tolist(), [1, 3])
+
+    def test_reconcile_with_empty_book(self):
+        diff = grid.reconcile(np.arange(500), np.array([], dtype=np.int64))
+        self.assertEqual(len(diff.place), 500)
+        self.assertEqual(len(diff.keep), 0)
+        self.assertEqual(len(diff.cancel), 0)
+
+    def test_reconcile_large_grid_is_idempotent(self):
+        desired = np.arange(0, 5000, 10)
+        diff = grid.reconcile(desired, desired[::-1])
+        self.assertEqual(len(diff.place), 0)
+        self.assertEqual(len(diff.cancel), 0)
+        self.assertEqual(sorted(desired[diff.keep].tolist()), desired.tolist())
+
+if __name__ == '__main__':
+    unittest.main()
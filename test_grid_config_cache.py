@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from db_manager import DatabaseManager
+from grid_config_cache import GridConfigCache
+
+class CountingDB(DatabaseManager):
+    def __init__(self, path):
+        super().__init__(path)
+        self.config_reads = 0
+
+    def get_grid_config(self, symbol):
+        self.config_reads += 1
+        return super().get_grid_config(symbol)
+
+class TestGridConfigCache(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = CountingDB(self.db_path)
+        self.db.set_setting('STOP_LOSS_PRICE', 58000.0)
+        self.cache = GridConfigCache(self.db)
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_reads_the_db_once_per_symbol(self):
+        for _ in range(5):
+            self.assertEqual(self.cache.get('BTC/USDT:USDT')['STOP_LOSS_PRICE'], 58000.0)
+            self.cache.get('ETH/USDT:USDT')
+        self.assertEqual(self.db.config_reads, 2)
+
+    def test_settings_changed_invalidates(self):
+        self.cache.get('BTC/USDT:USDT')
+        self.cache.get('ETH/USDT:USDT')
+
+        self.db.save_grid_config('ETH/USDT:USDT', stop_loss_price=1500.0)
+        self.cache.on_settings_changed(('grid:ETH/USDT:USDT',))
+        self.assertEqual(self.cache.get('ETH/USDT:USDT')['STOP_LOSS_PRICE'], 1500.0)
+        self.cache.get('BTC/USDT:USDT')
+        self.assertEqual(self.db.config_reads, 3) # Only the changed symbol was read again
+
+        self.db.set_setting('STOP_LOSS_PRICE', 57000.0)
+        self.cache.on_settings_changed(('STOP_LOSS_PRICE',))
+        self.assertEqual(self.cache.get('BTC/USDT:USDT')['STOP_LOSS_PRICE'], 57000.0)
+
+    def test_entries_expire(self):
+        cache = GridConfigCache(self.db, max_age=0)
+        cache.get('BTC/USDT:USDT')
+        cache.get('BTC/USDT:USDT')
+        self.assertEqual(self.db.config_reads, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import technical_analysis as ta
+from autorange import AutoRanger, KLINE_HISTORY
+from candles import CandleAggregator
+from db_manager import DatabaseManager
+from indicator_cache import IndicatorCache
+from test_candles import TickExchange, SYMBOL
+
+class TestIndicatorCache(unittest.TestCase):
+    def setUp(self):
+        self.exchange = TickExchange(days=2)
+        self.exchange.now = 86400 + 600 + 30
+        self.candles = CandleAggregator(self.exchange, base_history=120)
+        self.cache = IndicatorCache(self.candles, capacity=3)
+
+    def test_reads_within_a_bar_are_memoized(self):
+        now = self.exchange.now
+        with mock.patch.object(ta, 'calculate_rsi', wraps=ta.calculate_rsi) as rsi:
+            first = self.cache.get(SYMBOL, '15m', 'calculate_rsi', now=now, period=14)
+            self.assertEqual(self.cache.get(SYMBOL, '15m', 'calculate_rsi', now=now + 30, period=14), first)
+            self.assertEqual(rsi.call_count, 1)
+
+            self.cache.get(SYMBOL, '15m', 'calculate_rsi', now=now + 30, period=7) # Other params: own entry
+            self.assertEqual(rsi.call_count, 2)
+
+            self.exchange.now = now + 900 # A 15m candle closed
+            later = self.cache.get(SYMBOL, '15m', 'calculate_rsi', now=self.exchange.now, period=14)
+            self.assertEqual(rsi.call_count, 3)
+
+        df = self.exchange.get_historical_data(SYMBOL, '15m', 201).iloc[:-1]
+        self.assertAlmostEqual(later, ta.calculate_rsi(df, period=14))
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_closed_bars_invalidate_and_capacity_evicts(self):
+        now = self.exchange.now
+        self.cache.get(SYMBOL, '5m', 'calculate_atr', now=now)
+        self.cache.get(SYMBOL, '1h', 'calculate_atr', now=now)
+        self.exchange.now = now + 300
+        self.candles.sync(SYMBOL, now=self.exchange.now) # 5m closed, 1h did not
+        self.assertEqual([k[1] for k in self.cache._entries], ['1h'])
+
+        for period in (5, 6, 7):
+            self.cache.get(SYMBOL, '1h', 'calculate_atr', now=self.exchange.now, period=period)
+        self.assertEqual(self.cache.stats()['entries'], 3)
+
+    def test_auto_range_reads_through_the_cache(self):
+        fd, db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        try:
+            db = DatabaseManager(db_path)
+            db.set_setting('AUTO_RANGE_TIMEFRAME', '15m')
+            now = self.exchange.now
+            cache = IndicatorCache(self.candles)
+            cached = AutoRanger(self.candles, db, indicators=cache).update(SYMBOL, 0.01, 50, now=now)
+            self.assertEqual(cache.stats()['misses'], 2) # ATR and bands, computed once per closed bar
+            # Any other reader of the bar gets them for free
+            cache.get(SYMBOL, '15m', 'calculate_atr', candles=KLINE_HISTORY, now=now + 60, period=14)
+            self.assertEqual(cache.stats()['hits'], 1)
+
+            db.update_state(f'auto_range:{SYMBOL}', {})
+            direct = AutoRanger(self.candles, db).update(SYMBOL, 0.01, 50, now=now)
+            for key in ('low', 'high', 'levels'):
+                self.assertEqual(cached[key], direct[key])
+        finally:
+            os.remove(db_path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import time
+import unittest
+from mock_connector import MockKuCoinConnector
+
+SYMBOL = 'BTC/USDT:USDT'
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.speed = 1.0
+
+    def time(self):
+        return self.now
+
+class TestMockExchange(unittest.TestCase):
+    def make(self, path, **kwargs):
+        exchange = MockKuCoinConnector(price_path=path, step_seconds=1, install_clock=False, **kwargs)
+        exchange.clock = FakeClock()
+        exchange._t0 = exchange.clock.now
+        return exchange
+
+    def step(self, exchange, n=1):
+        exchange.clock.now += n
+
+    def test_price_time_priority_with_limited_volume(self):
+        exchange = self.make([100, 99, 99, 99], step_volume=5)
+        first = exchange.place_limit_order(SYMBOL, 'buy', 5, 99)
+        second = exchange.place_limit_order(SYMBOL, 'buy', 5, 99)
+        better = exchange.place_limit_order(SYMBOL, 'buy', 5, 99.5)
+
+        self.step(exchange)
+        filled = [f['orderId'] for f in exchange.get_trade_history(SYMBOL)]
+        self.assertEqual(filled, [better['id']]) # Best price first
+
+        self.step(exchange)
+        filled = [f['orderId'] for f in exchange.get_trade_history(SYMBOL)]
+        self.assertEqual(filled, [better['id'], first['id']]) # Then the oldest at the same price
+        self.assertEqual([o['id'] for o in exchange.get_open_orders(SYMBOL)], [second['id']])
+
+    def test_positions_pnl_and_reduce_only(self):
+        exchange = self.make([100, 98, 101, 101])
+        exchange.place_limit_order(SYMBOL, 'buy', 10, 98)
+        exchange.place_limit_order(SYMBOL, 'sell', 10, 101, reduce_only=True)
+        exchange.place_limit_order(SYMBOL, 'sell', 5, 101.5, reduce_only=True)
+
+        self.step(exchange)
+        self.assertEqual(exchange.get_all_open_positions()[0]['quantity'], 10)
+        self.step(exchange, 2)
+        self.assertEqual(exchange.get_all_open_positions(), [])
+        self.assertAlmostEqual(exchange.get_ledger_history()[0]['amount'], 30.0)
+        # The second reduce-only has nothing left to reduce
+        self.assertEqual(exchange.place_market_order(SYMBOL, 'sell', 5, reduce_only=True), None)
+
+    def test_stop_market_triggers_on_the_path(self):
+        exchange = self.make([100, 99, 95, 94])
+        exchange.place_market_order(SYMBOL, 'buy', 3, reduce_only=False)
+        exchange.place_stop_market_order(SYMBOL, 'sell', 3, 96, 'down')
+        self.step(exchange, 3)
+        self.assertEqual(exchange.get_all_open_positions(), [])
+        self.assertEqual(exchange.get_trade_history(SYMBOL)[-1]['price'], 95)
+
+    def test_random_walk_has_history_klines(self):
+        exchange = MockKuCoinConnector(seed=1, install_clock=False)
+        df = exchange.get_historical_data(SYMBOL, '15m', limit=50)
+        self.assertEqual(len(df), 50)
+        self.assertTrue((df['high'] >= df['low']).all())
+        self.assertEqual(exchange.get_price_increment(SYMBOL), 0.1)
+
+    def test_accelerated_clock_is_not_installed_by_default(self):
+        real_time = time.time
+        exchange = MockKuCoinConnector(seed=1, speed=100)
+        self.assertIs(time.time, real_time) # Only the paper/replay entry point patches the process
+        time.sleep(0.01)
+        self.assertGreater(exchange.clock.time(), real_time() + 0.5) # The exchange itself runs x100
+
+if __name__ == '__main__':
+    unittest.main()
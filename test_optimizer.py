@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from backtest import run_backtest
+from db_manager import DatabaseManager
+from optimizer import grid_samples, random_samples, run_sweep
+
+BASE_CONFIG = {
+    'GRID_RANGE_LOW': 90.0, 'GRID_RANGE_HIGH': 110.0, 'GRID_LEVELS': 10, 'GRID_SIDE': 'NEUTRAL',
+    'BASE_ORDER_SIZE': 100.0, 'LEVERAGE': 10, 'PROFIT_PER_GRID': 1.0,
+    'STOP_LOSS_PRICE': None, 'STOP_LOSS_PRICE_HIGH': None,
+}
+
+class TestOptimizer(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        rng = np.random.default_rng(3)
+        close = np.clip(100 + np.cumsum(rng.normal(0, 0.5, 3000)), 88, 112)
+        self.bars = {'open': close, 'high': close + 0.3, 'low': close - 0.3, 'close': close}
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_samplers(self):
+        self.assertEqual(len(grid_samples({'GRID_LEVELS': [5, 10], 'PROFIT_PER_GRID': [0.5, 1, 2]})), 6)
+        samples = random_samples({'GRID_LEVELS': (5, 20), 'PROFIT_PER_GRID': (0.2, 2.0)}, 50, seed=1)
+        self.assertTrue(all(5 <= s['GRID_LEVELS'] <= 20 and isinstance(s['GRID_LEVELS'], int) for s in samples))
+
+    def test_sweep_streams_results_and_ranks_them(self):
+        params = grid_samples({'GRID_LEVELS': [5, 10, 20], 'PROFIT_PER_GRID': [0.5, 1.0]})
+        sweep_id, done = run_sweep(self.bars, BASE_CONFIG, params, db=self.db, increment=0.01, workers=2, chunk_size=2)
+        self.assertEqual(done, 6)
+
+        top = self.db.get_top_sweep_results(sweep_id, limit=3)
+        self.assertEqual(len(top), 3)
+        self.assertEqual([r['net_pnl'] for r in top], sorted([r['net_pnl'] for r in top], reverse=True))
+
+        expected = run_backtest(self.bars, dict(BASE_CONFIG, **top[0]['params']), increment=0.01)
+        self.assertAlmostEqual(top[0]['net_pnl'], expected['net_pnl'], places=6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import tempfile
+import time
+import unittest
+from db_manager import DatabaseManager
+from executioner import Executioner
+from mock_connector import MockKuCoinConnector
+from order_journal import OrderJournal, TAKE_PROFIT, take_profit_oid
+from test_mock_connector import FakeClock
+
+SYMBOL = 'BTC/USDT:USDT'
+
+class TestOrderJournal(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.exchange = MockKuCoinConnector(price_path=[100, 100, 99.2, 99.2], step_seconds=1, install_clock=False)
+        self.exchange.clock = FakeClock()
+        self.exchange._t0 = self.exchange.clock.now
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def send(self, journal, intent, ack=True):
+        journal.record([intent])
+        order = self.exchange.place_limit_order(SYMBOL, intent['side'], intent['size'], intent['price'],
+                                                reduce_only=intent['reduce_only'], client_oid=intent['client_oid'])
+        if ack:
+            journal.acked([intent], [order])
+        return order
+
+    def test_restart_reconciles_active_entries_without_duplicates(self):
+        journal = OrderJournal(self.db)
+        resting = journal.intent(SYMBOL, 'buy', 1, 95.0, level_idx=0)
+        unacked = journal.intent(SYMBOL, 'buy', 1, 96.0, level_idx=1)
+        unsent = journal.intent(SYMBOL, 'buy', 1, 97.0, level_idx=2)
+        take_profit = journal.intent(SYMBOL, 'sell', 1, 101.0, kind=TAKE_PROFIT, reduce_only=True)
+        filled = journal.intent(SYMBOL, 'buy', 1, 99.5, level_idx=3)
+        canceled = journal.intent(SYMBOL, 'buy', 1, 94.0, level_idx=4)
+
+        self.send(journal, resting)
+        self.send(journal, unacked, ack=False) # Crash between the request and its ack
+        journal.record([unsent, take_profit]) # Crash before the requests
+        self.send(journal, filled)
+        self.exchange.cancel_order(SYMBOL, self.send(journal, canceled)['id']) # e.g. from the exchange UI
+        self.exchange.clock.now += 3 # The bot is down while the price trades through 99.5
+
+        # Restart: a fresh journal on the same database
+        summary = OrderJournal(self.db).reconcile(self.exchange, SYMBOL)
+        self.assertEqual(summary['open'], 2)
+        self.assertEqual(summary['filled'], 1)
+        self.assertEqual(summary['canceled'], 1)
+        self.assertEqual(summary['lost'], 1)
+        self.assertEqual(summary['resent'], 1)
+
+        status = {e['client_oid']: e['status'] for e in self.db.get_order_entries(SYMBOL)}
+        self.assertEqual(status[unacked['client_oid']], 'open') # Adopted, not placed again
+        self.assertEqual(status[unsent['client_oid']], 'lost')
+        self.assertEqual(status[filled['client_oid']], 'filled')
+        self.assertEqual(status[canceled['client_oid']], 'canceled')
+        book = sorted(o['clientOid'] for o in self.exchange.get_open_orders(SYMBOL))
+        self.assertEqual(book, sorted([resting['client_oid'], unacked['client_oid'], take_profit['client_oid']]))
+
+        # Only the three live orders are still active: a second restart changes nothing
+        summary = OrderJournal(self.db).reconcile(self.exchange, SYMBOL)
+        self.assertEqual(summary['open'], 3)
+        self.assertEqual(len(self.exchange.get_open_orders(SYMBOL)), 3)
+
+    def test_fills_and_cancels_move_entries(self):
+        journal = OrderJournal(self.db)
+        intent = journal.intent(SYMBOL, 'buy', 2, 95.0)
+        order = self.send(journal, intent)
+        journal.filled(order['id'], 1)
+        self.assertEqual([e['status'] for e in journal.active(SYMBOL)], ['open']) # Partial fill
+        journal.filled(order['id'], 1)
+        self.assertEqual(journal.active(SYMBOL), [])
+
+        other = self.send(journal, journal.intent(SYMBOL, 'buy', 1, 94.0))
+        journal.canceled([other['id']])
+        self.assertEqual(journal.active(SYMBOL), [])
+
+class TestTakeProfitRecovery(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.db.set_setting('PROFIT_PER_GRID', 1.0)
+        self.exchange = MockKuCoinConnector(price_path=[100] * 4, step_seconds=1, install_clock=False)
+        self.fill = {'tradeId': 't1', 'symbol': SYMBOL, 'side': 'buy', 'price': 100.0, 'size': 1.0,
+                     'timestamp': time.time(), 'orderId': 'o1'}
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def take_profits(self):
+        return [o for o in self.exchange.get_open_orders(SYMBOL) if o['clientOid'] == take_profit_oid(self.fill)]
+
+    def restart(self):
+        OrderJournal(self.db).reconcile(self.exchange, SYMBOL)
+        Executioner(self.exchange, {}, self.db).handle_fill(self.fill) # The fill is polled again
+
+    def test_crash_after_the_claim_keeps_the_take_profit(self):
+        executioner = Executioner(self.exchange, {}, self.db)
+        def crash(intent):
+            raise RuntimeError("crash")
+        executioner._place_take_profit = crash
+        with self.assertRaises(RuntimeError):
+            executioner.handle_fill(self.fill)
+        self.assertEqual(self.take_profits(), [])
+
+        self.restart()
+        self.assertEqual(len(self.take_profits()), 1) # Re-sent by the reconcile, not placed twice
+        self.assertEqual(self.take_profits()[0]['price'], 101.0)
+
+    def test_crash_before_the_claim_places_one_take_profit(self):
+        executioner = Executioner(self.exchange, {}, self.db)
+        def crash(fill):
+            raise RuntimeError("crash")
+        executioner.dedup.claim = crash
+        with self.assertRaises(RuntimeError):
+            executioner.handle_fill(self.fill)
+
+        self.restart()
+        self.assertEqual(len(self.take_profits()), 1)
+        self.assertEqual([e['kind'] for e in OrderJournal(self.db).active(SYMBOL)], [TAKE_PROFIT])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import threading
+import time
+import unittest
+from profiler import SamplingProfiler, ProfilerBusyError
+
+def busy_work(stop_event):
+    while not stop_event.is_set():
+        sum(i * i for i in range(1000))
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_collapsed_stacks_include_thread_names(self):
+        stop_event = threading.Event()
+        worker = threading.Thread(target=busy_work, args=(stop_event,), daemon=True, name="Strategist")
+        worker.start()
+        try:
+            collapsed = SamplingProfiler().profile(seconds=0.3, interval=0.005)
+        finally:
+            stop_event.set()
+            worker.join()
+
+        lines = collapsed.strip().splitlines()
+        self.assertTrue(lines, "Profiler should return at least one stack")
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(int(count) > 0)
+        self.assertTrue(any(line.startswith("Strategist;") and "busy_work" in line for line in lines))
+        # The sampler and the calling thread are never part of the report
+        self.assertFalse(any(line.startswith("Profiler;") for line in lines))
+
+    def test_concurrent_sessions_are_rejected(self):
+        profiler = SamplingProfiler()
+        t = threading.Thread(target=profiler.profile, kwargs={'seconds': 0.3})
+        t.start()
+        time.sleep(0.05)
+        with self.assertRaises(ProfilerBusyError):
+            profiler.profile(seconds=0.1)
+        t.join()
+        self.assertFalse(profiler.active)
+
+if __name__ == '__main__':
+    unittest.main()
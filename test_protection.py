@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+from db_manager import DatabaseManager
+from protection import ProtectiveStopManager
+
+SYMBOL = 'BTC/USDT:USDT'
+
+class FakeExchange:
+    def __init__(self):
+        self.positions = []
+        self.stops = {}
+        self.market_orders = []
+        self.canceled_all = False
+        self._next_id = 0
+
+    def get_all_open_positions(self):
+        return None if self.positions is None else list(self.positions)
+
+    def get_open_orders(self, symbol):
+        return [{'id': oid, 'type': 'stop'} for oid in self.stops]
+
+    def place_stop_market_order(self, symbol, side, amount, stop_price, stop_dir, margin_mode=None):
+        self._next_id += 1
+        oid = f"stop{self._next_id}"
+        self.stops[oid] = (side, amount, stop_price, stop_dir)
+        return {'id': oid}
+
+    def cancel_order(self, symbol, order_id, silent=False):
+        self.stops.pop(order_id, None)
+        return True
+
+    def place_market_order(self, symbol, side, size, reduce_only=True):
+        self.market_orders.append((side, size))
+        return {'id': 'mkt'}
+
+    def cancel_all_orders(self, symbol):
+        self.canceled_all = True
+        self.stops.clear()
+        return True
+
+class TestProtectiveStopManager(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        self.db.set_setting('STOP_LOSS_PRICE', 58000.0)
+        self.db.set_setting('STOP_LOSS_PRICE_HIGH', 72000.0)
+        self.exchange = FakeExchange()
+        self.shared_state = {}
+        self.manager = ProtectiveStopManager(self.exchange, self.db, self.shared_state)
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_stop_follows_exposure_in_both_directions(self):
+        self.exchange.positions = [{'symbol': SYMBOL, 'side': 'long', 'quantity': 3}]
+        self.manager.sync(SYMBOL)
+        self.assertEqual(list(self.exchange.stops.values()), [('sell', 3, 58000.0, 'down')])
+
+        # Same exposure: nothing is replaced
+        self.manager.sync(SYMBOL)
+        self.assertEqual(len(self.exchange.stops), 1)
+
+        self.exchange.positions = [{'symbol': SYMBOL, 'side': 'short', 'quantity': 2}]
+        self.manager.sync(SYMBOL)
+        self.assertEqual(list(self.exchange.stops.values()), [('buy', 2, 72000.0, 'up')])
+
+        self.exchange.positions = []
+        self.manager.sync(SYMBOL)
+        self.assertEqual(self.exchange.stops, {})
+
+    def test_unknown_positions_keep_the_stop(self):
+        self.exchange.positions = [{'symbol': SYMBOL, 'side': 'long', 'quantity': 3}]
+        self.manager.sync(SYMBOL)
+        self.exchange.positions = None # Transient REST error
+        self.manager.sync(SYMBOL)
+        self.assertEqual(list(self.exchange.stops.values()), [('sell', 3, 58000.0, 'down')])
+        self.assertEqual(self.manager.exposure[SYMBOL], 3)
+
+    def test_verify_replaces_a_missing_stop(self):
+        self.exchange.positions = [{'symbol': SYMBOL, 'side': 'long', 'quantity': 1}]
+        self.manager.sync(SYMBOL)
+        self.exchange.stops.clear()
+        self.manager.sync(SYMBOL, verify=True)
+        self.assertEqual(len(self.exchange.stops), 1)
+
+    def test_watcher_closes_shorts_and_pauses(self):
+        self.exchange.positions = [{'symbol': SYMBOL, 'side': 'short', 'quantity': 2}]
+        self.manager.sync(SYMBOL)
+        self.assertFalse(self.manager.check(SYMBOL, 70000))
+        self.assertTrue(self.manager.check(SYMBOL, 72500))
+        self.assertEqual(self.exchange.market_orders, [('buy', 2)])
+        self.assertTrue(self.exchange.canceled_all)
+        self.assertTrue(self.manager.is_paused(SYMBOL))
+        # Paused symbols do not trigger twice
+        self.assertFalse(self.manager.check(SYMBOL, 73000))
+
+    def test_watcher_ignores_breach_without_exposure(self):
+        self.manager.sync(SYMBOL)
+        self.assertFalse(self.manager.check(SYMBOL, 50000))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import shutil
+import tempfile
+import time
+import unittest
+import pandas as pd
+from recorder import MarketRecorder, RecordingConnector, ReplayConnector, read_records
+
+SYMBOL = 'BTC/USDT:USDT'
+
+class FakeExchange:
+    def __init__(self):
+        self.prices = iter([100.0, 99.0, 98.0, 101.0])
+
+    def get_ticker_price(self, symbol):
+        return next(self.prices)
+
+    def get_historical_data(self, symbol, timeframe='5m', limit=100):
+        return pd.DataFrame([[1000.0, 1, 2, 0.5, 1.5, 10]], columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+
+    def get_open_orders(self, symbol):
+        return ['not recorded']
+
+class FakeClock:
+    speed = 1.0
+
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+class TestRecordAndReplay(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def record(self):
+        recording = RecordingConnector(FakeExchange(), MarketRecorder(self.dir))
+        recording.get_historical_data(SYMBOL, '15m')
+        for _ in range(4):
+            recording.get_ticker_price(SYMBOL)
+            time.sleep(0.01)
+        self.assertEqual(recording.get_open_orders(SYMBOL), ['not recorded'])
+        recording.recorder.close()
+
+    def test_records_market_data_only_in_order(self):
+        self.record()
+        records = read_records(self.dir)
+        self.assertEqual([r['k'] for r in records], ['klines', 'ticker', 'ticker', 'ticker', 'ticker'])
+        self.assertEqual([r['r'] for r in records[1:]], [100.0, 99.0, 98.0, 101.0])
+
+    def test_replay_fills_orders_on_the_recorded_path(self):
+        self.record()
+        replay = ReplayConnector(self.dir, install_clock=False)
+        start = replay._t0
+        replay.clock = FakeClock(start + 0.001)
+
+        self.assertEqual(replay.get_ticker_price(SYMBOL), 100.0)
+        replay.place_limit_order(SYMBOL, 'buy', 2, 98.5)
+        klines = replay.get_historical_data(SYMBOL, '15m')
+        self.assertEqual(klines['close'].tolist(), [1.5])
+        shift = klines['timestamp'].iloc[0] - 1000.0
+        self.assertEqual(shift % (900 * 1000), 0) # Whole 15m candles: buckets stay aligned
+        self.assertLessEqual(abs(shift / 1000 - replay._offset), 450)
+
+        replay.clock.now = replay.end_time
+        self.assertEqual(replay.get_ticker_price(SYMBOL), 101.0)
+        fills = replay.get_trade_history(SYMBOL)
+        self.assertEqual([(f['side'], f['price']) for f in fills], [('buy', 98.5)])
+        self.assertTrue(replay.finished)
+
+if __name__ == '__main__':
+    unittest.main()
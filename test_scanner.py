@@ -0,0 +1,104 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+import numpy as np
+import pandas as pd
+from db_manager import DatabaseManager
+from scanner import ContractScanner, score_candidates
+
+TF_MS = 900_000
+
+def make_klines(now, n=80, trend=0.0, seed=0):
+    """n closed 15m candles up to now, plus the forming one."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(trend, 1.0, n + 1))
+    last_open = (int(now) // 900) * 900 * 1000
+    return pd.DataFrame({
+        'timestamp': last_open - np.arange(n, -1, -1) * TF_MS,
+        'open': close, 'high': close + 0.5, 'low': close - 0.5, 'close': close, 'volume': np.ones(n + 1),
+    })
+
+class FakeExchange:
+    def __init__(self, contracts, delay=0.0):
+        self.contracts = contracts
+        self.delay = delay
+        self.fetches = []
+        self._lock = threading.Lock()
+
+    def get_active_contracts(self):
+        return {s: 5e6 for s in self.contracts}
+
+    def get_historical_data(self, symbol, timeframe='5m', limit=100):
+        with self._lock:
+            self.fetches.append(symbol)
+        time.sleep(self.delay)
+        return self.contracts[symbol]
+
+class TestScoring(unittest.TestCase):
+    def test_trending_and_illiquid_contracts_rank_last(self):
+        metrics = pd.DataFrame({
+            'close': [1.0, 1.0, 1.0, 1.0],
+            'atr_pct': [2.0, 1.0, 3.0, 5.0],
+            'adx': [12.0, 20.0, 40.0, 10.0],
+            'bb_width': [5.0, 4.0, 6.0, 9.0],
+        }, index=['RANGE', 'CALM', 'TREND', 'THIN'])
+        ranked = score_candidates(metrics, {'RANGE': 2e6, 'CALM': 2e6, 'TREND': 2e6, 'THIN': 10.0})
+        self.assertEqual(list(ranked.index), ['RANGE', 'CALM', 'TREND'])
+        self.assertEqual(ranked.loc['TREND', 'score'], 0)
+
+class TestContractScanner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, 'test.db'))
+        self.db.set_setting('SCANNER_TIMEFRAME', '15m')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_publishes_ranking_and_refetches_only_after_a_close(self):
+        now = time.time()
+        contracts = {f"C{i}/USDT:USDT": make_klines(now, seed=i) for i in range(12)}
+        contracts['NEW/USDT:USDT'] = make_klines(now, n=10) # Too short to score
+        exchange = FakeExchange(contracts)
+        scanner = ContractScanner(exchange, self.db, workers=4)
+        scanner.run_once(interval=10)
+
+        self.assertEqual(len(exchange.fetches), 13)
+        candidates = self.db.get_scanner_candidates(limit=100)
+        self.assertEqual(len(candidates), 12)
+        self.assertEqual([c['rank'] for c in candidates], list(range(1, 13)))
+        self.assertTrue(all(candidates[i]['score'] >= candidates[i + 1]['score'] for i in range(11)))
+        # The forming candle is never scored
+        self.assertEqual(len(scanner.klines['C0/USDT:USDT']), 80)
+
+        scanner.run_once(interval=10)
+        self.assertEqual(len(exchange.fetches), 13) # No candle closed in between
+        self.assertEqual(self.db.get_state('scanner')['candidates'], 12)
+        scanner.stop()
+
+    def test_refresh_stops_at_the_deadline(self):
+        now = time.time()
+        exchange = FakeExchange({f"C{i}/USDT:USDT": make_klines(now, seed=i) for i in range(20)}, delay=0.05)
+        scanner = ContractScanner(exchange, self.db, workers=2)
+        fetched, errors, pending = scanner.refresh('15m', time.monotonic() + 0.12, now)
+        self.assertGreater(pending, 0)
+        self.assertLess(fetched, 20)
+        # The fetches in flight at the deadline still land, and are not fetched again
+        in_flight = scanner.in_flight
+        self.assertEqual(fetched + pending + in_flight, 20)
+        time.sleep(0.2)
+        self.assertEqual(len(scanner.klines), fetched + in_flight)
+        self.assertEqual(len(exchange.fetches), fetched + in_flight)
+        scanner.stop()
+
+    def test_rate_share_shrinks_with_active_grids(self):
+        scanner = ContractScanner(FakeExchange({}), self.db)
+        self.db.save_grid_config('BTC/USDT:USDT')
+        self.db.save_grid_config('ETH/USDT:USDT')
+        self.assertAlmostEqual(scanner._rate_share(), 0.3)
+        scanner.stop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import threading
+import time
+import unittest
+from rate_limiter import RateLimiter
+from scheduler import SymbolScheduler
+
+class TestSymbolScheduler(unittest.TestCase):
+    def test_same_symbol_runs_in_order_and_symbols_run_concurrently(self):
+        scheduler = SymbolScheduler(max_workers=4)
+        order = []
+        active = {'count': 0, 'max': 0}
+        lock = threading.Lock()
+
+        def task(symbol, i):
+            with lock:
+                active['count'] += 1
+                active['max'] = max(active['max'], active['count'])
+            time.sleep(0.02)
+            with lock:
+                order.append((symbol, i))
+                active['count'] -= 1
+
+        for i in range(3):
+            for symbol in ('BTC', 'ETH', 'SOL'):
+                scheduler.submit(symbol, task, symbol, i)
+        deadline = time.time() + 2
+        while scheduler.pending() and time.time() < deadline:
+            time.sleep(0.01)
+
+        for symbol in ('BTC', 'ETH', 'SOL'):
+            self.assertEqual([i for s, i in order if s == symbol], [0, 1, 2])
+        self.assertTrue(active['max'] > 1, "Different symbols should run concurrently")
+
+    def test_keyed_tasks_are_coalesced(self):
+        scheduler = SymbolScheduler(max_workers=1)
+        gate = threading.Event()
+        calls = []
+        scheduler.submit('BTC', gate.wait, 1)
+        self.assertTrue(scheduler.submit('BTC', calls.append, 'a', key='maintain'))
+        self.assertFalse(scheduler.submit('BTC', calls.append, 'b', key='maintain'))
+        gate.set()
+        deadline = time.time() + 2
+        while scheduler.pending() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(calls, ['a'])
+
+class TestRateLimiter(unittest.TestCase):
+    def test_burst_then_throttle(self):
+        limiter = RateLimiter(rate=50, burst=5)
+        start = time.monotonic()
+        for _ in range(15):
+            limiter.acquire()
+        elapsed = time.monotonic() - start
+        # 5 requests from the burst, the other 10 paced at 50/s
+        self.assertGreaterEqual(elapsed, 0.18)
+
+if __name__ == '__main__':
+    unittest.main()
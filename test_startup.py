@@ -0,0 +1,50 @@
+import os
+import tempfile
+import time
+import unittest
+from db_manager import DatabaseManager
+from startup import StartupTimer
+
+class TestStartupTimer(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_phases_are_recorded_in_order(self):
+        timer = StartupTimer()
+        with timer.phase('import connector'):
+            time.sleep(0.01)
+        with timer.phase('init engine'):
+            time.sleep(0.03)
+        self.assertEqual([p[0] for p in timer.phases], ['import connector', 'init engine'])
+        self.assertGreaterEqual(timer.phases[0][2], 0.01)
+        self.assertGreaterEqual(timer.phases[1][2], 0.03)
+
+    def test_phase_is_recorded_when_it_raises(self):
+        timer = StartupTimer()
+        with self.assertRaises(ImportError):
+            with timer.phase('import sdk'):
+                raise ImportError('missing')
+        self.assertEqual([p[0] for p in timer.phases], ['import sdk'])
+
+    def test_report_stores_every_phase_and_mark(self):
+        timer = StartupTimer()
+        with timer.phase('fast'):
+            pass
+        with timer.phase('slow'):
+            time.sleep(0.02)
+        serving = timer.mark('serving')
+        trading = timer.mark('trading')
+        self.assertLessEqual(serving, trading)
+
+        timer.report(self.db)
+        state = self.db.get_state('startup')
+        self.assertEqual([p['name'] for p in state['phases']], ['slow', 'fast']) # Slowest first
+        self.assertEqual(set(state['marks']), {'serving', 'trading'})
+
+if __name__ == '__main__':
+    unittest.main()
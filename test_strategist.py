@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from db_manager import DatabaseManager
+from strategist import Strategist
+
+SYMBOL = 'BTC/USDT:USDT'
+
+class FakeExchange:
+    def __init__(self, price):
+        self.price = price
+        self.orders = {} # id -> order dict
+        self.calls = []
+        self._next_id = 0
+        self.fail_cancel = False
+
+    def get_price_increment(self, symbol):
+        return 0.1
+
+    def get_ticker_price(self, symbol):
+        return self.price
+
+    def get_open_orders(self, symbol):
+        return list(self.orders.values())
+
+    def _add(self, o):
+        self._next_id += 1
+        oid = f"o{self._next_id}"
+        self.orders[oid] = {'id': oid, 'type': 'limit', 'reduceOnly': False, 'side': o['side'], 'price': o['price'], 'size': o['size']}
+        return {'id': oid}
+
+    def place_limit_orders(self, symbol, orders):
+        self.calls.append(('place', len(orders)))
+        return [self._add(o) for o in orders]
+
+    def amend_orders(self, symbol, amendments):
+        self.calls.append(('amend', len(amendments)))
+        new = [self._add(a) for a in amendments]
+        if self.fail_cancel:
+            return new, []
+        for a in amendments:
+            self.orders.pop(a['id'], None)
+        return new, [a['id'] for a in amendments]
+
+    def cancel_orders(self, symbol, order_ids):
+        self.calls.append(('cancel', len(order_ids)))
+        for oid in order_ids:
+            self.orders.pop(oid, None)
+        return list(order_ids)
+
+class TestGridRepricing(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = DatabaseManager(self.db_path)
+        for key, value in {'GRID_RANGE_LOW': 100.0, 'GRID_RANGE_HIGH': 110.0, 'GRID_LEVELS': 11,
+                           'GRID_SIDE': 'neutral', 'BASE_ORDER_SIZE': 100.0, 'LEVERAGE': 10}.items():
+            self.db.set_setting(key, value)
+        self.exchange = FakeExchange(price=105.05)
+        self.strategist = Strategist(self.exchange, {}, self.db)
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_initial_grid_is_one_batch(self):
+        self.strategist._maintain_grid(SYMBOL)
+        self.assertEqual(self.exchange.calls, [('place', 11)])
+        # Journaled under their level, then acked
+        entries = self.strategist.journal.active(SYMBOL)
+        self.assertEqual(sorted(e['level_idx'] for e in entries), list(range(11)))
+        self.assertTrue(all(e['status'] == 'open' and e['order_id'] in self.exchange.orders for e in entries))
+
+    def test_recenter_moves_orders_instead_of_rebuilding(self):
+        self.strategist._maintain_grid(SYMBOL)
+        before = {o['price']: oid for oid, o in self.exchange.orders.items()}
+        self.exchange.calls.clear()
+
+        # Shift the range by two levels: two orders move, the overlap is untouched
+        self.db.set_setting('GRID_RANGE_LOW', 102.0)
+        self.db.set_setting('GRID_RANGE_HIGH', 112.0)
+        self.strategist.grid_configs.invalidate() # What the engine does on SettingsChanged
+        self.strategist._maintain_grid(SYMBOL)
+
+        self.assertEqual(self.exchange.calls, [('amend', 2)])
+        prices = sorted(o['price'] for o in self.exchange.orders.values())
+        self.assertEqual(prices, [float(p) for p in range(102, 113)])
+        for price in range(102, 111):
+            self.assertIn(before[float(price)], self.exchange.orders)
+
+    def test_failed_amend_cancel_keeps_the_old_orders_journaled(self):
+        self.strategist._maintain_grid(SYMBOL)
+        old_ids = set(self.exchange.orders)
+        self.exchange.fail_cancel = True
+
+        self.db.set_setting('GRID_RANGE_LOW', 102.0)
+        self.db.set_setting('GRID_RANGE_HIGH', 112.0)
+        self.strategist.grid_configs.invalidate() # What the engine does on SettingsChanged
+        self.strategist._maintain_grid(SYMBOL)
+
+        # Both the old and the replacement orders are live, and the journal says so
+        active = {e['order_id'] for e in self.strategist.journal.active(SYMBOL)}
+        self.assertTrue(old_ids <= active)
+        self.assertEqual(active, set(self.exchange.orders))
+
+if __name__ == '__main__':
+    unittest.main()
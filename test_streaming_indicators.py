@@ -0,0 +1,62 @@
+import math
+import unittest
+import numpy as np
+import pandas as pd
+import technical_analysis as ta
+import streaming_indicators as si
+
+
+def make_candles(n=300, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    close[120:150] = close[119] # Flat stretch: zero losses, constant windows
+    spread = np.abs(rng.normal(0, 0.005, n)) * close
+    spread[120:150] = 0
+    return pd.DataFrame({'open': close, 'high': close + spread, 'low': close - spread, 'close': close})
+
+class TestStreamingIndicators(unittest.TestCase):
+    def assertSame(self, streamed, batch, context):
+        if isinstance(batch, dict):
+            for key in batch:
+                self.assertSame(streamed[key], batch[key], f"{context}.{key}")
+            return
+        if math.isnan(batch):
+            self.assertTrue(math.isnan(streamed), context)
+        elif math.isinf(batch):
+            self.assertEqual(streamed, batch, context)
+        else:
+            self.assertTrue(math.isclose(streamed, batch, rel_tol=1e-8, abs_tol=1e-9), f"{context}: {streamed} != {batch}")
+
+    def test_matches_batch_on_every_candle(self):
+        df = make_candles()
+        pairs = {
+            'atr': (si.ATR(14), lambda d: ta.calculate_atr(d, 14)),
+            'rsi': (si.RSI(14), lambda d: ta.calculate_rsi(d, 14)),
+            'stoch_rsi': (si.StochRSI(14, 3, 3), lambda d: ta.calculate_stoch_rsi(d, 14, 3, 3)),
+            'macd': (si.MACD(), ta.calculate_macd),
+            'bollinger': (si.BollingerBands(20, 2), lambda d: ta.calculate_bollinger_bands(d, 20, 2)),
+            'ema': (si.EMA(50), lambda d: ta.calculate_ema(d, 50)),
+            'adx': (si.ADX(14), lambda d: ta.calculate_adx(d, 14)),
+        }
+        candles = df.to_dict('records')
+        with np.errstate(all='ignore'):
+            for i, candle in enumerate(candles):
+                batch_df = df.iloc[:i + 1]
+                for name, (indicator, batch) in pairs.items():
+                    expected = batch(batch_df)
+                    # The tentative value of the forming candle is what the batch gives once it closes
+                    self.assertSame(indicator.peek(candle), expected, f"{name}[{i}] peek")
+                    self.assertSame(indicator.update(candle), expected, f"{name}[{i}]")
+
+    def test_peek_leaves_state_untouched(self):
+        df = make_candles()
+        rsi, reference = si.StochRSI(), si.StochRSI()
+        rsi.warm_up(df.iloc[:60])
+        reference.warm_up(df.iloc[:60])
+        for price in (50.0, 500.0, 101.0): # Wild ticks of a forming candle
+            rsi.peek({'high': price, 'low': price, 'close': price})
+        for candle in df.iloc[60:].to_dict('records'):
+            self.assertEqual(rsi.update(candle), reference.update(candle))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+import numpy as np
+from synthetic_data import generate, lattice_fills
+
+
+class TestLatticeFills(unittest.TestCase):
+    def test_each_crossed_level_is_one_fill(self):
+        spacing = 0.01
+        level = lambda k: (1 + spacing) ** k * 1.000001 # Just above level k
+        prices = np.array([level(100), level(103), level(101)])
+        steps, levels, sides = lattice_fills(prices, spacing)
+        self.assertEqual(steps.tolist(), [1, 1, 1, 2, 2])
+        self.assertEqual(levels.tolist(), [101, 102, 103, 103, 102])
+        self.assertEqual(sides.tolist(), [-1, -1, -1, 1, 1]) # Sells going up, buys coming down
+
+
+class TestGenerate(unittest.TestCase):
+    def test_bulk_history(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'synthetic.db')
+            end = 1_700_000_000.0
+            counts = generate(path, fills=3001, days=30, symbols={'BTC/USDT:USDT': 65000.0, 'SOL/USDT:USDT': 150.0},
+                              logs_per_fill=2, seed=7, end_time=end)
+            conn = sqlite3.connect(path)
+            fills, first, last = conn.execute("SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM history_fills").fetchone()
+            ledger = conn.execute("SELECT COUNT(*) FROM history_ledger WHERE type = 'RealisedPNL'").fetchone()[0]
+            logs = conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+            per_symbol = dict(conn.execute("SELECT symbol, COUNT(*) FROM history_fills GROUP BY symbol").fetchall())
+            conn.close()
+
+        self.assertEqual(counts, {'fills': 3001, 'ledger': ledger, 'logs': 6002})
+        self.assertEqual((fills, logs), (3001, 6002))
+        self.assertEqual(per_symbol, {'BTC/USDT:USDT': 1501, 'SOL/USDT:USDT': 1500})
+        self.assertGreater(ledger, 0)
+        self.assertGreaterEqual(first, end - 30 * 86400)
+        self.assertLessEqual(last, end)
+
+if __name__ == '__main__':
+    unittest.main()
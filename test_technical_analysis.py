@@ -1,6 +1,7 @@
 import unittest
 import pandas as pd
 import numpy as np
+import technical_analysis as ta
 from technical_analysis import calculate_rsi
 
 class TestTechnicalAnalysis(unittest.TestCase):
@@ -18,5 +19,61 @@ class TestTechnicalAnalysis(unittest.TestCase):
         rsi_down = calculate_rsi(df_down, period=14)
         self.assertTrue(rsi_down < 50, f"RSI should be low for decreasing prices, got {rsi_down}")
 
+    def test_indicator_bundle_matches_single_functions(self):
+        rng = np.random.default_rng(5)
+        for n in (40, 300, 3000):
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+            spread = np.abs(rng.normal(0, 0.005, n)) * close
+            df = pd.DataFrame({'high': close + spread, 'low': close - spread, 'close': close})
+            last = ta.compute_indicator_bundle({c: df[c].values for c in df}).last()
+
+            stoch, macd, bb = ta.calculate_stoch_rsi(df), ta.calculate_macd(df), ta.calculate_bollinger_bands(df)
+            expected = {
+                'atr': ta.calculate_atr(df), 'rsi': ta.calculate_rsi(df), 'adx': ta.calculate_adx(df),
+                'ema': ta.calculate_ema(df), 'stoch_k': stoch['k'], 'stoch_d': stoch['d'],
+                'macd': macd['macd'], 'macd_signal': macd['signal'], 'macd_hist': macd['hist'],
+                'bb_upper': bb['upper'], 'bb_middle': bb['middle'], 'bb_lower': bb['lower'], 'bb_percent_b': bb['percent_b'],
+            }
+            for name, value in expected.items():
+                if np.isnan(value):
+                    self.assertTrue(np.isnan(last[name]), f"{name}[{n}]")
+                else:
+                    self.assertAlmostEqual(last[name], value, delta=1e-9 * max(1.0, abs(value)), msg=f"{name}[{n}]")
+
+    def test_indicator_bundle_spec(self):
+        df = pd.DataFrame({'high': np.arange(1.0, 61), 'low': np.arange(0.0, 60), 'close': np.arange(0.5, 60)})
+        bundle = ta.compute_indicator_bundle(df, {'atr': {'period': 5}, 'ema': {'span': 10}})
+        self.assertEqual(set(bundle.last()), {'atr', 'ema'})
+        self.assertAlmostEqual(bundle.atr[-1], ta.calculate_atr(df, period=5))
+        self.assertIsNone(bundle.rsi)
+        with self.assertRaises(ValueError):
+            ta.compute_indicator_bundle(df, ['vwap'])
+
+    def test_panel_matches_per_symbol_bundles(self):
+        rng = np.random.default_rng(9)
+        frames = {}
+        for symbol, n in [('XBTUSDTM', 400), ('ETHUSDTM', 150), ('NEWUSDTM', 12)]: # The last one is too short for most windows
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+            spread = np.abs(rng.normal(0, 0.005, n)) * close
+            frames[symbol] = pd.DataFrame({'high': close + spread, 'low': close - spread, 'close': close})
+
+        symbols, bundle = ta.compute_indicator_panel(frames)
+        self.assertEqual(symbols, list(frames))
+        self.assertEqual(bundle.atr.shape, (3, 400))
+        panel_last = bundle.last()
+        for row, symbol in enumerate(symbols):
+            single = ta.compute_indicator_bundle(frames[symbol]).last()
+            for name, value in single.items():
+                if np.isnan(value):
+                    self.assertTrue(np.isnan(panel_last[name][row]), f"{symbol}.{name}")
+                else:
+                    self.assertAlmostEqual(panel_last[name][row], value, delta=1e-9 * max(1.0, abs(value)), msg=f"{symbol}.{name}")
+        self.assertTrue(np.isnan(panel_last['bb_middle'][2]))
+
+        metrics = ta.scan_metrics(frames)
+        self.assertEqual(list(metrics.columns), ['close', 'atr_pct', 'adx', 'bb_width'])
+        self.assertAlmostEqual(metrics.loc['XBTUSDTM', 'atr_pct'],
+                               ta.calculate_atr(frames['XBTUSDTM']) / frames['XBTUSDTM']['close'].iloc[-1] * 100)
+
 if __name__ == '__main__':
     unittest.main()